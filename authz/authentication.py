@@ -0,0 +1,83 @@
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.cache import TTLCache
+
+token_cache = TTLCache(
+    max_entries=settings.AUTHZ_TOKEN_CACHE_SIZE,
+    ttl=settings.AUTHZ_TOKEN_CACHE_TTL,
+)
+
+
+_lock = threading.Lock()
+_generation = 0
+
+
+def invalidate_token(key: str):
+    _evict(lambda: token_cache.delete(key))
+
+
+def invalidate_user(user_id: int):
+    _evict(lambda: token_cache.delete_where(lambda key, value: value[0].pk == user_id))
+
+
+def _evict(drop):
+    """Drop entries now and again once the writing transaction commits.
+
+    Each eviction bumps a generation, so a lookup that read the old row while
+    the write was in flight does not cache it afterwards.
+    """
+
+    def run():
+        global _generation
+        with _lock:
+            _generation += 1
+            drop()
+
+    run()
+    transaction.on_commit(run)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that remembers resolved tokens in-process.
+
+    Entries are dropped when the token is deleted or its user is saved (for
+    example deactivated) in this process, and again when that write commits;
+    other processes converge within ``AUTHZ_TOKEN_CACHE_TTL`` seconds. Every
+    request with the same token gets the same ``User`` instance, so treat
+    ``request.user`` as read-only and re-fetch the user before saving it.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = _generation
+        user, token = super().authenticate_credentials(key)
+        with _lock:
+            if generation == _generation:
+                token_cache.set(key, (user, token))
+        return user, token
+
+
+async def aauthenticate(request):
+    """Resolve ``Authorization: Token <key>`` for plain async Django views.
+
+    Returns the user, or ``None`` when the header is missing or invalid. Cache
+    hits never leave the event loop.
+    """
+    parts = request.headers.get('Authorization', '').split()
+    if len(parts) != 2 or parts[0].lower() != 'token':
+        return None
+    cached = token_cache.get(parts[1])
+    if cached is None:
+        try:
+            cached = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(parts[1])
+        except AuthenticationFailed:
+            return None
+    return cached[0]
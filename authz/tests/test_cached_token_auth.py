@@ -0,0 +1,83 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from authz.authentication import CachedTokenAuthentication, invalidate_user, token_cache
+from core.cache import TTLCache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def _login(username):
+    get_user_model().objects.create_user(username=username, password='pass')
+    payload = APIClient().post('/api/authz/login/', {'username': username, 'password': 'pass'}, format='json').json()
+    return payload['token']
+
+
+@pytest.mark.django_db
+def test_cached_token_skips_queries_until_user_deactivated(django_assert_num_queries):
+    key = _login('cached')
+    backend = CachedTokenAuthentication()
+    user, _ = backend.authenticate_credentials(key)
+    with django_assert_num_queries(0):
+        assert backend.authenticate_credentials(key)[0] == user
+
+    user.is_active = False
+    user.save(update_fields=['is_active'])
+    with pytest.raises(AuthenticationFailed):
+        backend.authenticate_credentials(key)
+
+
+@pytest.mark.django_db
+def test_deleted_token_is_evicted():
+    key = _login('revoked')
+    backend = CachedTokenAuthentication()
+    user, token = backend.authenticate_credentials(key)
+    token.delete()
+    with pytest.raises(AuthenticationFailed):
+        backend.authenticate_credentials(key)
+
+
+@pytest.mark.django_db
+def test_rows_read_while_a_deactivation_is_in_flight_are_not_kept(monkeypatch, django_capture_on_commit_callbacks):
+    key = _login('racing')
+    backend = CachedTokenAuthentication()
+    user, token = backend.authenticate_credentials(key)
+    token_cache.clear()
+
+    def read_during_save(self, key):
+        invalidate_user(user.pk)
+        return user, token
+
+    monkeypatch.setattr(TokenAuthentication, 'authenticate_credentials', read_during_save)
+    backend.authenticate_credentials(key)
+    assert token_cache.get(key) is None
+    monkeypatch.undo()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        deactivated = get_user_model().objects.get(pk=user.pk)
+        deactivated.is_active = False
+        deactivated.save(update_fields=['is_active'])
+        token_cache.set(key, (user, token))  # re-cached from the old committed row before commit
+    with pytest.raises(AuthenticationFailed):
+        backend.authenticate_credentials(key)
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    now = [0.0]
+    cache = TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    now[0] = 11
+    assert cache.get('a') is None
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _reads_on_primary(request, settings):
+    """Keep reporting reads on the primary unless a test opts in with ``@pytest.mark.replica``.
+
+    With ``POSTGRES_REPLICA_HOST`` set, the replica alias mirrors the test
+    database, but only tests that declare it may query it.
+    """
+    if request.node.get_closest_marker('replica') is None:
+        settings.REPLICA_DATABASE_ALIAS = None
+
+
+@pytest.fixture(autouse=True)
+def _empty_catalog_cache():
+    """Catalog caches outlive a test's rolled-back rows, so start each test empty."""
+    from inventory.catalog import CATALOG_CACHES
+
+    for cache in CATALOG_CACHES.values():
+        cache.clear()
@@ -0,0 +1,78 @@
+"""Primary/replica routing for read-only reporting queries.
+
+Reads go to the primary unless they run inside :func:`reporting`. Reporting
+reads move to ``settings.REPLICA_DATABASE_ALIAS`` when one is configured,
+unless the current client recently wrote (read-your-writes) or the code is
+inside :func:`primary`. Writes always go to the primary.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_reporting: ContextVar[bool] = ContextVar('db_reporting', default=False)
+_pinned: ContextVar[bool] = ContextVar('db_pinned_to_primary', default=False)
+_wrote: ContextVar[bool | None] = ContextVar('db_wrote', default=None)
+
+
+@contextmanager
+def reporting():
+    """Route reads in this block to the replica when it is safe to do so."""
+    token = _reporting.set(True)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+@contextmanager
+def primary():
+    """Keep every read in this block on the primary, even inside :func:`reporting`."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def request_scope(*, pinned: bool):
+    """Fresh routing state for one request; reports whether it wrote.
+
+    Writes are only tracked inside a request scope. Elsewhere, such as in
+    management commands, wrap reads that must see earlier writes in :func:`primary`.
+    """
+    state = {'wrote': False}
+    pinned_token = _pinned.set(pinned)
+    wrote_token = _wrote.set(False)
+    try:
+        yield state
+    finally:
+        state['wrote'] = bool(_wrote.get())
+        _wrote.reset(wrote_token)
+        _pinned.reset(pinned_token)
+
+
+def replica_alias() -> str | None:
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', None)
+    if not alias or not _reporting.get() or _pinned.get() or _wrote.get():
+        return None
+    return alias
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        if _wrote.get() is False:
+            _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,280 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from core.metrics import percentile
+from core.middleware import QueryCounter
+from core.seeding import delete_seeded_stock
+from imports.models import ImportRun
+from inventory.models import Batch, Movement, Product, Warehouse
+from inventory.receipts import ReceiptLine, ReceiptService
+
+DEFAULT_MIX = "scanner=6,planner=2,movements=1,imports=1"
+BATCH_QTY = 1_000_000
+
+
+class InProcessTransport:
+    """Requests through Django's test client in the worker thread, counting the SQL they issue."""
+
+    def __init__(self, token: str):
+        self.client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f"Token {token}")
+
+    def request(self, method: str, path: str, body: str | None = None, content_type: str = "application/json"):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            if method == "GET":
+                response = self.client.get(path)
+            else:
+                response = self.client.post(path, data=body or "", content_type=content_type)
+        return response.status_code, response.content, counter.count
+
+    def close(self):
+        connections.close_all()
+
+
+class HTTPTransport:
+    """Requests to a running server; query counts are only visible in its ``/api/metrics/``."""
+
+    def __init__(self, base_url: str, token: str):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"Authorization": f"Token {token}"}
+
+    def request(self, method: str, path: str, body: str | None = None, content_type: str = "application/json"):
+        data = body.encode() if body is not None else (b"" if method == "POST" else None)
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method, headers={**self.headers, "Content-Type": content_type}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, response.read(), None
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read(), None
+
+    def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive mixed API traffic (scanner commits, planner polling, movement listing, imports) from "
+        "concurrent workers and report throughput, latency percentiles and SQL queries per endpoint. "
+        "Seeds its own data and deletes it afterwards; run it against a local or scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--operations", type=int, default=400, help="Operations across all workers.")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights (default {DEFAULT_MIX}).")
+        parser.add_argument("--skus", type=int, default=200)
+        parser.add_argument("--batches-per-sku", type=int, default=5)
+        parser.add_argument("--warehouses", type=int, default=2)
+        parser.add_argument("--lines", type=int, default=3, help="Lines per scanner movement.")
+        parser.add_argument("--base-url", help="Send requests to this running server instead of in process.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the operation sequence.")
+        parser.add_argument("--output", help="Write the results as JSON to this path.")
+        parser.add_argument("--keep", action="store_true", help="Leave the seeded data in place.")
+
+    def handle(self, *args, **options):
+        mix = self._mix(options["mix"])
+        if options["lines"] > options["batches_per_sku"]:
+            raise CommandError("--lines cannot exceed --batches-per-sku")
+        if options["skus"] < options["workers"]:
+            raise CommandError("--skus must be at least --workers so scanners commit disjoint SKUs")
+        self.prefix = f"LOAD-{uuid.uuid4().hex[:8]}"
+        self.lines = options["lines"]
+        user, _ = get_user_model().objects.get_or_create(username="loadtest")
+        self.user_id = user.pk
+        token, _ = Token.objects.get_or_create(user=user)
+        self.run_ids: list[int] = []
+        self._seed(options["skus"], options["batches_per_sku"], options["warehouses"], user)
+
+        def transport():
+            if options["base_url"]:
+                return HTTPTransport(options["base_url"], token.key)
+            return InProcessTransport(token.key)
+
+        workers = options["workers"]
+        quotas = [options["operations"] // workers + (worker < options["operations"] % workers) for worker in range(workers)]
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                samples = [
+                    sample
+                    for result in pool.map(
+                        lambda worker: self._drive(worker, workers, quotas[worker], mix, transport, options["seed"]),
+                        range(workers),
+                    )
+                    for sample in result
+                ]
+            elapsed = time.perf_counter() - started
+        finally:
+            if not options["keep"]:
+                self._cleanup()
+
+        report = self._report(samples, elapsed, workers)
+        self._print(report)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+
+    @staticmethod
+    def _mix(raw: str) -> dict[str, int]:
+        weights = {}
+        for part in raw.split(","):
+            name, _, weight = part.partition("=")
+            if name not in ("scanner", "planner", "movements", "imports"):
+                raise CommandError(f"Unknown operation in --mix: {name}")
+            try:
+                weights[name] = int(weight)
+            except ValueError:
+                raise CommandError(f"--mix {part} needs a whole-number weight")
+        if not any(weights.values()):
+            raise CommandError("--mix needs at least one positive weight")
+        return weights
+
+    def _seed(self, skus: int, batches_per_sku: int, warehouses: int, user):
+        self.warehouses = Warehouse.objects.bulk_create(
+            [Warehouse(warehouse_id=f"{self.prefix}-W{index}", name="Load test") for index in range(warehouses)]
+        )
+        self.products = Product.objects.bulk_create(
+            [Product(sku=f"{self.prefix}-{index}", title="Load test") for index in range(skus)]
+        )
+        lines = [
+            ReceiptLine(
+                batch=Batch(
+                    batch_id=f"{product.sku}-B{number}",
+                    sku=product,
+                    warehouse=self.warehouses[index % warehouses],
+                    received_date=f"2024-01-{1 + number % 28:02d}",
+                    unit_cost=Decimal("2.00"),
+                    starting_qty=BATCH_QTY,
+                    compliance_status=Batch.COMPLIANCE_COMPLETE,
+                )
+            )
+            for index, product in enumerate(self.products)
+            for number in range(batches_per_sku)
+        ]
+        ReceiptService(user, external_ref=self.prefix).receive(lines)
+        self.batches: dict[str, list[tuple[str, str]]] = defaultdict(list)
+        for batch_id, sku, warehouse_id in Batch.objects.filter(sku__in=self.products).values_list(
+            "batch_id", "sku_id", "warehouse_id"
+        ):
+            self.batches[sku].append((batch_id, warehouse_id))
+
+    def _drive(self, worker: int, workers: int, operations: int, mix: dict, transport, seed: int) -> list[dict]:
+        """Run ``operations`` weighted-random operations; scanners only touch this worker's SKUs."""
+        rng = random.Random(seed * 1000 + worker)
+        client = transport()
+        own_skus = [product.sku for product in self.products[worker::workers]]
+        names, weights = zip(*mix.items())
+        samples: list[dict] = []
+        try:
+            for number in range(operations):
+                operation = rng.choices(names, weights)[0]
+                getattr(self, f"_{operation}")(client, rng, own_skus, worker, number, samples)
+        finally:
+            client.close()
+        return samples
+
+    @staticmethod
+    def _call(client, samples: list, endpoint: str, method: str, path: str, body=None, content_type="application/json"):
+        started = time.perf_counter()
+        status, content, queries = client.request(method, path, body, content_type)
+        samples.append(
+            {"endpoint": endpoint, "status": status, "seconds": time.perf_counter() - started, "queries": queries}
+        )
+        return status, content
+
+    def _scanner(self, client, rng, own_skus, worker, number, samples):
+        sku = rng.choice(own_skus)
+        batches = rng.sample(self.batches[sku], self.lines)
+        movement = {
+            "type": Movement.TYPE_FBA,
+            "from_warehouse": batches[0][1],
+            "external_ref": self.prefix,
+            "created_by": self.user_id,
+            "lines": [{"sku": sku, "batch": batch_id, "quantity": 1} for batch_id, _ in batches],
+        }
+        status, content = self._call(
+            client, samples, "POST movements/", "POST", "/api/inventory/movements/", json.dumps(movement)
+        )
+        if status == 201:
+            movement_id = json.loads(content)["movement_id"]
+            self._call(client, samples, "POST movements/<id>/commit/", "POST", f"/api/inventory/movements/{movement_id}/commit/")
+
+    def _planner(self, client, rng, own_skus, worker, number, samples):
+        path = rng.choice(["reorder", "fba"])
+        self._call(client, samples, f"GET planner/{path}/", "GET", f"/api/planner/{path}/")
+
+    def _movements(self, client, rng, own_skus, worker, number, samples):
+        self._call(client, samples, "GET movements/", "GET", "/api/inventory/movements/?type=fba")
+
+    def _imports(self, client, rng, own_skus, worker, number, samples):
+        rows = sorted(rng.sample(own_skus, min(20, len(own_skus))))
+        body = "sku,ordered_1,ordered_2,ordered_3\n" + "".join(
+            f"{sku},{rng.randint(0, 500)},{worker},{number}\n" for sku in rows
+        )
+        status, content = self._call(
+            client, samples, "POST imports/manual-orders/", "POST", "/api/imports/manual-orders/", body, "text/csv"
+        )
+        run_id = json.loads(content).get("run_id") if status == 200 else None
+        if run_id is not None:
+            self.run_ids.append(run_id)
+
+    def _report(self, samples: list[dict], elapsed: float, workers: int) -> dict:
+        by_endpoint: dict[str, list[dict]] = defaultdict(list)
+        for sample in samples:
+            by_endpoint[sample["endpoint"]].append(sample)
+        endpoints = {}
+        for endpoint, rows in sorted(by_endpoint.items()):
+            latencies = sorted(row["seconds"] for row in rows)
+            queries = [row["queries"] for row in rows if row["queries"] is not None]
+            endpoints[endpoint] = {
+                "requests": len(rows),
+                "errors": sum(1 for row in rows if row["status"] >= 400),
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "queries_mean": sum(queries) / len(queries) if queries else None,
+                "queries_max": max(queries) if queries else None,
+            }
+        return {
+            "prefix": self.prefix,
+            "workers": workers,
+            "requests": len(samples),
+            "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+            "seconds": round(elapsed, 3),
+            "requests_per_sec": len(samples) / elapsed if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+    def _print(self, report: dict):
+        self.stdout.write(
+            f"{report['requests']} requests from {report['workers']} workers in {report['seconds']:.2f}s: "
+            f"{report['requests_per_sec']:,.1f} req/s, {report['errors']} errors"
+        )
+        for endpoint, stats in report["endpoints"].items():
+            queries = f"{stats['queries_mean']:6.1f} q (max {stats['queries_max']})" if stats["queries_mean"] is not None else ""
+            self.stdout.write(
+                f"{endpoint:>30} {stats['requests']:6} req {stats['errors']:4} err  p50 {stats['p50_ms']:8.2f} ms  "
+                f"p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  {queries}"
+            )
+
+    def _cleanup(self):
+        delete_seeded_stock(self.prefix, self.products, self.warehouses)
+        ImportRun.objects.filter(pk__in=self.run_ids).delete()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+@dataclass
+class Histogram:
+    buckets: tuple
+    counts: list = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+@dataclass
+class RouteStats:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    queries: Histogram = field(default_factory=lambda: Histogram(QUERY_BUCKETS))
+    db_seconds: float = 0.0
+    response_bytes: int = 0
+    statuses: dict = field(default_factory=lambda: defaultdict(int))
+
+
+class MetricsRegistry:
+    """Per-process request metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._routes: dict[tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        *,
+        route: str,
+        method: str,
+        status: int,
+        seconds: float,
+        queries: int | None,
+        db_seconds: float,
+        response_bytes: int,
+    ):
+        key = (route, method)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.latency.observe(seconds)
+            if queries is not None:
+                stats.queries.observe(queries)
+            stats.db_seconds += db_seconds
+            stats.response_bytes += response_bytes
+            stats.statuses[status] += 1
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def snapshot(self) -> dict[tuple[str, str], RouteStats]:
+        with self._lock:
+            return {
+                key: RouteStats(
+                    latency=_copy_histogram(stats.latency),
+                    queries=_copy_histogram(stats.queries),
+                    db_seconds=stats.db_seconds,
+                    response_bytes=stats.response_bytes,
+                    statuses=dict(stats.statuses),
+                )
+                for key, stats in self._routes.items()
+            }
+
+    def render(self) -> str:
+        routes = sorted(self.snapshot().items())
+        lines: list[str] = []
+        lines += _histogram_lines(
+            'http_request_duration_seconds', 'Request latency by route.', [(key, stats.latency) for key, stats in routes]
+        )
+        lines += _histogram_lines(
+            'http_request_db_queries', 'SQL queries issued per request.', [(key, stats.queries) for key, stats in routes]
+        )
+        lines += ['# HELP http_requests_total Requests by route and status.', '# TYPE http_requests_total counter']
+        for (route, method), stats in routes:
+            for status_code, count in sorted(stats.statuses.items()):
+                lines.append(f'http_requests_total{{{_labels(route, method)},status="{status_code}"}} {count}')
+        lines += ['# HELP http_request_db_seconds_total Time spent in SQL by route.', '# TYPE http_request_db_seconds_total counter']
+        for (route, method), stats in routes:
+            lines.append(f'http_request_db_seconds_total{{{_labels(route, method)}}} {stats.db_seconds:.6f}')
+        lines += ['# HELP http_response_bytes_total Response body bytes by route.', '# TYPE http_response_bytes_total counter']
+        for (route, method), stats in routes:
+            lines.append(f'http_response_bytes_total{{{_labels(route, method)}}} {stats.response_bytes}')
+        return '\n'.join(lines) + '\n'
+
+
+def _copy_histogram(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.total = histogram.total
+    copy.count = histogram.count
+    return copy
+
+
+def _labels(route: str, method: str) -> str:
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'route="{route}",method="{method}"'
+
+
+def _histogram_lines(name: str, help_text: str, series) -> list[str]:
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for (route, method), histogram in series:
+        labels = _labels(route, method)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+registry = MetricsRegistry()
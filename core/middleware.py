@@ -0,0 +1,117 @@
+import hashlib
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .db_routing import request_scope
+from .metrics import registry
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Records latency, SQL query count/time and response size per resolved route.
+
+    Under ASGI the ORM runs on worker threads with their own connection
+    objects, so async requests report latency and size but not SQL counts.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - started, counter)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - started, None)
+        return response
+
+    @staticmethod
+    def _record(request, response, elapsed: float, counter: QueryCounter | None):
+        match = getattr(request, 'resolver_match', None)
+        registry.record(
+            route=match.view_name if match else 'unmatched',
+            method=request.method,
+            status=response.status_code,
+            seconds=elapsed,
+            queries=counter.count if counter else None,
+            db_seconds=counter.seconds if counter else 0.0,
+            response_bytes=0 if response.streaming else len(response.content),
+        )
+
+
+class PrimaryStickinessMiddleware:
+    """Pins a client's reporting reads to the primary for a while after it writes.
+
+    Clients are identified by their ``Authorization`` header or session cookie.
+    The pin lives in the Django cache for ``REPLICA_STICKY_SECONDS``, so it is
+    shared across workers when a shared cache backend is configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = self._client_key(request)
+        with request_scope(pinned=bool(key and cache.get(key))) as state:
+            response = self.get_response(request)
+        if key and state['wrote']:
+            cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = self._client_key(request)
+        pinned = bool(key and await sync_to_async(cache.get)(key))
+        with request_scope(pinned=pinned) as state:
+            response = await self.get_response(request)
+        if key and state['wrote']:
+            await sync_to_async(cache.set)(key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    @staticmethod
+    def _client_key(request) -> str | None:
+        credential = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if not credential:
+            return None
+        return 'primary-pin:' + hashlib.sha256(credential.encode()).hexdigest()
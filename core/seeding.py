@@ -0,0 +1,38 @@
+"""Teardown for the stock that the benchmark and load-test commands seed."""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db import transaction
+
+from inventory.models import (
+    Batch,
+    BatchCostLayer,
+    LedgerDailyRollup,
+    Movement,
+    MovementLine,
+    Product,
+    SkuValuation,
+    StockLedger,
+    Warehouse,
+)
+
+
+def delete_seeded_stock(external_ref: str, products: Iterable[Product], warehouses: Iterable[Warehouse]) -> None:
+    """Delete seeded products and warehouses with everything derived from them.
+
+    Movements are matched on ``external_ref``; ledger rows, rollups,
+    valuations, cost layers and batches on the seeded products.
+    """
+    skus = [product.sku for product in products]
+    with transaction.atomic():
+        movements = Movement.objects.filter(external_ref=external_ref)
+        StockLedger.objects.filter(movement__in=movements).delete()
+        LedgerDailyRollup.objects.filter(sku__in=skus).delete()
+        SkuValuation.objects.filter(sku__in=skus).delete()
+        BatchCostLayer.objects.filter(sku__in=skus).delete()
+        MovementLine.objects.filter(movement__in=movements).delete()
+        movements.delete()
+        Batch.objects.filter(sku__in=skus).delete()
+        Product.objects.filter(sku__in=skus).delete()
+        Warehouse.objects.filter(warehouse_id__in=[warehouse.warehouse_id for warehouse in warehouses]).delete()
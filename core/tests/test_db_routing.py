@@ -0,0 +1,61 @@
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.db_routing import ReplicaRouter, primary, reporting, request_scope
+from inventory.models import Product
+
+
+@pytest.fixture
+def replica(settings):
+    settings.REPLICA_DATABASE_ALIAS = 'replica'
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.replica
+def test_reporting_reads_use_replica_unless_pinned(replica):
+    router = ReplicaRouter()
+    router.db_for_write(Product)
+    assert router.db_for_read(Product) is None
+    with reporting():
+        assert router.db_for_read(Product) == 'replica'
+        with primary():
+            assert router.db_for_read(Product) is None
+    with request_scope(pinned=False) as state, reporting():
+        assert router.db_for_write(Product) == 'default'
+        assert router.db_for_read(Product) is None
+    assert state['wrote'] is True
+
+
+@pytest.mark.replica
+@pytest.mark.django_db
+def test_write_pins_client_to_primary(replica, settings):
+    settings.REPLICA_DATABASE_ALIAS = 'default'
+    user = get_user_model().objects.create_user(username='writer', password='pass')
+    token = Token.objects.create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    client.get('/api/planner/reorder/')
+    assert not any(key for key in cache._cache if 'primary-pin' in key)
+    client.post('/api/inventory/products/bulk-upsert/', [{'sku': 'PIN1', 'title': 'Pinned'}], format='json')
+    assert any(key for key in cache._cache if 'primary-pin' in key)
+
+
+@pytest.mark.replica
+@pytest.mark.skipif('replica' not in django_settings.DATABASES, reason='set POSTGRES_REPLICA_HOST to run')
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_planner_reads_from_replica_alias():
+    user = get_user_model().objects.create_user(username='reporter', password='pass')
+    Product.objects.create(sku='REP1', title='Replica')
+    client = APIClient()
+    client.force_authenticate(user)
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        assert client.get('/api/planner/reorder/').json()[0]['sku'] == 'REP1'
+    assert len(replica_queries) == 3
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from imports.models import ImportRun
+from inventory.models import Movement, Product
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest_drives_mixed_traffic_and_reports_per_endpoint(tmp_path):
+    output = tmp_path / 'load.json'
+
+    call_command(
+        'loadtest', workers=2, operations=24, skus=6, batches_per_sku=3, lines=2,
+        mix='scanner=2,planner=1,movements=1,imports=1', output=str(output),
+    )
+
+    report = json.loads(output.read_text())
+    assert report['errors'] == 0 and report['requests'] >= 24
+    endpoints = report['endpoints']
+    assert endpoints['POST movements/']['requests'] == endpoints['POST movements/<id>/commit/']['requests']
+    assert set(endpoints) <= {
+        'POST movements/', 'POST movements/<id>/commit/', 'GET planner/reorder/', 'GET planner/fba/',
+        'GET movements/', 'POST imports/manual-orders/',
+    }
+    assert all(stats['queries_max'] >= 1 and stats['p99_ms'] >= stats['p50_ms'] for stats in endpoints.values())
+    assert not Product.objects.exists() and not Movement.objects.exists() and not ImportRun.objects.exists()
+
+
+def test_loadtest_rejects_unknown_operations():
+    with pytest.raises(CommandError, match='--mix'):
+        call_command('loadtest', mix='scanner=1,checkout=2')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_loadtest_cleanup_keeps_import_runs_it_did_not_create(monkeypatch):
+    from core.management.commands.loadtest import Command
+
+    seed = Command._seed
+
+    def seed_then_user_import(self, *args):
+        seed(self, *args)
+        ImportRun.objects.create(source=ImportRun.SOURCE_MANUAL_ORDERS, content_hash='f' * 64)
+
+    monkeypatch.setattr(Command, '_seed', seed_then_user_import)
+
+    call_command('loadtest', workers=1, operations=6, skus=4, batches_per_sku=1, lines=1, mix='imports=1')
+
+    assert list(ImportRun.objects.values_list('content_hash', flat=True)) == ['f' * 64]
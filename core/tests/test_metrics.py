@@ -0,0 +1,22 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from core.metrics import registry
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_route_latency_and_queries():
+    registry.reset()
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='metrics', password='pass'))
+    client.get('/api/inventory/valuation/')
+    client.get('/api/health/')
+
+    body = client.get('/api/metrics/').content.decode()
+
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_requests_total{route="inventory:valuation",method="GET",status="200"} 1' in body
+    assert 'http_request_db_queries_bucket{route="core:health",method="GET",le="0"} 1' in body
+    assert 'http_request_db_queries_bucket{route="inventory:valuation",method="GET",le="0"} 0' in body
+    assert 'http_response_bytes_total{route="core:health",method="GET"} 15' in body
@@ -0,0 +1,28 @@
+"""What is still in flight on the database, for readers that page by write timestamp."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db import connection
+
+
+def oldest_open_transaction() -> datetime | None:
+    """Start of the oldest transaction open on another client connection, on Postgres.
+
+    Rows are stamped before their transaction commits, so a reader that
+    advances a timestamp watermark must stay behind this. Sessions of other
+    roles only show up here for members of ``pg_read_all_stats``, so run such
+    readers as the role that writes.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if connection.in_atomic_block:
+            # pg_stat_activity is read once per transaction unless the snapshot is dropped.
+            cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute(
+            "SELECT min(xact_start) FROM pg_stat_activity"
+            " WHERE datname = current_database() AND backend_type = 'client backend'"
+            " AND pid <> pg_backend_pid() AND xact_start IS NOT NULL"
+        )
+        return cursor.fetchone()[0]
@@ -5,4 +5,7 @@ app_name = 'core'
 
 urlpatterns = [
     path('health/', views.HealthView.as_view(), name='health'),
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
+    path('async/health/', views.AsyncHealthView.as_view(), name='async-health'),
+    path('async/metrics/', views.AsyncMetricsView.as_view(), name='async-metrics'),
 ]
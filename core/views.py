@@ -1,5 +1,11 @@
+from django.http import HttpResponse, JsonResponse
+from django.views import View
 from rest_framework import response, status, views
 
+from .metrics import registry
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
 
 class HealthView(views.APIView):
     permission_classes = []
@@ -7,3 +13,21 @@ class HealthView(views.APIView):
 
     def get(self, request):
         return response.Response({'status': 'ok'}, status=status.HTTP_200_OK)
+
+
+class MetricsView(views.APIView):
+    permission_classes = []
+    authentication_classes = []
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+
+class AsyncHealthView(View):
+    async def get(self, request):
+        return JsonResponse({'status': 'ok'})
+
+
+class AsyncMetricsView(View):
+    async def get(self, request):
+        return HttpResponse(registry.render(), content_type=METRICS_CONTENT_TYPE)
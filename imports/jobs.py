@@ -0,0 +1,204 @@
+"""DB-backed background imports: uploads are queued as ``ImportJob`` rows and run by ``run_import_worker``."""
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.db_routing import primary
+
+from .models import ImportJob, ImportRun
+from .readers import count_rows, text_stream
+from .services import (
+    ImportValidationError,
+    ManualOrdersImportService,
+    ReceivingImportService,
+    SellerboardImportService,
+    chunked,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class JobTakenOver(Exception):
+    """The job was reclaimed by another worker; this attempt must stop without writing."""
+
+
+def enqueue(source: str, upload: File, *, user=None) -> ImportJob:
+    """Store the upload and queue it; ``rows_total`` counts the data rows for progress and ETA."""
+    upload.open('rb')
+    rows_total = count_rows(upload.file)
+    upload.seek(0)
+    job = ImportJob(source=source, created_by=user if getattr(user, 'pk', None) else None, rows_total=rows_total)
+    job.upload.save(upload.name or f'{source}.csv', upload, save=False)
+    job.save()
+    return job
+
+
+def claim(worker: str) -> ImportJob | None:
+    """Lock the oldest queued job, or a running one whose worker stopped heartbeating.
+
+    ``SKIP LOCKED`` lets any number of workers poll the same table.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+    with primary(), transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ImportJob.STATUS_QUEUED)
+                | Q(status=ImportJob.STATUS_RUNNING, heartbeat_at__lt=stale_before)
+            )
+            .order_by('created_at', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ImportJob.STATUS_RUNNING
+        job.attempts += 1
+        job.worker = worker
+        job.started_at = job.heartbeat_at = now
+        job.attempt_start_row = job.rows_processed
+        job.save(update_fields=['status', 'attempts', 'worker', 'started_at', 'heartbeat_at', 'attempt_start_row'])
+    return job
+
+
+def run(job: ImportJob) -> ImportJob:
+    """Process a claimed job to completion, recording failures on the job instead of raising."""
+    try:
+        with primary():
+            RUNNERS[job.source](job)
+    except JobTakenOver:
+        logger.warning("Import job %s was taken over by another worker; attempt %s stopped", job.pk, job.attempts)
+        return job
+    except ImportValidationError as exc:
+        _finish(job, ImportJob.STATUS_FAILED, exc.errors)
+    except Exception as exc:
+        if not isinstance(exc, ValueError):
+            logger.exception("Import job %s failed", job.pk)
+        _finish(job, ImportJob.STATUS_FAILED, [{'row': None, 'error': str(exc)}])
+    else:
+        _finish(job, ImportJob.STATUS_SUCCEEDED, job.errors)
+    return job
+
+
+def _run_receiving(job: ImportJob) -> None:
+    """Apply one chunk per transaction, committing the checkpoint with it.
+
+    A resumed job skips the rows already checkpointed. Row numbers in errors
+    count the header as row 1.
+    """
+    service = ReceivingImportService(user=job.created_by)
+    start_row = job.rows_processed
+    with job.upload.open('rb') as binary:
+        try:
+            reader = service.reader(text_stream(binary))
+        except ValueError as exc:
+            raise ImportValidationError([{'row': 1, 'error': str(exc)}]) from exc
+        for chunk in chunked(islice(enumerate(reader, start=2), start_row, None), service.chunk_size):
+            with transaction.atomic():
+                created = service.apply_chunk(chunk)
+                _checkpoint(job, len(chunk), created)
+
+
+def _whole_file_runner(service_class):
+    """Sellerboard and manual-order files are applied atomically, so the checkpoint is the whole file.
+
+    The import and its checkpoint share one transaction, so an attempt whose
+    job was taken over rolls back instead of importing alongside the new one.
+    A heartbeat keeps a long file from looking stale meanwhile.
+    """
+
+    def run_whole_file(job: ImportJob) -> None:
+        service = service_class()
+        with transaction.atomic():
+            with _heartbeat(job), job.upload.open('rb') as binary:
+                result = service.parse(text_stream(binary))
+            written = len(result) if isinstance(result, list) else result.written
+            _checkpoint(job, service.run.rows_total if service.run else 0, written)
+
+    return run_whole_file
+
+
+RUNNERS = {
+    ImportJob.SOURCE_RECEIVING: _run_receiving,
+    ImportRun.SOURCE_SELLERBOARD: _whole_file_runner(SellerboardImportService),
+    ImportRun.SOURCE_MANUAL_ORDERS: _whole_file_runner(ManualOrdersImportService),
+}
+
+
+def _owned(job: ImportJob):
+    """The job's row, as long as this attempt still holds it."""
+    return ImportJob.objects.filter(
+        pk=job.pk, status=ImportJob.STATUS_RUNNING, worker=job.worker, attempts=job.attempts
+    )
+
+
+@contextmanager
+def _heartbeat(job: ImportJob):
+    """Refresh ``heartbeat_at`` from a side thread while a long step runs."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.IMPORT_JOB_STALE_SECONDS / 3):
+                if not _owned(job).update(heartbeat_at=timezone.now()):
+                    return
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'import-job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _checkpoint(job: ImportJob, rows: int, written: int) -> None:
+    now = timezone.now()
+    updated = _owned(job).update(
+        rows_processed=F('rows_processed') + rows, rows_written=F('rows_written') + written, heartbeat_at=now
+    )
+    if not updated:
+        raise JobTakenOver(job.pk)
+    job.rows_processed += rows
+    job.rows_written += written
+    job.heartbeat_at = now
+
+
+def _finish(job: ImportJob, status: str, errors: list) -> None:
+    job.status = status
+    job.errors = errors
+    job.finished_at = timezone.now()
+    if status == ImportJob.STATUS_SUCCEEDED:
+        job.rows_total = max(job.rows_total, job.rows_processed)
+    if not _owned(job).update(status=status, errors=errors, finished_at=job.finished_at, rows_total=job.rows_total):
+        logger.warning("Import job %s was taken over by another worker; not recording %s", job.pk, status)
+
+
+def job_payload(job: ImportJob) -> dict:
+    eta = job.eta_seconds()
+    return {
+        'id': job.pk,
+        'source': job.source,
+        'status': job.status,
+        'rows_total': job.rows_total,
+        'rows_processed': job.rows_processed,
+        'rows_written': job.rows_written,
+        'errors': job.errors,
+        'attempts': job.attempts,
+        'eta_seconds': None if eta is None else round(eta, 1),
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
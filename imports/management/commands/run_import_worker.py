@@ -0,0 +1,31 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from imports import jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued background import jobs. Run any number of these side by side."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty instead of polling.")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        while True:
+            close_old_connections()
+            job = jobs.claim(worker)
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            self.stdout.write(f"Job {job.pk} ({job.source}) attempt {job.attempts} from row {job.rows_processed}")
+            jobs.run(job)
+            style = self.style.SUCCESS if job.status == job.STATUS_SUCCEEDED else self.style.ERROR
+            self.stdout.write(style(f"Job {job.pk} {job.status}: {job.rows_processed} rows, {job.rows_written} written"))
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class ImportRun(models.Model):
+    """One upload of one file, keyed by source and content hash."""
+
+    SOURCE_SELLERBOARD = "sellerboard"
+    SOURCE_MANUAL_ORDERS = "manual_orders"
+    SOURCE_CHOICES = [
+        (SOURCE_SELLERBOARD, "Sellerboard"),
+        (SOURCE_MANUAL_ORDERS, "Manual orders"),
+    ]
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    source = models.CharField(max_length=32, choices=SOURCE_CHOICES)
+    content_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    rows_unchanged = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # A file is imported at most once per source; failed runs may be retried.
+            models.UniqueConstraint(
+                fields=["source", "content_hash"],
+                condition=~Q(status="failed"),
+                name="uniq_import_run_active_content",
+            ),
+        ]
+        indexes = [models.Index(fields=["source", "-started_at"])]
+
+    @property
+    def duration_seconds(self) -> float | None:
+        if self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+
+class ImportRowFingerprint(models.Model):
+    """Hash of the values last written for one key (usually a SKU) of one source."""
+
+    source = models.CharField(max_length=32, choices=ImportRun.SOURCE_CHOICES)
+    key = models.CharField(max_length=128)
+    fingerprint = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source", "key"], name="uniq_import_fingerprint_source_key"),
+        ]
+
+
+class ImportJob(models.Model):
+    """An upload queued for ``run_import_worker``, with progress checkpointed per chunk."""
+
+    SOURCE_RECEIVING = "receiving"
+    SOURCE_CHOICES = [(SOURCE_RECEIVING, "Receiving"), *ImportRun.SOURCE_CHOICES]
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    source = models.CharField(max_length=32, choices=SOURCE_CHOICES)
+    upload = models.FileField(upload_to="imports/%Y/%m/%d/")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=128, blank=True)
+    attempt_start_row = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def eta_seconds(self, now=None) -> float | None:
+        """Remaining time at the throughput of the current attempt, if it can be estimated."""
+        if self.status != self.STATUS_RUNNING or self.started_at is None or not self.rows_total:
+            return None
+        done = self.rows_processed - self.attempt_start_row
+        elapsed = ((now or timezone.now()) - self.started_at).total_seconds()
+        if done <= 0 or elapsed <= 0:
+            return None
+        return max(self.rows_total - self.rows_processed, 0) * elapsed / done
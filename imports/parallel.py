@@ -0,0 +1,182 @@
+"""Multi-process CSV parsing for large receiving backfills.
+
+The file is split on line boundaries into blocks of roughly ``chunk_bytes``.
+Each block is decoded, parsed and validated (conversions and quantity signs)
+in a worker process into compact tuples of ``BATCH_FIELDS`` values. Blocks
+come back in file order with the file row number of each tuple, ready for
+the catalog checks and bulk writers. Quoted fields must not contain line breaks, because the
+split does not track CSV quoting.
+"""
+from __future__ import annotations
+
+import csv
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator
+
+BATCH_FIELDS = (
+    'batch_id',
+    'sku_id',
+    'warehouse_id',
+    'received_date',
+    'starting_qty',
+    'amazon_stn_price',
+    'ewaybill_price',
+    'gst_rate_pct_override',
+    'base_cost_inr',
+    'base_cost_rmb',
+    'base_cost_usd',
+    'ewaybill_product_name',
+    'pieces_per_carton',
+    'accession',
+)
+
+STARTING_QTY = BATCH_FIELDS.index('starting_qty')
+PIECES_PER_CARTON = BATCH_FIELDS.index('pieces_per_carton')
+
+DEFAULT_CHUNK_BYTES = 4 * 1024 * 1024
+
+ParsedBlock = tuple[list[tuple], list[dict], list[int]]
+
+
+def parse_receiving(
+    binary: BinaryIO,
+    *,
+    workers: int | None = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    typed: bool = True,
+) -> Iterator[ParsedBlock]:
+    """Yield ``(rows, errors, row_numbers)`` per block, in file order.
+
+    ``typed`` selects the column-typed parser, which resolves column positions
+    once and converts values directly. Otherwise each row goes through
+    ``ReceivingImportService`` exactly as a regular import does. With
+    ``workers=1`` blocks are parsed in this process.
+    """
+    from .services import ReceivingImportService
+
+    header = next(csv.reader([binary.readline().decode('utf-8-sig')]), [])
+    missing = ReceivingImportService.REQUIRED_FIELDS - set(header)
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    workers = workers or os.cpu_count() or 1
+    blocks = _blocks(binary, header, chunk_bytes, typed)
+    if workers == 1:
+        yield from (_parse_block(*block) for block in blocks)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    try:
+        pending = deque()
+        for block in blocks:
+            pending.append(pool.submit(_parse_block, *block))
+            # Keep a bounded window in flight so memory stays flat on huge files.
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _blocks(binary: BinaryIO, header: list[str], chunk_bytes: int, typed: bool):
+    first_row = 2
+    while True:
+        data = binary.read(chunk_bytes)
+        if not data:
+            return
+        if not data.endswith(b'\n'):
+            data += binary.readline()
+        yield first_row, header, data, typed
+        first_row += data.count(b'\n') + (0 if data.endswith(b'\n') else 1)
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _parse_block(first_row: int, header: list[str], data: bytes, typed: bool) -> ParsedBlock:
+    lines = data.decode('utf-8').splitlines()
+    parse = _typed_row_parser(header) if typed else _generic_row_parser(header)
+    rows, errors, numbers = [], [], []
+    for row_number, values in enumerate(csv.reader(lines), start=first_row):
+        if not values:
+            continue
+        try:
+            row = parse(values)
+        except (ValueError, InvalidOperation, KeyError, TypeError) as exc:
+            errors.append({'row': row_number, 'error': str(exc) or type(exc).__name__})
+            continue
+        if row[STARTING_QTY] < 0 or (row[PIECES_PER_CARTON] or 0) < 0:
+            errors.append({'row': row_number, 'error': "Quantities must not be negative"})
+            continue
+        rows.append(row)
+        numbers.append(row_number)
+    return rows, errors, numbers
+
+
+def _generic_row_parser(header: list[str]):
+    from .services import ReceivingImportService
+
+    service = ReceivingImportService()
+
+    def parse(values: list[str]) -> tuple:
+        batch = service._build_batch(service._record(dict(zip(header, values))))
+        return tuple(getattr(batch, field) for field in BATCH_FIELDS)
+
+    return parse
+
+
+def _typed_row_parser(header: list[str]):
+    from .services import ReceivingImportService
+
+    position = {name: index for index, name in enumerate(header)}
+    columns = [
+        (position['batch_id'], _required),
+        (position['sku'], _required),
+        (position['warehouse_id'], _required),
+        (position['date'], _date),
+        (position['quantity_received'], int),
+    ]
+    for column in ReceivingImportService.DECIMAL_FIELDS:
+        columns.append((position.get(column), _decimal))
+    columns += [
+        (position.get('product_name'), _text),
+        (position.get('pieces_per_carton'), _optional_int),
+        (position.get('accession'), _text),
+    ]
+
+    def parse(values: list[str]) -> tuple:
+        return tuple(convert(values[index] if index is not None and index < len(values) else '') for index, convert in columns)
+
+    return parse
+
+
+def _required(value: str) -> str:
+    if not value:
+        raise ValueError("Missing value")
+    return value
+
+
+def _date(value: str) -> date:
+    if len(value) == 10:
+        return date.fromisoformat(value)
+    return datetime.fromisoformat(value).date()
+
+
+def _decimal(value: str) -> Decimal | None:
+    return Decimal(value) if value else None
+
+
+def _optional_int(value: str) -> int | None:
+    return int(value) if value else None
+
+
+def _text(value: str) -> str:
+    return value or ''
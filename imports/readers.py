@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import zipfile
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import BinaryIO, Iterable, Iterator
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+XLSX_WORKBOOK = 'xl/workbook.xml'
+
+
+def text_stream(binary: BinaryIO) -> Iterable[str]:
+    """CSV text lines from an upload, which may be plain, gzip, zip or xlsx.
+
+    The format is detected from the leading bytes. gzip and zip members are
+    decompressed as they are read and xlsx sheets are read row by row, so the
+    decoded file is never held in memory. ``binary`` must be seekable.
+    """
+    kind, binary = _detect(binary)
+    if kind == 'xlsx':
+        return _xlsx_lines(binary)
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+
+
+def decompressed(binary: BinaryIO) -> BinaryIO:
+    """Raw CSV bytes of a plain, gzip or zip upload, for the parallel parser."""
+    kind, binary = _detect(binary)
+    if kind == 'xlsx':
+        raise ValueError("xlsx files cannot be split for parallel parsing; convert to CSV first")
+    return binary
+
+
+def count_rows(binary: BinaryIO) -> int:
+    """Data rows in an upload (lines less the header), used for progress estimates."""
+    kind, binary = _detect(binary)
+    if kind == 'xlsx':
+        workbook = _load_workbook(binary)
+        try:
+            return max((workbook.worksheets[0].max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+    lines, last = 0, b'\n'
+    while block := binary.read(1024 * 1024):
+        lines += block.count(b'\n')
+        last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def open_upload(request) -> Iterable[str]:
+    """CSV lines of an import upload without reading it into memory first.
+
+    Multipart uploads are read straight from Django's upload file, which is
+    spooled to disk for large files, and raw request bodies from the body
+    bytes; both may be compressed. Form or JSON ``file`` strings are plain text.
+    """
+    binary = _binary_upload(request)
+    if binary is not None:
+        return text_stream(binary)
+    return io.StringIO(request.data.get('file'), newline='')
+
+
+def upload_file(request, name: str) -> File:
+    """The upload, still compressed if it was, as a Django ``File`` for a ``FileField``."""
+    content_type = request.content_type or ''
+    if content_type.startswith('multipart/form-data'):
+        upload = request.FILES.get('file')
+        if upload is not None:
+            return upload
+    binary = _binary_upload(request)
+    if binary is not None:
+        return ContentFile(binary.read(), name=name)
+    return ContentFile(request.data.get('file').encode('utf-8'), name=name)
+
+
+def _binary_upload(request) -> BinaryIO | None:
+    content_type = request.content_type or ''
+    if content_type.startswith('multipart/form-data'):
+        upload = request.FILES.get('file')
+        if upload is not None:
+            upload.open('rb')
+            return upload.file
+    if content_type.startswith(('multipart/form-data', 'application/x-www-form-urlencoded', 'application/json')):
+        if request.data.get('file'):
+            return None
+    return io.BytesIO(request.body)
+
+
+def _detect(binary: BinaryIO) -> tuple[str, BinaryIO]:
+    head = binary.read(4)
+    binary.seek(0)
+    if head.startswith(GZIP_MAGIC):
+        with _gzip_errors():
+            return 'csv', _GzipUpload(fileobj=binary, mode='rb')
+    if head == ZIP_MAGIC:
+        try:
+            archive = zipfile.ZipFile(binary)
+        except zipfile.BadZipFile as exc:
+            raise ValueError(f"Unreadable zip upload: {exc}")
+        names = archive.namelist()
+        if XLSX_WORKBOOK in names:
+            return 'xlsx', binary
+        members = [name for name in names if not name.endswith('/') and not name.startswith('__MACOSX/')]
+        if len(members) != 1:
+            raise ValueError("Zip uploads must contain exactly one file")
+        return _detect(archive.open(members[0]))
+    return 'csv', binary
+
+
+@contextmanager
+def _gzip_errors():
+    try:
+        yield
+    except (OSError, EOFError, zlib.error) as exc:
+        raise ValueError("not a valid gzip file") from exc
+
+
+class _GzipUpload(gzip.GzipFile):
+    """``GzipFile`` that reports corrupt or truncated data as ``ValueError`` while it is read."""
+
+    def read(self, size=-1):
+        with _gzip_errors():
+            return super().read(size)
+
+    def read1(self, size=-1):
+        with _gzip_errors():
+            return super().read1(size)
+
+    def peek(self, n):
+        with _gzip_errors():
+            return super().peek(n)
+
+    def readline(self, size=-1):
+        with _gzip_errors():
+            return super().readline(size)
+
+
+def _load_workbook(binary: BinaryIO):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("xlsx uploads need the openpyxl package")
+    return load_workbook(binary, read_only=True, data_only=True)
+
+
+def _xlsx_lines(binary: BinaryIO) -> Iterator[str]:
+    """First worksheet as CSV lines, one row at a time."""
+    workbook = _load_workbook(binary)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            writer.writerow([_cell_text(value) for value in row])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    finally:
+        workbook.close()
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
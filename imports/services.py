@@ -2,15 +2,24 @@ from __future__ import annotations
 
 import csv
 import hashlib
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from io import StringIO
-from typing import Iterable, List
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List
 
 from django.db import transaction
+from django.utils import timezone
 
+from inventory.catalog import product_cache, warehouse_cache
+from inventory.fba import FBAAllocationService, FBAExportRow, FBAPlanRow
 from inventory.models import Batch, ManualOrders, Product, SellerboardMetrics
+from inventory.receipts import ReceiptLine, ReceiptService
+
+from .models import ImportRun
+from .parallel import BATCH_FIELDS, parse_receiving
+from .runs import changed_keys, fail_run, finish_run, hashed_lines, row_fingerprint, start_run, store_fingerprints
 
 
 @dataclass
@@ -23,6 +32,45 @@ class ReceivingRecord:
     metadata: dict
 
 
+@dataclass
+class ValidationReport:
+    """Outcome of a dry run: every row-level error plus what a real import would do."""
+
+    rows: int
+    errors: list[dict]
+    summary: dict = field(default_factory=dict)
+
+    @classmethod
+    def header_error(cls, exc: Exception) -> ValidationReport:
+        return cls(rows=0, errors=[{'row': 1, 'error': str(exc)}])
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def as_dict(self) -> dict:
+        return {'dry_run': True, 'valid': self.valid, 'rows': self.rows, 'errors': self.errors, **self.summary}
+
+
+class ImportValidationError(ValueError):
+    """Raised with every row-level problem found before any row is written."""
+
+    def __init__(self, errors: list[dict]):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+def _lines(lines: Iterable[str] | str) -> Iterable[str]:
+    """CSV lines from an iterable of lines, or from a whole file passed as one string."""
+    return StringIO(lines) if isinstance(lines, str) else lines
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 class ReceivingImportService:
     REQUIRED_FIELDS = {
         'date',
@@ -31,112 +79,466 @@ class ReceivingImportService:
         'quantity_received',
         'warehouse_id',
     }
+    DECIMAL_FIELDS = {
+        'amazon_stn_price': 'amazon_stn_price',
+        'ewaybill_price': 'ewaybill_price',
+        'gst_rate_pct': 'gst_rate_pct_override',
+        'base_cost_inr': 'base_cost_inr',
+        'base_cost_rmb': 'base_cost_rmb',
+        'base_cost_usd': 'base_cost_usd',
+    }
+    chunk_size = 2000
+
+    def __init__(self, user=None):
+        self.user = user
+        self._receipts: ReceiptService | None = None
+
+    @property
+    def receipts(self) -> ReceiptService:
+        if self.user is None:
+            raise ValueError("A user is required to record receipts")
+        if self._receipts is None:
+            self._receipts = ReceiptService(self.user, skip_existing=True)
+        return self._receipts
 
     def parse(self, raw: str) -> List[ReceivingRecord]:
-        reader = csv.DictReader(StringIO(raw))
-        records: List[ReceivingRecord] = []
+        return list(self.iter_records(StringIO(raw)))
+
+    def iter_records(self, lines: Iterable[str]) -> Iterator[ReceivingRecord]:
+        """Yield records one at a time from any iterable of CSV lines, e.g. an open upload."""
+        return self.records(self.reader(lines))
+
+    def reader(self, lines: Iterable[str]) -> csv.DictReader:
+        """A CSV reader over ``lines`` whose header has been checked for the required columns."""
+        reader = csv.DictReader(lines)
+        missing = self.REQUIRED_FIELDS - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        return reader
+
+    def records(self, reader: csv.DictReader) -> Iterator[ReceivingRecord]:
         for row in reader:
-            missing = self.REQUIRED_FIELDS - row.keys()
-            if missing:
-                raise ValueError(f"Missing columns: {missing}")
-            metadata = {k: v for k, v in row.items() if k not in self.REQUIRED_FIELDS}
-            records.append(
-                ReceivingRecord(
-                    date=datetime.fromisoformat(row['date']),
-                    batch_id=row['batch_id'],
-                    sku=row['sku'],
-                    quantity_received=int(row['quantity_received']),
-                    warehouse_id=row['warehouse_id'],
-                    metadata=metadata,
-                )
-            )
-        return records
+            yield self._record(row)
+
+    def _record(self, row: dict) -> ReceivingRecord:
+        metadata = {k: v for k, v in row.items() if k not in self.REQUIRED_FIELDS}
+        return ReceivingRecord(
+            date=datetime.fromisoformat(row['date']),
+            batch_id=row['batch_id'],
+            sku=row['sku'],
+            quantity_received=int(row['quantity_received']),
+            warehouse_id=row['warehouse_id'],
+            metadata=metadata,
+        )
+
+    def validate(self, lines: Iterable[str]) -> ValidationReport:
+        """Check every row without writing: conversions, known SKUs and warehouses, existing batches.
+
+        Costs three queries whatever the file size.
+        """
+        try:
+            reader = self.reader(lines)
+        except ValueError as exc:
+            return ValidationReport.header_error(exc)
+        batches, errors = self._check(enumerate(reader, start=2))
+        existing = set(
+            Batch.objects.filter(batch_id__in={batch.batch_id for batch in batches}).values_list('batch_id', flat=True)
+        )
+        would_create = would_skip = 0
+        for batch in batches:
+            if batch.batch_id in existing:
+                would_skip += 1
+            else:
+                existing.add(batch.batch_id)
+                would_create += 1
+        return ValidationReport(
+            rows=len(batches) + len(errors), errors=errors, summary={'would_create': would_create, 'would_skip': would_skip}
+        )
+
+    def _check(self, numbered_rows: Iterable[tuple[int, dict]]) -> tuple[list[Batch], list[dict]]:
+        """Batches for the rows that convert and name a known SKU and warehouse, plus one error per other row."""
+        converted: list[tuple[int, Batch]] = []
+        errors: list[dict] = []
+        for row_number, row in numbered_rows:
+            try:
+                batch = self._build_batch(self._record(row))
+            except (ValueError, TypeError) as exc:
+                errors.append({'row': row_number, 'batch_id': row.get('batch_id'), 'error': str(exc)})
+                continue
+            if batch.starting_qty < 0 or (batch.pieces_per_carton or 0) < 0:
+                errors.append({'row': row_number, 'batch_id': batch.batch_id, 'error': "Quantities must not be negative"})
+                continue
+            converted.append((row_number, batch))
+        unknown = self._catalog_errors(
+            [(row_number, batch.batch_id, batch.sku_id, batch.warehouse_id) for row_number, batch in converted]
+        )
+        rejected = {error['row'] for error in unknown}
+        batches = [batch for row_number, batch in converted if row_number not in rejected]
+        errors = sorted(errors + unknown, key=lambda error: error['row'])
+        return batches, errors
+
+    @staticmethod
+    def _catalog_errors(rows: list[tuple[int, str, str, str]]) -> list[dict]:
+        """An error for each ``(row number, batch_id, sku, warehouse_id)`` naming an unknown SKU or warehouse.
+
+        SKUs and warehouses are looked up through the catalog caches.
+        """
+        skus = set(product_cache.get_many(sku for _, _, sku, _ in rows))
+        warehouses = set(warehouse_cache.get_many(warehouse_id for *_, warehouse_id in rows))
+        errors = []
+        for row_number, batch_id, sku, warehouse_id in rows:
+            if sku not in skus:
+                errors.append({'row': row_number, 'batch_id': batch_id, 'error': f"Unknown SKU {sku!r}"})
+            elif warehouse_id not in warehouses:
+                errors.append({'row': row_number, 'batch_id': batch_id, 'error': f"Unknown warehouse {warehouse_id!r}"})
+        return errors
+
+    def apply_chunk(self, numbered_rows: list[tuple[int, dict]]) -> int:
+        """Check ``(row number, CSV row)`` pairs and receive them; returns batches created.
+
+        Any bad row raises :class:`ImportValidationError` listing every bad row
+        of the chunk before anything is written. Good rows are received through
+        :class:`ReceiptService` onto a single receipt movement with its lines and
+        ledger rows; rows whose batch already exists are skipped.
+        """
+        batches, errors = self._check(numbered_rows)
+        if errors:
+            raise ImportValidationError(errors)
+        return self.receipts.receive(ReceiptLine(batch=batch) for batch in batches)
 
     @transaction.atomic
-    def apply(self, records: Iterable[ReceivingRecord]):
-        for record in records:
-            batch, created = Batch.objects.get_or_create(
-                batch_id=record.batch_id,
-                defaults={
-                    'sku_id': record.sku,
-                    'warehouse_id': record.warehouse_id,
-                    'received_date': record.date,
-                    'starting_qty': record.quantity_received,
-                    'current_qty': record.quantity_received,
-                },
+    def import_file(self, binary: BinaryIO, *, workers: int | None = None, typed: bool = True) -> tuple[int, int]:
+        """Parse ``binary`` across ``workers`` processes and apply the rows in file order.
+
+        Meant for large backfills. Workers check conversions and quantity signs;
+        SKUs and warehouses are checked here before each block is written. Any
+        invalid row aborts the whole import with :class:`ImportValidationError`
+        listing the bad rows of its block. Returns ``(rows read, batches created)``.
+        """
+        positions = [BATCH_FIELDS.index(name) for name in ('batch_id', 'sku_id', 'warehouse_id')]
+        rows = created = 0
+        for values, errors, numbers in parse_receiving(binary, workers=workers, typed=typed):
+            errors += self._catalog_errors(
+                [(number, *(row[index] for index in positions)) for number, row in zip(numbers, values)]
             )
-            if not created:
-                continue
-            for decimal_field in (
-                'amazon_stn_price',
-                'ewaybill_price',
-                'gst_rate_pct',
-                'base_cost_inr',
-                'base_cost_rmb',
-                'base_cost_usd',
-            ):
-                raw_value = record.metadata.get(decimal_field)
-                if raw_value in (None, ''):
-                    value = None
-                else:
-                    value = Decimal(str(raw_value))
-                setattr(batch, decimal_field if decimal_field != 'gst_rate_pct' else 'gst_rate_pct_override', value)
-            batch.ewaybill_product_name = record.metadata.get('product_name') or batch.ewaybill_product_name
-            pieces_per_carton = record.metadata.get('pieces_per_carton')
-            batch.pieces_per_carton = int(pieces_per_carton) if pieces_per_carton else batch.pieces_per_carton
-            accession = record.metadata.get('accession')
-            if accession:
-                batch.accession = accession
-            batch.save()
-
-
-SEEN_SELLERBOARD_HASHES: set[str] = set()
+            if errors:
+                raise ImportValidationError(sorted(errors, key=lambda error: error['row']))
+            rows += len(values)
+            for chunk in chunked(values, self.chunk_size):
+                created += self.receipts.receive(ReceiptLine(batch=Batch(**dict(zip(BATCH_FIELDS, row)))) for row in chunk)
+        return rows, created
+
+    @transaction.atomic
+    def import_lines(self, lines: Iterable[str]) -> tuple[int, int]:
+        """Stream-parse and apply ``chunk_size`` rows at a time; returns ``(rows read, batches created)``.
+
+        A bad row rolls the whole import back with :class:`ImportValidationError`.
+        Row numbers count the header as row 1.
+        """
+        rows = created = 0
+        for chunk in chunked(enumerate(self.reader(lines), start=2), self.chunk_size):
+            created += self.apply_chunk(chunk)
+            rows += len(chunk)
+        return rows, created
+
+    def _build_batch(self, record: ReceivingRecord) -> Batch:
+        batch = Batch(
+            batch_id=record.batch_id,
+            sku_id=record.sku,
+            warehouse_id=record.warehouse_id,
+            received_date=record.date.date(),
+            starting_qty=record.quantity_received,
+            current_qty=record.quantity_received,
+        )
+        for column, attname in self.DECIMAL_FIELDS.items():
+            raw_value = record.metadata.get(column)
+            try:
+                setattr(batch, attname, None if raw_value in (None, '') else Decimal(str(raw_value)))
+            except InvalidOperation:
+                raise ValueError(f"Invalid {column} {raw_value!r}") from None
+        batch.ewaybill_product_name = record.metadata.get('product_name') or ''
+        pieces_per_carton = record.metadata.get('pieces_per_carton')
+        batch.pieces_per_carton = int(pieces_per_carton) if pieces_per_carton else None
+        batch.accession = record.metadata.get('accession') or ''
+        return batch
 
 
 class SellerboardImportService:
+    SOURCE = ImportRun.SOURCE_SELLERBOARD
     REQUIRED_FIELDS = {
         'sku',
         'Estimated Sales Velocity',
         'FBA/FBM Stock',
         'Reserved',
     }
+    UPDATE_FIELDS = ['adu', 'fba_available', 'fba_reserved', 'recommended_quantity', 'as_of_ts']
+    batch_size = 2000
 
-    def parse(self, raw: str, *, as_of: datetime | None = None) -> list[SellerboardMetrics]:
-        content_hash = hashlib.sha256(raw.encode('utf-8')).hexdigest()
-        if content_hash in SEEN_SELLERBOARD_HASHES:
+    def __init__(self):
+        self.run: ImportRun | None = None
+
+    def parse(self, lines: Iterable[str] | str, *, as_of: datetime | None = None) -> list[SellerboardMetrics]:
+        """Upsert the metrics of every changed SKU atomically, creating unknown products on the way.
+
+        ``lines`` is read once, hashing it for duplicate detection as it is
+        parsed. All rows are validated before anything is written; failures raise
+        :class:`ImportValidationError` listing every bad row. A file already
+        imported returns ``[]`` and leaves ``self.run`` as ``None``; rows whose
+        values match the last import are not rewritten.
+        """
+        digest = hashlib.sha256()
+        metrics_by_sku, errors, rows_total = self._read(hashed_lines(_lines(lines), digest), as_of or timezone.now())
+        self.run = start_run(self.SOURCE, digest.hexdigest())
+        if self.run is None:
             return []
-        reader = csv.DictReader(StringIO(raw))
-        metrics_list = []
-        for row in reader:
-            missing = self.REQUIRED_FIELDS - row.keys()
-            if missing:
-                raise ValueError(f"Missing columns: {missing}")
-            sku = row['sku']
-            product, _ = Product.objects.get_or_create(sku=sku, defaults={'title': sku})
-            metrics, _ = SellerboardMetrics.objects.get_or_create(sku=product)
-            metrics.adu = float(row['Estimated Sales Velocity'] or 0)
-            metrics.fba_available = int(row['FBA/FBM Stock'] or 0)
-            metrics.fba_reserved = int(row['Reserved'] or 0)
-            metrics.as_of_ts = as_of or datetime.utcnow()
-            metrics.recommended_quantity = int(row.get('Recommended quantity for reordering') or 0)
-            metrics.save()
-            metrics_list.append(metrics)
-        SEEN_SELLERBOARD_HASHES.add(content_hash)
+        try:
+            if errors:
+                raise ImportValidationError(errors)
+            metrics_list = self._apply(metrics_by_sku)
+        except Exception as exc:
+            fail_run(self.run, exc)
+            raise
+        finish_run(self.run, rows_total=rows_total, rows_written=len(metrics_list))
         return metrics_list
 
+    def validate(self, lines: Iterable[str]) -> ValidationReport:
+        try:
+            metrics_by_sku, errors, rows = self._read(lines, timezone.now())
+        except ValueError as exc:
+            return ValidationReport.header_error(exc)
+        changed = changed_keys(self.SOURCE, self._fingerprints(metrics_by_sku))
+        known = set(product_cache.get_many(metrics_by_sku))
+        return ValidationReport(
+            rows=rows,
+            errors=errors,
+            summary={
+                'would_update': len(changed),
+                'unchanged': len(metrics_by_sku) - len(changed),
+                'new_products': len(metrics_by_sku.keys() - known),
+            },
+        )
+
+    def _read(self, lines: Iterable[str], as_of: datetime) -> tuple[dict[str, SellerboardMetrics], list[dict], int]:
+        reader = csv.DictReader(lines)
+        missing = self.REQUIRED_FIELDS - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        metrics_by_sku: dict[str, SellerboardMetrics] = {}
+        errors: list[dict] = []
+        rows = 0
+        for row_number, row in enumerate(reader, start=2):
+            rows += 1
+            try:
+                metrics = SellerboardMetrics(
+                    sku_id=row['sku'],
+                    adu=float(row['Estimated Sales Velocity'] or 0),
+                    fba_available=int(row['FBA/FBM Stock'] or 0),
+                    fba_reserved=int(row['Reserved'] or 0),
+                    recommended_quantity=int(row.get('Recommended quantity for reordering') or 0),
+                    as_of_ts=as_of,
+                )
+            except ValueError as exc:
+                errors.append({'row': row_number, 'sku': row['sku'], 'error': str(exc)})
+                continue
+            metrics_by_sku[row['sku']] = metrics
+        return metrics_by_sku, errors, rows
+
+    @staticmethod
+    def _fingerprints(metrics_by_sku: dict[str, SellerboardMetrics]) -> dict[str, str]:
+        return {
+            sku: row_fingerprint(m.adu, m.fba_available, m.fba_reserved, m.recommended_quantity)
+            for sku, m in metrics_by_sku.items()
+        }
+
+    def _apply(self, metrics_by_sku: dict[str, SellerboardMetrics]) -> list[SellerboardMetrics]:
+        fingerprints = self._fingerprints(metrics_by_sku)
+        changed = changed_keys(self.SOURCE, fingerprints)
+        metrics_list = [metrics for sku, metrics in metrics_by_sku.items() if sku in changed]
+        with transaction.atomic():
+            Product.objects.bulk_create(
+                [Product(sku=metrics.sku_id, title=metrics.sku_id) for metrics in metrics_list],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            SellerboardMetrics.objects.bulk_create(
+                metrics_list,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=self.UPDATE_FIELDS,
+            )
+            store_fingerprints(self.SOURCE, fingerprints, changed)
+        return metrics_list
+
+
+@dataclass
+class ManualOrdersResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    changed_skus: list[str] = field(default_factory=list)
+
+    @property
+    def written(self) -> int:
+        return self.created + self.updated
+
 
 class ManualOrdersImportService:
+    SOURCE = ImportRun.SOURCE_MANUAL_ORDERS
     REQUIRED_FIELDS = {'sku', 'ordered_1', 'ordered_2', 'ordered_3'}
+    QUANTITY_FIELDS = ('ordered_1', 'ordered_2', 'ordered_3')
+    batch_size = 2000
 
-    def parse(self, raw: str):
-        reader = csv.DictReader(StringIO(raw))
-        for row in reader:
-            missing = self.REQUIRED_FIELDS - row.keys()
-            if missing:
-                raise ValueError(f"Missing columns: {missing}")
-            product, _ = Product.objects.get_or_create(sku=row['sku'], defaults={'title': row['sku']})
-            manual, _ = ManualOrders.objects.get_or_create(sku=product)
-            manual.ordered_1 = int(row['ordered_1'] or 0)
-            manual.ordered_2 = int(row['ordered_2'] or 0)
-            manual.ordered_3 = int(row['ordered_3'] or 0)
-            manual.save()
+    def __init__(self):
+        self.run: ImportRun | None = None
+
+    def parse(self, lines: Iterable[str] | str) -> ManualOrdersResult:
+        """Upsert the manual orders of every SKU whose quantities changed, in one transaction.
+
+        ``lines`` is read once, hashing it for duplicate detection as it is
+        parsed. Existing rows are loaded in one query and compared in memory;
+        changed rows are written with a single ``INSERT ... ON CONFLICT`` and
+        their SKUs returned so downstream recompute can be limited to them.
+        """
+        digest = hashlib.sha256()
+        rows, errors, _ = self._read(hashed_lines(_lines(lines), digest))
+        self.run = start_run(self.SOURCE, digest.hexdigest())
+        if self.run is None:
+            return ManualOrdersResult()
+        try:
+            if errors:
+                raise ImportValidationError(errors)
+            result = self._apply(rows)
+        except Exception as exc:
+            fail_run(self.run, exc)
+            raise
+        finish_run(self.run, rows_total=len(rows), rows_written=result.written)
+        return result
+
+    def validate(self, lines: Iterable[str]) -> ValidationReport:
+        try:
+            rows, errors, count = self._read(lines)
+        except ValueError as exc:
+            return ValidationReport.header_error(exc)
+        result = self._diff(rows)
+        known = set(product_cache.get_many(rows))
+        return ValidationReport(
+            rows=count,
+            errors=errors,
+            summary={
+                'would_create': result.created,
+                'would_update': result.updated,
+                'unchanged': result.unchanged,
+                'new_products': len(rows.keys() - known),
+            },
+        )
+
+    def _read(self, lines: Iterable[str]) -> tuple[dict[str, tuple[int, int, int]], list[dict], int]:
+        reader = csv.DictReader(lines)
+        missing = self.REQUIRED_FIELDS - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        rows: dict[str, tuple[int, int, int]] = {}
+        errors: list[dict] = []
+        count = 0
+        for row_number, row in enumerate(reader, start=2):
+            count += 1
+            try:
+                quantities = tuple(int(row[field] or 0) for field in self.QUANTITY_FIELDS)
+            except ValueError as exc:
+                errors.append({'row': row_number, 'sku': row['sku'], 'error': str(exc)})
+                continue
+            if min(quantities) < 0:
+                errors.append({'row': row_number, 'sku': row['sku'], 'error': "Quantities must not be negative"})
+                continue
+            rows[row['sku']] = quantities
+        return rows, errors, count
+
+    def _diff(self, rows: dict[str, tuple[int, int, int]]) -> ManualOrdersResult:
+        existing = {
+            sku: quantities
+            for sku, *quantities in ManualOrders.objects.filter(sku__in=list(rows)).values_list('sku', *self.QUANTITY_FIELDS)
+        }
+        result = ManualOrdersResult()
+        for sku, quantities in rows.items():
+            current = existing.get(sku)
+            if current is None:
+                result.created += 1
+            elif tuple(current) != quantities:
+                result.updated += 1
+            else:
+                result.unchanged += 1
+                continue
+            result.changed_skus.append(sku)
+        return result
+
+    def _apply(self, rows: dict[str, tuple[int, int, int]]) -> ManualOrdersResult:
+        with transaction.atomic():
+            result = self._diff(rows)
+            Product.objects.bulk_create(
+                [Product(sku=sku, title=sku) for sku in result.changed_skus],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            ManualOrders.objects.bulk_create(
+                [ManualOrders(sku_id=sku, **dict(zip(self.QUANTITY_FIELDS, rows[sku]))) for sku in result.changed_skus],
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=list(self.QUANTITY_FIELDS),
+            )
+        return result
+
+
+class FBAPlanImportService:
+    """Turns an FBA plan CSV (sku, quantity, fc_code) into the shipment export rows."""
+
+    REQUIRED_FIELDS = {'sku', 'quantity', 'fc_code'}
+
+    def __init__(self, warehouse_id: str):
+        self.allocation = FBAAllocationService(warehouse_id)
+
+    def plan(self, lines: Iterable[str]) -> list[FBAPlanRow]:
+        """Every plan row, checked against current stock; raises with all problems found."""
+        rows, errors = self._read(lines)
+        if not errors:
+            errors = self.allocation.check_plan(rows)
+        if errors:
+            raise ImportValidationError(errors)
+        return rows
+
+    def export(self, rows: list[FBAPlanRow]) -> list[FBAExportRow]:
+        """Allocate the plan; raises if stock changed since :meth:`plan` checked it."""
+        return self.allocation.import_plan(rows)
+
+    def validate(self, lines: Iterable[str]) -> ValidationReport:
+        try:
+            rows, errors = self._read(lines)
+        except ValueError as exc:
+            return ValidationReport.header_error(exc)
+        count = len(rows) + len(errors)
+        if not errors:
+            errors = self.allocation.check_plan(rows)
+        units: dict[str, int] = {}
+        for row in rows:
+            units[row.fc_code] = units.get(row.fc_code, 0) + row.quantity
+        return ValidationReport(rows=count, errors=errors, summary={'units_per_fc': units})
+
+    def _read(self, lines: Iterable[str]) -> tuple[list[FBAPlanRow], list[dict]]:
+        reader = csv.DictReader(lines)
+        missing = self.REQUIRED_FIELDS - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        rows: list[FBAPlanRow] = []
+        errors: list[dict] = []
+        for row_number, row in enumerate(reader, start=2):
+            try:
+                quantity = int(row['quantity'])
+            except (TypeError, ValueError):
+                errors.append({'row': row_number, 'sku': row['sku'], 'error': "quantity must be a whole number"})
+                continue
+            if quantity <= 0 or not row['fc_code']:
+                errors.append({'row': row_number, 'sku': row['sku'], 'error': "Rows need a positive quantity and an fc_code"})
+                continue
+            rows.append(FBAPlanRow(sku=row['sku'], quantity=quantity, fc_code=row['fc_code'].strip()))
+        return rows, errors
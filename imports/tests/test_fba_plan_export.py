@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from inventory.fba import FBAAllocationService, FBAPlanRow
+from inventory.models import Batch, Product, Warehouse
+
+
+@pytest.fixture
+def stock():
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    Product.objects.create(sku='FP1', title='Plan One', hsn_code='3304')
+    Product.objects.create(sku='FP2', title='Plan Two')
+    for batch_id, sku, day, qty, compliance in [
+        ('F1', 'FP1', 1, 5, Batch.COMPLIANCE_COMPLETE),
+        ('F2', 'FP1', 2, 10, Batch.COMPLIANCE_COMPLETE),
+        ('F3', 'FP2', 1, 4, Batch.COMPLIANCE_PENDING),
+    ]:
+        Batch.objects.create(
+            batch_id=batch_id, sku_id=sku, warehouse_id='blr', received_date=date(2024, 1, day),
+            starting_qty=qty, current_qty=qty, compliance_status=compliance, amazon_stn_price=Decimal('7.00'),
+        )
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='fba', password='pass'))
+    return client
+
+
+@pytest.mark.django_db
+def test_plan_rows_split_across_fcs_do_not_reuse_batch_units(stock):
+    plan = [FBAPlanRow('FP1', 6, 'DEL4'), FBAPlanRow('FP1', 3, 'BOM7')]
+
+    rows = FBAAllocationService('blr').import_plan(plan)
+
+    assert [(row.fc_code, row.batch_id, row.quantity_removed) for row in rows] == [
+        ('BOM7', 'F1', 3), ('DEL4', 'F1', 2), ('DEL4', 'F2', 4),
+    ]
+    assert rows[0].hsn_code == '3304'
+
+
+@pytest.mark.django_db
+def test_plan_endpoint_streams_csv_and_rejects_unshippable_plans(stock):
+    upload = 'sku,quantity,fc_code\nFP1,6,DEL4\nFP1,3,BOM7\n'
+
+    streamed = stock.post('/api/imports/fba-plan/?warehouse=blr', {'file': upload})
+    assert streamed.status_code == 200
+    table = list(csv.DictReader(io.StringIO(b''.join(streamed.streaming_content).decode())))
+    assert [(row['fc_code'], row['batch_id'], row['quantity_removed']) for row in table] == [
+        ('BOM7', 'F1', '3'), ('DEL4', 'F1', '2'), ('DEL4', 'F2', '4'),
+    ]
+
+    bad = stock.post('/api/imports/fba-plan/?warehouse=blr', {'file': 'sku,quantity,fc_code\nFP1,99,DEL4\nFP2,1,DEL4\nNOPE,1,X\n'})
+    assert bad.status_code == 400
+    assert [error['row'] for error in bad.json()['errors']] == [2, 3, 4]
+    dry = stock.post('/api/imports/fba-plan/?warehouse=blr&dry_run=1', {'file': upload}).json()
+    assert (dry['valid'], dry['units_per_fc']) == (True, {'DEL4': 6, 'BOM7': 3})
+
+
+@pytest.mark.django_db
+def test_plan_endpoint_writes_one_sheet_per_fc(stock):
+    openpyxl = pytest.importorskip('openpyxl')
+
+    response = stock.post(
+        '/api/imports/fba-plan/?warehouse=blr&output=xlsx', {'file': 'sku,quantity,fc_code\nFP1,6,DEL4\nFP1,3,BOM7\n'}
+    )
+
+    assert response.status_code == 200
+    workbook = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+    assert workbook.sheetnames == ['BOM7', 'DEL4']
+    assert [row[0] for row in workbook['DEL4'].iter_rows(values_only=True)] == ['batch_id', 'F1', 'F2']
+
+
+@pytest.mark.django_db
+def test_plan_that_stops_fitting_after_the_check_answers_400(stock, monkeypatch):
+    monkeypatch.setattr(FBAAllocationService, 'check_plan', lambda self, rows: [])
+
+    response = stock.post('/api/imports/fba-plan/?warehouse=blr', {'file': 'sku,quantity,fc_code\nFP1,99,DEL4\n'})
+
+    assert response.status_code == 400
+    assert not hasattr(response, 'streaming_content')
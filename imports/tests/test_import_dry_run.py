@@ -0,0 +1,53 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from imports.models import ImportRun
+from imports.services import ReceivingImportService
+from inventory.models import Batch, Product, SellerboardMetrics, Warehouse
+
+HEADER = 'date,batch_id,sku,quantity_received,warehouse_id,amazon_stn_price\n'
+
+
+@pytest.fixture
+def catalog():
+    Product.objects.create(sku='DRY', title='Dry')
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    Batch.objects.create(batch_id='DB0', sku_id='DRY', warehouse_id='blr', starting_qty=1, current_qty=1)
+
+
+@pytest.mark.django_db
+def test_receiving_dry_run_reports_every_error_in_three_queries(catalog, django_assert_num_queries):
+    raw = HEADER + (
+        '2024-05-01,DB0,DRY,1,blr,\n'
+        '2024-05-01,DB1,DRY,2,blr,9.5\n'
+        'not-a-date,DB2,DRY,2,blr,\n'
+        '2024-05-01,DB3,NOPE,2,blr,\n'
+        '2024-05-01,DB4,DRY,2,hyd,\n'
+        '2024-05-01,DB5,DRY,x,blr,abc\n'
+        '2024-05-01,DB6,DRY,-1,blr,\n'
+    )
+
+    with django_assert_num_queries(3):
+        report = ReceivingImportService().validate(raw.splitlines(keepends=True))
+
+    assert [error['row'] for error in report.errors] == [4, 5, 6, 7, 8]
+    assert (report.rows, report.summary) == (7, {'would_create': 1, 'would_skip': 1})
+    assert Batch.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_dry_run_endpoints_do_not_write():
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='dry', password='pass'))
+    sellerboard = 'sku,Estimated Sales Velocity,FBA/FBM Stock,Reserved\nDR1,1.5,3,0\nDR2,bad,3,0\n'
+
+    result = client.post('/api/imports/sellerboard/?dry_run=1', {'file': sellerboard}, format='json').json()
+
+    assert result == {
+        'dry_run': True, 'valid': False, 'rows': 2, 'errors': [{'row': 3, 'sku': 'DR2', 'error': result['errors'][0]['error']}],
+        'would_update': 1, 'unchanged': 0, 'new_products': 1,
+    }
+    missing = client.post('/api/imports/manual-orders/?dry_run=1', {'file': 'sku,ordered_1\nMO,1\n'}, format='json').json()
+    assert missing['valid'] is False and missing['errors'][0]['row'] == 1
+    assert not Product.objects.exists() and not SellerboardMetrics.objects.exists() and not ImportRun.objects.exists()
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from imports import jobs
+from imports.models import ImportJob, ImportRun
+from inventory.models import Batch, Product, SellerboardMetrics, Warehouse
+
+HEADER = 'date,batch_id,sku,quantity_received,warehouse_id\n'
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture
+def catalog():
+    Product.objects.create(sku='JOB', title='Job')
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    return get_user_model().objects.create_user(username='jobs', password='pass')
+
+
+def _rows(count):
+    return ''.join(f'2024-05-01,JB{index},JOB,{index + 1},blr\n' for index in range(count))
+
+
+@pytest.mark.django_db
+def test_background_upload_is_processed_by_worker_and_reports_progress(catalog):
+    client = APIClient()
+    client.force_authenticate(catalog)
+    upload = SimpleUploadedFile('receiving.csv', (HEADER + _rows(5)).encode())
+
+    queued = client.post('/api/imports/receiving/?background=1', {'file': upload}, format='multipart')
+
+    assert queued.status_code == 202
+    assert not Batch.objects.exists()
+    job = jobs.claim('test-worker')
+    assert job.pk == queued.json()['job_id'] and job.rows_total == 5
+    jobs.run(job)
+    status = client.get(queued.json()['status_url']).json()
+    assert (status['status'], status['rows_processed'], status['rows_written'], status['errors']) == ('succeeded', 5, 5, [])
+    assert jobs.claim('test-worker') is None
+
+
+@pytest.mark.django_db
+def test_stale_job_resumes_from_last_checkpoint(catalog):
+    job = jobs.enqueue(ImportJob.SOURCE_RECEIVING, ContentFile((HEADER + _rows(4)).encode(), name='r.csv'), user=catalog)
+    ImportJob.objects.filter(pk=job.pk).update(
+        status=ImportJob.STATUS_RUNNING, rows_processed=2, heartbeat_at=timezone.now() - timedelta(hours=1)
+    )
+
+    job = jobs.run(jobs.claim('second-worker'))
+
+    assert (job.status, job.attempts, job.rows_processed, job.rows_written) == (ImportJob.STATUS_SUCCEEDED, 1, 4, 2)
+    assert sorted(Batch.objects.values_list('batch_id', flat=True)) == ['JB2', 'JB3']
+
+
+@pytest.mark.django_db
+def test_bad_row_fails_job_with_row_number_after_committed_chunks(catalog, monkeypatch):
+    monkeypatch.setattr('imports.services.ReceivingImportService.chunk_size', 2)
+    job = jobs.enqueue(ImportJob.SOURCE_RECEIVING, ContentFile((HEADER + _rows(3) + '2024-05-01,JBX,JOB,x,blr\n').encode(), name='r.csv'), user=catalog)
+
+    job = jobs.run(jobs.claim('worker'))
+
+    assert job.status == ImportJob.STATUS_FAILED
+    assert job.errors[0]['row'] == 5
+    assert job.rows_processed == 2
+
+
+@pytest.mark.django_db
+def test_attempt_whose_job_was_taken_over_writes_nothing(catalog):
+    content = 'sku,Estimated Sales Velocity,FBA/FBM Stock,Reserved\nJOB,1.5,10,0\n'
+    jobs.enqueue(ImportRun.SOURCE_SELLERBOARD, ContentFile(content.encode(), name='s.csv'))
+    first = jobs.claim('first-worker')
+    ImportJob.objects.filter(pk=first.pk).update(worker='second-worker', attempts=2)
+
+    jobs.run(first)
+
+    job = ImportJob.objects.get(pk=first.pk)
+    assert (job.status, job.worker, job.rows_processed) == (ImportJob.STATUS_RUNNING, 'second-worker', 0)
+    assert not SellerboardMetrics.objects.exists()
+    assert not ImportRun.objects.exists()
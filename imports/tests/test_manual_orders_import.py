@@ -0,0 +1,38 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from imports.services import ManualOrdersImportService
+from inventory.models import ManualOrders, Product
+
+HEADER = 'sku,ordered_1,ordered_2,ordered_3\n'
+
+
+@pytest.mark.django_db
+def test_manual_orders_upsert_reports_counts_and_changed_skus(django_assert_max_num_queries):
+    Product.objects.create(sku='MA', title='A')
+    Product.objects.create(sku='MB', title='B')
+    ManualOrders.objects.create(sku_id='MA', ordered_1=1, ordered_2=2, ordered_3=3, notes='keep me')
+    ManualOrders.objects.create(sku_id='MB', ordered_1=5)
+    raw = HEADER + 'MA,1,2,3\nMB,6,0,0\n' + ''.join(f'MN{index},{index},0,0\n' for index in range(50))
+
+    with django_assert_max_num_queries(10):
+        result = ManualOrdersImportService().parse(raw)
+
+    assert (result.created, result.updated, result.unchanged) == (50, 1, 1)
+    assert result.changed_skus[:2] == ['MB', 'MN0']
+    assert ManualOrders.objects.get(sku_id='MB').ordered_1 == 6
+    assert ManualOrders.objects.get(sku_id='MA').notes == 'keep me'
+    assert Product.objects.get(sku='MN49').title == 'MN49'
+
+
+@pytest.mark.django_db
+def test_manual_orders_view_returns_changed_skus():
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='manual', password='pass'))
+
+    first = client.post('/api/imports/manual-orders/', {'file': HEADER + 'MV,1,0,0\n'}, format='json').json()
+    again = client.post('/api/imports/manual-orders/', {'file': HEADER + 'MV,1,0,0\n'}, format='json').json()
+
+    assert (first['created'], first['changed_skus'], first['duplicate']) == (1, ['MV'], False)
+    assert again['duplicate'] is True
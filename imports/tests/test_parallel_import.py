@@ -0,0 +1,66 @@
+import io
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from imports.parallel import parse_receiving
+from imports.services import ImportValidationError, ReceivingImportService
+from inventory.models import Batch, Movement, Product, Warehouse
+
+HEADER = 'date,batch_id,sku,quantity_received,warehouse_id,amazon_stn_price,pieces_per_carton,product_name\n'
+
+
+def _csv(count):
+    body = ''.join(f'2024-05-0{1 + index % 9},PB{index},PAR,{index + 1},blr,{index}.25,,Widget\n' for index in range(count))
+    return (HEADER + body).encode()
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_typed_and_generic_parsers_agree_and_keep_file_order(workers):
+    data = _csv(300)
+
+    typed = [row for rows, *_ in parse_receiving(io.BytesIO(data), workers=workers, chunk_bytes=1000) for row in rows]
+    generic = [row for rows, *_ in parse_receiving(io.BytesIO(data), workers=1, chunk_bytes=1000, typed=False) for row in rows]
+
+    assert typed == generic
+    assert [row[0] for row in typed] == [f'PB{index}' for index in range(300)]
+    assert typed[3][3:6] == (typed[3][3], 4, Decimal('3.25'))
+
+
+def test_errors_carry_file_row_numbers():
+    data = _csv(50) + b'2024-05-01,BAD,PAR,x,blr,,,\n' + b'2024-05-01,BAD2,PAR,1,blr,abc,,\n'
+
+    errors = [error for _, block_errors, _ in parse_receiving(io.BytesIO(data), workers=1, chunk_bytes=256) for error in block_errors]
+
+    assert [error['row'] for error in errors] == [52, 53]
+
+
+@pytest.mark.django_db
+def test_import_file_writes_one_receipt():
+    Product.objects.create(sku='PAR', title='Parallel')
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    service = ReceivingImportService(user=get_user_model().objects.create_user(username='backfill', password='pass'))
+    service.chunk_size = 40
+
+    assert service.import_file(io.BytesIO(_csv(100)), workers=1) == (100, 100)
+    assert Movement.objects.get().lines.count() == 100
+    assert Batch.objects.get(batch_id='PB9').amazon_stn_price == Decimal('9.25')
+    with pytest.raises(ImportValidationError):
+        service.import_file(io.BytesIO(_csv(1) + b'2024-05-01,,PAR,1,blr,,,\n'), workers=1)
+
+
+@pytest.mark.django_db
+def test_import_file_rejects_negative_quantities_and_unknown_skus_with_row_numbers():
+    Product.objects.create(sku='PAR', title='Parallel')
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    service = ReceivingImportService(user=get_user_model().objects.create_user(username='backfill', password='pass'))
+    data = _csv(2) + b'2024-05-01,NEG,PAR,-3,blr,,,\n' + b'2024-05-01,GHOST,NOPE,1,blr,,,\n' + b'2024-05-01,LOST,PAR,1,nowhere,,,\n'
+
+    with pytest.raises(ImportValidationError) as excinfo:
+        service.import_file(io.BytesIO(data), workers=1)
+
+    assert [(error['row'], error['error']) for error in excinfo.value.errors] == [
+        (4, "Quantities must not be negative"), (5, "Unknown SKU 'NOPE'"), (6, "Unknown warehouse 'nowhere'"),
+    ]
+    assert not Batch.objects.exists()
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from imports.services import ReceivingImportService
+from inventory.models import Batch, Movement, Product, SkuValuation, StockLedger, Warehouse
+
+HEADER = 'date,batch_id,sku,quantity_received,warehouse_id,amazon_stn_price,gst_rate_pct,pieces_per_carton\n'
+
+
+@pytest.fixture
+def catalog():
+    Product.objects.create(sku='RCV', title='Received')
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    return get_user_model().objects.create_user(username='receiver', password='pass')
+
+
+def _rows(count, start=0):
+    return ''.join(f'2024-05-0{1 + index % 9},RB{index},RCV,{index + 1},blr,9.50,18,12\n' for index in range(start, start + count))
+
+
+@pytest.mark.django_db
+def test_apply_inserts_in_chunks_and_skips_existing(catalog):
+    Batch.objects.create(batch_id='RB0', sku_id='RCV', warehouse_id='blr', starting_qty=1, current_qty=1)
+    service = ReceivingImportService(user=catalog)
+    service.chunk_size = 2
+
+    with CaptureQueriesContext(connection) as ctx:
+        imported, created = service.import_lines((HEADER + _rows(5)).splitlines(keepends=True))
+
+    assert (imported, created) == (5, 4)
+    statements = [q['sql'].split()[0] for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+    chunk = ['SELECT'] + ['INSERT'] * 6  # existing batch_ids; batches, lines, ledger, cost layers, valuation, rollup
+    catalog_lookups = ['SELECT', 'SELECT']  # SKUs and warehouses, cached after the first chunk
+    assert statements == [*catalog_lookups, *chunk[:1], 'INSERT', *chunk[1:], *chunk, *chunk]  # the movement is inserted once
+    receipt = Movement.objects.get()
+    assert (receipt.type, receipt.status, receipt.to_warehouse_id) == (Movement.TYPE_RECEIPT, Movement.STATUS_COMMITTED, 'blr')
+    assert receipt.lines.count() == 4
+    assert StockLedger.objects.filter(movement=receipt).aggregate(total=Sum('qty_in'))['total'] == 2 + 3 + 4 + 5
+    assert SkuValuation.objects.get(sku_id='RCV').on_hand_qty == 14
+    batch = Batch.objects.get(batch_id='RB3')
+    assert (batch.current_qty, batch.amazon_stn_price, batch.gst_rate_pct_override, batch.pieces_per_carton) == (
+        4, Decimal('9.50'), Decimal('18'), 12,
+    )
+
+
+@pytest.mark.django_db
+def test_receiving_view_streams_multipart_upload(catalog):
+    client = APIClient()
+    client.force_authenticate(catalog)
+    upload = SimpleUploadedFile('receiving.csv', (HEADER + _rows(3)).encode())
+
+    response = client.post('/api/imports/receiving/', {'file': upload}, format='multipart')
+
+    assert response.status_code == 201
+    assert response.json() == {'imported': 3, 'created': 3}
+    bad = SimpleUploadedFile('bad.csv', b'date,sku\n2024-01-01,RCV\n')
+    assert client.post('/api/imports/receiving/', {'file': bad}, format='multipart').status_code == 400
+
+
+@pytest.mark.django_db
+def test_receiving_view_rejects_bad_rows_with_row_numbers(catalog):
+    client = APIClient()
+    client.force_authenticate(catalog)
+    rows = _rows(2) + '2024-05-01,RBX,RCV,3,blr,abc,18,12\n2024-05-01,RBY,RCV,-1,blr,,,\n2024-05-01,RBZ,NOPE,1,blr,,,\n'
+    upload = SimpleUploadedFile('receiving.csv', (HEADER + rows).encode())
+
+    response = client.post('/api/imports/receiving/', {'file': upload}, format='multipart')
+
+    assert response.status_code == 400
+    assert [error['row'] for error in response.json()['errors']] == [4, 5, 6]
+    assert not Batch.objects.exists()
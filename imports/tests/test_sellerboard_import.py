@@ -0,0 +1,79 @@
+import hashlib
+
+import pytest
+
+from imports.models import ImportRun
+from imports.services import ImportValidationError, ManualOrdersImportService, SellerboardImportService
+from inventory.models import Product, SellerboardMetrics
+
+HEADER = 'sku,Estimated Sales Velocity,FBA/FBM Stock,Reserved,Recommended quantity for reordering\n'
+
+
+@pytest.mark.django_db
+def test_sellerboard_upserts_metrics_in_bulk(django_assert_max_num_queries):
+    Product.objects.create(sku='SB1', title='Known')
+    SellerboardMetrics.objects.create(sku_id='SB1', adu=1.0, fba_available=1)
+    raw = HEADER + 'SB1,2.5,40,3,100\nSB2,0.5,10,0,\n'
+
+    with django_assert_max_num_queries(10):
+        metrics = SellerboardImportService().parse(raw)
+
+    assert len(metrics) == 2
+    assert Product.objects.get(sku='SB2').title == 'SB2'
+    updated = SellerboardMetrics.objects.get(sku_id='SB1')
+    assert (updated.adu, updated.fba_available, updated.fba_reserved, updated.recommended_quantity) == (2.5, 40, 3, 100)
+
+
+@pytest.mark.django_db
+def test_sellerboard_reports_all_bad_rows_and_writes_nothing():
+    raw = HEADER + 'SB3,abc,1,0,0\nSB4,1,2,0,0\nSB5,1,x,0,0\n'
+
+    with pytest.raises(ImportValidationError) as excinfo:
+        SellerboardImportService().parse(raw)
+
+    assert [error['row'] for error in excinfo.value.errors] == [2, 4]
+    assert not Product.objects.filter(sku__in=['SB3', 'SB4', 'SB5']).exists()
+
+
+@pytest.mark.django_db
+def test_sellerboard_skips_reupload_and_writes_only_changed_skus():
+    first = HEADER + 'SB6,1.0,10,0,0\nSB7,2.0,20,0,0\n'
+    SellerboardImportService().parse(first)
+
+    duplicate = SellerboardImportService()
+    assert duplicate.parse(first) == [] and duplicate.run is None
+
+    service = SellerboardImportService()
+    written = service.parse(HEADER + 'SB6,1.0,10,0,0\nSB7,3.0,20,0,0\n')
+
+    assert [metrics.sku_id for metrics in written] == ['SB7']
+    assert (service.run.status, service.run.rows_total, service.run.rows_unchanged) == (ImportRun.STATUS_SUCCEEDED, 2, 1)
+    assert SellerboardMetrics.objects.get(sku_id='SB7').adu == 3.0
+
+
+@pytest.mark.django_db
+def test_failed_run_is_recorded_and_can_be_retried():
+    raw = HEADER + 'SB8,bad,1,0,0\n'
+    with pytest.raises(ImportValidationError):
+        SellerboardImportService().parse(raw)
+    with pytest.raises(ImportValidationError):
+        SellerboardImportService().parse(raw)
+
+    assert ImportRun.objects.filter(status=ImportRun.STATUS_FAILED).count() == 2
+
+
+@pytest.mark.django_db
+def test_manual_orders_write_only_changed_rows():
+    header = 'sku,ordered_1,ordered_2,ordered_3\n'
+    assert ManualOrdersImportService().parse(header + 'MO1,1,2,3\nMO2,0,0,1\n').written == 2
+    assert ManualOrdersImportService().parse(header + 'MO1,1,2,3\nMO2,0,0,5\n').written == 1
+
+
+@pytest.mark.django_db
+def test_streamed_upload_is_hashed_like_the_whole_file():
+    raw = HEADER + 'SB9,1.0,10,0,0\n'
+    service = SellerboardImportService()
+    service.parse(iter(raw.splitlines(keepends=True)))
+
+    assert service.run.content_hash == hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    assert SellerboardImportService().parse(raw) == []
@@ -0,0 +1,92 @@
+import gzip
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from imports.readers import count_rows, text_stream
+from inventory.models import Batch, ManualOrders, Product, Warehouse
+
+CSV = 'date,batch_id,sku,quantity_received,warehouse_id\n2024-05-01,GZ1,FMT,3,blr\n2024-05-02,GZ2,FMT,4,blr\n'
+
+
+def _zip(name, data):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _xlsx(rows):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('encode', [str.encode, lambda text: gzip.compress(text.encode()), lambda text: _zip('r.csv', text)])
+def test_text_stream_reads_plain_gzip_and_zip(encode):
+    data = encode(CSV)
+
+    assert ''.join(text_stream(io.BytesIO(data))) == CSV
+    assert count_rows(io.BytesIO(data)) == 2
+
+
+def test_xlsx_rows_become_csv_lines():
+    data = _xlsx([
+        ['date', 'batch_id', 'sku', 'quantity_received', 'warehouse_id'],
+        [datetime(2024, 5, 1), 'X1', 'FMT', 3, 'blr'],
+        [datetime(2024, 5, 2, 10, 30), 'X2', 'FMT', 4.0, None],
+    ])
+
+    assert list(text_stream(io.BytesIO(data))) == [
+        'date,batch_id,sku,quantity_received,warehouse_id\n',
+        '2024-05-01,X1,FMT,3,blr\n',
+        '2024-05-02T10:30:00,X2,FMT,4,\n',
+    ]
+
+
+@pytest.mark.django_db
+def test_import_views_accept_compressed_and_xlsx_uploads():
+    Product.objects.create(sku='FMT', title='Formats')
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='formats', password='pass'))
+
+    gz = SimpleUploadedFile('receiving.csv.gz', gzip.compress(CSV.encode()))
+    received = client.post('/api/imports/receiving/', {'file': gz}, format='multipart')
+    xlsx = SimpleUploadedFile('manual.xlsx', _xlsx([['sku', 'ordered_1', 'ordered_2', 'ordered_3'], ['FMT', 5, 0, 1]]))
+    manual = client.post('/api/imports/manual-orders/', {'file': xlsx}, format='multipart')
+
+    assert received.json() == {'imported': 2, 'created': 2}
+    assert Batch.objects.filter(batch_id__in=['GZ1', 'GZ2']).count() == 2
+    assert manual.status_code == 200
+    assert ManualOrders.objects.get(sku_id='FMT').ordered_1 == 5
+    truncated = SimpleUploadedFile('bad.zip', _zip('r.csv', CSV)[:40])
+    assert client.post('/api/imports/receiving/', {'file': truncated}, format='multipart').status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('path, content', [
+    ('/api/imports/receiving/', CSV),
+    ('/api/imports/receiving/?dry_run=1', CSV),
+    ('/api/imports/receiving/?background=1', CSV),
+    ('/api/imports/sellerboard/', 'sku,Estimated Sales Velocity,FBA/FBM Stock,Reserved\nFMT,1,2,0\n'),
+])
+def test_truncated_gzip_upload_answers_400(path, content, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='gzip', password='pass'))
+    truncated = SimpleUploadedFile('bad.csv.gz', gzip.compress((content * 50).encode())[:-20])
+
+    response = client.post(path, {'file': truncated}, format='multipart')
+
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'not a valid gzip file'
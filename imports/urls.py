@@ -1,6 +1,6 @@
 from django.urls import path
 
-from .views import ManualOrdersImportView, ReceivingImportView, SellerboardImportView
+from .views import FBAPlanImportView, ImportJobView, ManualOrdersImportView, ReceivingImportView, SellerboardImportView
 
 app_name = 'imports'
 
@@ -8,4 +8,6 @@ urlpatterns = [
     path('receiving/', ReceivingImportView.as_view(), name='receiving'),
     path('sellerboard/', SellerboardImportView.as_view(), name='sellerboard'),
     path('manual-orders/', ManualOrdersImportView.as_view(), name='manual-orders'),
+    path('fba-plan/', FBAPlanImportView.as_view(), name='fba-plan'),
+    path('jobs/<int:pk>/', ImportJobView.as_view(), name='job'),
 ]
@@ -1,38 +1,165 @@
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from rest_framework import permissions, response, status, views
 
+from inventory.fba import export_csv, export_xlsx
+from inventory.models import AllocationError
+
+from . import jobs
+from .models import ImportJob, ImportRun
+from .readers import open_upload, upload_file
 from .services import (
+    FBAPlanImportService,
+    ImportValidationError,
     ManualOrdersImportService,
     ReceivingImportService,
     SellerboardImportService,
 )
 
 
+def _background(request) -> bool:
+    return request.query_params.get('background') in ('1', 'true')
+
+
+def _enqueue(request, source: str):
+    """Store the upload as an ``ImportJob`` and answer 202 with where to poll for progress."""
+    try:
+        job = jobs.enqueue(source, upload_file(request, f'{source}.csv'), user=request.user)
+    except ValueError as exc:
+        return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return response.Response(
+        {'job_id': job.pk, 'status': job.status, 'status_url': reverse('imports:job', args=[job.pk])},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+def _dry_run(request) -> bool:
+    return request.query_params.get('dry_run') in ('1', 'true')
+
+
+def _validate(request, service):
+    """Dry-run report for the upload; an unreadable file answers 400."""
+    try:
+        return response.Response(service.validate(open_upload(request)).as_dict())
+    except ValueError as exc:
+        return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _run_summary(run, **counts) -> dict:
+    return {**counts, 'duplicate': run is None, 'run_id': run.pk if run else None}
+
+
 class ReceivingImportView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        content = request.data.get('file') or request.body.decode()
-        service = ReceivingImportService()
-        records = service.parse(content)
-        service.apply(records)
-        return response.Response({'imported': len(records)}, status=status.HTTP_201_CREATED)
+        if _background(request):
+            return _enqueue(request, ImportJob.SOURCE_RECEIVING)
+        if _dry_run(request):
+            return _validate(request, ReceivingImportService())
+        try:
+            imported, created = ReceivingImportService(user=request.user).import_lines(open_upload(request))
+        except ImportValidationError as exc:
+            return response.Response({'detail': str(exc), 'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response({'imported': imported, 'created': created}, status=status.HTTP_201_CREATED)
 
 
 class SellerboardImportView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        content = request.data.get('file') or request.body.decode()
+        if _background(request):
+            return _enqueue(request, ImportRun.SOURCE_SELLERBOARD)
+        if _dry_run(request):
+            return _validate(request, SellerboardImportService())
         service = SellerboardImportService()
-        metrics = service.parse(content)
-        return response.Response({'updated': len(metrics)}, status=status.HTTP_200_OK)
+        try:
+            metrics = service.parse(open_upload(request))
+        except ImportValidationError as exc:
+            return response.Response({'detail': str(exc), 'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        unchanged = service.run.rows_unchanged if service.run else 0
+        return response.Response(
+            _run_summary(service.run, updated=len(metrics), unchanged=unchanged), status=status.HTTP_200_OK
+        )
 
 
 class ManualOrdersImportView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        content = request.data.get('file') or request.body.decode()
+        if _background(request):
+            return _enqueue(request, ImportRun.SOURCE_MANUAL_ORDERS)
+        if _dry_run(request):
+            return _validate(request, ManualOrdersImportService())
         service = ManualOrdersImportService()
-        service.parse(content)
-        return response.Response({'status': 'ok'}, status=status.HTTP_200_OK)
+        try:
+            result = service.parse(open_upload(request))
+        except ImportValidationError as exc:
+            return response.Response({'detail': str(exc), 'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        summary = _run_summary(
+            service.run,
+            created=result.created,
+            updated=result.updated,
+            unchanged=result.unchanged,
+            changed_skus=result.changed_skus,
+        )
+        return response.Response({'status': 'ok', **summary}, status=status.HTTP_200_OK)
+
+
+class FBAPlanImportView(views.APIView):
+    """Allocate an FBA plan CSV from ``?warehouse=`` and stream the shipment export.
+
+    The plan is checked and allocated before the first row is sent, so a bad
+    plan still answers 400 and no row locks are held while the file streams.
+    ``?output=xlsx`` returns one sheet per FC instead of CSV sorted by FC.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        warehouse_id = request.query_params.get('warehouse')
+        if not warehouse_id:
+            return response.Response({'detail': "warehouse is required"}, status=status.HTTP_400_BAD_REQUEST)
+        service = FBAPlanImportService(warehouse_id)
+        if _dry_run(request):
+            return _validate(request, service)
+        try:
+            plan = service.plan(open_upload(request))
+        except ImportValidationError as exc:
+            return response.Response({'detail': str(exc), 'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = service.export(plan)
+        except (ValueError, AllocationError) as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if request.query_params.get('output') == 'xlsx':
+            spool = tempfile.TemporaryFile()
+            try:
+                export_xlsx(rows, spool)
+            except ValueError as exc:
+                spool.close()
+                return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            spool.seek(0)
+            return FileResponse(spool, as_attachment=True, filename='fba-shipment.xlsx')
+        stream = StreamingHttpResponse(export_csv(rows), content_type='text/csv')
+        stream['Content-Disposition'] = 'attachment; filename="fba-shipment.csv"'
+        return stream
+
+
+class ImportJobView(views.APIView):
+    """Progress of a background import: rows processed, errors and an ETA."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        return response.Response(jobs.job_payload(get_object_or_404(ImportJob, pk=pk)), status=status.HTTP_200_OK)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterator
+
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Batch
+
+DEFAULT_AGE_EDGES = (30, 60, 90, 180)
+DEFAULT_EXPIRY_EDGES = (30, 90, 180)
+
+
+@dataclass(frozen=True)
+class AgingBucket:
+    section: str
+    label: str
+    condition: Q
+
+    @property
+    def alias(self) -> str:
+        return f"{self.section}_{self.label}".replace("-", "_").replace("+", "_plus")
+
+
+def parse_edges(raw: str | None, default: tuple[int, ...]) -> tuple[int, ...]:
+    """Bucket edges in days from ``"30,60,90"``; they must be positive and ascending."""
+    if not raw:
+        return default
+    try:
+        edges = tuple(int(part) for part in raw.split(","))
+    except ValueError:
+        raise ValueError("bucket edges must be comma separated whole days")
+    if not edges or edges[0] <= 0 or list(edges) != sorted(set(edges)):
+        raise ValueError("bucket edges must be positive and ascending")
+    return edges
+
+
+class AgingReport:
+    """On-hand units and value per SKU or warehouse, bucketed by age and days to expiry.
+
+    Every bucket is a filtered ``SUM`` over the same grouped scan of batches with
+    stock, so the whole report is one query. Age is days since ``received_date``;
+    expiry buckets count days left, with ``expired`` and ``none`` for batches past
+    or without an ``expiry_date``.
+    """
+
+    GROUP_FIELDS = {"sku": "sku_id", "warehouse": "warehouse_id"}
+
+    def __init__(
+        self,
+        group_by: str = "sku",
+        *,
+        age_edges: tuple[int, ...] = DEFAULT_AGE_EDGES,
+        expiry_edges: tuple[int, ...] = DEFAULT_EXPIRY_EDGES,
+        sku: str | None = None,
+        warehouse: str | None = None,
+        today: date | None = None,
+    ):
+        if group_by not in self.GROUP_FIELDS:
+            raise ValueError(f"group_by must be one of {', '.join(self.GROUP_FIELDS)}")
+        self.group_by = group_by
+        self.sku = sku
+        self.warehouse = warehouse
+        self.today = today or timezone.localdate()
+        self.buckets = self._age_buckets(age_edges) + self._expiry_buckets(expiry_edges)
+
+    def _age_buckets(self, edges: tuple[int, ...]) -> list[AgingBucket]:
+        buckets, lower = [], 0
+        for upper in edges:
+            condition = Q(received_date__lte=self.today - timedelta(days=lower))
+            condition &= Q(received_date__gt=self.today - timedelta(days=upper))
+            buckets.append(AgingBucket("age", f"{lower}-{upper}", condition))
+            lower = upper
+        buckets.append(AgingBucket("age", f"{lower}+", Q(received_date__lte=self.today - timedelta(days=lower))))
+        return buckets
+
+    def _expiry_buckets(self, edges: tuple[int, ...]) -> list[AgingBucket]:
+        buckets, lower = [AgingBucket("expiry", "expired", Q(expiry_date__lt=self.today))], 0
+        for upper in edges:
+            condition = Q(expiry_date__gte=self.today + timedelta(days=lower))
+            condition &= Q(expiry_date__lt=self.today + timedelta(days=upper))
+            buckets.append(AgingBucket("expiry", f"{lower}-{upper}", condition))
+            lower = upper
+        buckets.append(AgingBucket("expiry", f"{lower}+", Q(expiry_date__gte=self.today + timedelta(days=lower))))
+        buckets.append(AgingBucket("expiry", "none", Q(expiry_date__isnull=True)))
+        return buckets
+
+    def queryset(self):
+        field = self.GROUP_FIELDS[self.group_by]
+        value = F("current_qty") * Coalesce("unit_cost", Value(Decimal("0")))
+        money = DecimalField(max_digits=16, decimal_places=2)
+        aggregates = {"on_hand_qty": Sum("current_qty"), "on_hand_value": Sum(value, output_field=money)}
+        for bucket in self.buckets:
+            aggregates[f"{bucket.alias}_qty"] = Sum("current_qty", filter=bucket.condition, default=0)
+            aggregates[f"{bucket.alias}_value"] = Sum(
+                value, filter=bucket.condition, output_field=money, default=Decimal("0")
+            )
+        queryset = Batch.objects.filter(current_qty__gt=0)
+        if self.sku:
+            queryset = queryset.filter(sku_id=self.sku)
+        if self.warehouse:
+            queryset = queryset.filter(warehouse_id=self.warehouse)
+        return queryset.values(field).annotate(**aggregates).order_by(field)
+
+    @property
+    def columns(self) -> list[str]:
+        flat = [self.group_by, "on_hand_qty", "on_hand_value"]
+        for bucket in self.buckets:
+            flat += [f"{bucket.alias}_qty", f"{bucket.alias}_value"]
+        return flat
+
+    def csv_rows(self) -> Iterator[list]:
+        """Header then one flat row per group, read from a server-side cursor."""
+        field = self.GROUP_FIELDS[self.group_by]
+        yield self.columns
+        for row in self.queryset().iterator(chunk_size=2000):
+            yield [row[field], *(row[column] for column in self.columns[1:])]
+
+    def payload(self) -> list[dict]:
+        field = self.GROUP_FIELDS[self.group_by]
+        rows = []
+        for row in self.queryset():
+            entry = {
+                self.group_by: row[field],
+                "on_hand_qty": row["on_hand_qty"],
+                "on_hand_value": str(row["on_hand_value"]),
+                "age": {},
+                "expiry": {},
+            }
+            for bucket in self.buckets:
+                entry[bucket.section][bucket.label] = {
+                    "qty": row[f"{bucket.alias}_qty"],
+                    "value": str(row[f"{bucket.alias}_value"]),
+                }
+            rows.append(entry)
+        return rows
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Hashable, Iterable
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from core.cache import TTLCache
+
+from .models import Product, Supplier, Warehouse
+
+
+class CatalogCache:
+    """In-process cache of catalog rows by primary key, with bulk ``get_many``.
+
+    Entries are stamped with the cache's version; :meth:`invalidate` bumps it,
+    so every older entry misses at once without walking the cache. Writes in
+    this process invalidate when they happen and again on commit, so a read
+    racing the writing transaction cannot leave a stale row behind. Other
+    processes converge within ``INVENTORY_CATALOG_CACHE_TTL`` seconds. Misses
+    are not cached, and cached instances are shared: treat them as read-only.
+    """
+
+    def __init__(self, model: type[models.Model], *, max_entries: int, ttl: float):
+        self.model = model
+        self._entries = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict:
+        """Rows for ``keys`` that exist, fetching every miss in one query."""
+        version = self._version
+        found, missing = {}, []
+        for key in set(keys):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                found[key] = entry[1]
+            else:
+                missing.append(key)
+        if missing:
+            fetched = self.model.objects.in_bulk(missing)
+            for key, row in fetched.items():
+                self._entries.set(key, (version, row))
+            found.update(fetched)
+        return found
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+        transaction.on_commit(self._bump_after_commit)
+
+    def _bump_after_commit(self):
+        with self._lock:
+            self._version += 1
+
+    def clear(self):
+        self._entries.clear()
+
+
+product_cache = CatalogCache(
+    Product, max_entries=settings.INVENTORY_CATALOG_CACHE_SIZE, ttl=settings.INVENTORY_CATALOG_CACHE_TTL
+)
+warehouse_cache = CatalogCache(
+    Warehouse, max_entries=settings.INVENTORY_CATALOG_CACHE_SIZE, ttl=settings.INVENTORY_CATALOG_CACHE_TTL
+)
+CATALOG_CACHES = {Product: product_cache, Warehouse: warehouse_cache}
+
+
+@dataclass
+class UpsertResult:
+    created: int
+    updated: int
+    unchanged: int
+
+
+class ProductUpsertService:
+    """Creates or updates many products against a single fetch of the existing rows.
+
+    Only fields present in each item are compared, and only rows with an actual
+    difference are written, so re-sending an unchanged catalog issues no writes.
+    """
+
+    batch_size = 1000
+
+    def upsert(self, items: Iterable[dict]) -> UpsertResult:
+        incoming = {item['sku']: item for item in items}
+        self._check_suppliers(incoming.values())
+        existing = Product.objects.in_bulk(list(incoming))
+        to_create: list[Product] = []
+        to_update: list[Product] = []
+        changed_fields: set[str] = set()
+        now = timezone.now()
+        for sku, item in incoming.items():
+            product = existing.get(sku)
+            if product is None:
+                to_create.append(Product(**item))
+                continue
+            changed = [field for field, value in item.items() if getattr(product, field) != value]
+            if not changed:
+                continue
+            for field in changed:
+                setattr(product, field, item[field])
+            product.updated_at = now
+            changed_fields.update(changed)
+            to_update.append(product)
+        with transaction.atomic():
+            if to_create:
+                Product.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if to_update:
+                Product.objects.bulk_update(to_update, [*sorted(changed_fields), 'updated_at'], batch_size=self.batch_size)
+                product_cache.invalidate()
+        return UpsertResult(
+            created=len(to_create),
+            updated=len(to_update),
+            unchanged=len(incoming) - len(to_create) - len(to_update),
+        )
+
+    @staticmethod
+    def _check_suppliers(items: Iterable[dict]):
+        supplier_ids = {item['supplier_id'] for item in items if item.get('supplier_id')}
+        if not supplier_ids:
+            return
+        known = set(Supplier.objects.filter(supplier_id__in=supplier_ids).values_list('supplier_id', flat=True))
+        unknown = supplier_ids - known
+        if unknown:
+            raise ValueError(f"Unknown suppliers: {sorted(unknown)}")
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, List
+import csv
+import io
+from dataclasses import astuple, dataclass, fields
+from itertools import groupby
+from typing import BinaryIO, Iterable, Iterator, List
 
 from django.db import transaction
 
-from .models import Batch, ComplianceError, MovementService, Product
+from core.db_routing import primary
+
+from .catalog import product_cache, warehouse_cache
+from .models import Batch, MovementService
 
 
 @dataclass
@@ -27,38 +33,117 @@ class FBAExportRow:
     fc_code: str
 
 
+EXPORT_COLUMNS = [column.name for column in fields(FBAExportRow)]
+
+
 class FBAAllocationService:
     def __init__(self, warehouse_id: str):
         self.warehouse_id = warehouse_id
 
     def import_plan(self, rows: Iterable[FBAPlanRow]) -> List[FBAExportRow]:
-        export_rows: List[FBAExportRow] = []
-        with transaction.atomic():
-            for row in rows:
-                product = Product.objects.get(sku=row.sku)
-                warehouse_batches = (
-                    Batch.objects.select_related('warehouse')
-                    .filter(sku=product, warehouse__warehouse_id=self.warehouse_id)
-                    .order_by('received_date')
-                )
-                first_batch = warehouse_batches.first()
-                if not first_batch:
+        """Export rows for a plan, grouped by FC, allocated in one short transaction.
+
+        Units allocated to an earlier row are held back from later rows, so a SKU
+        split across FCs never draws the same batch units twice. The batch row
+        locks are released on return, before any export is written out.
+        """
+        plan = sorted(rows, key=lambda row: row.fc_code)
+        exported: list[FBAExportRow] = []
+        with primary(), transaction.atomic():
+            warehouse = warehouse_cache.get(self.warehouse_id)
+            products = product_cache.get_many(row.sku for row in plan)
+            held: dict[str, int] = {}
+            for row in plan:
+                product = products.get(row.sku)
+                if product is None:
+                    raise ValueError(f"Unknown SKU {row.sku}")
+                if warehouse is None:
                     raise ValueError(f"No stock available for {row.sku}")
-                allocated = MovementService.fifo_allocate(product, first_batch.warehouse, row.quantity)
-                for allocation in allocated:
+                for allocation in MovementService.fifo_allocate(product, warehouse, row.quantity, held):
                     batch = allocation.batch
-                    if batch.compliance_status != Batch.COMPLIANCE_COMPLETE:
-                        raise ComplianceError(f"Batch {batch.batch_id} pending compliance")
-                    export_rows.append(
+                    exported.append(
                         FBAExportRow(
                             batch_id=batch.batch_id,
                             sku=batch.sku_id,
                             amazon_stn_price=str(batch.amazon_stn_price) if batch.amazon_stn_price is not None else None,
                             gst_rate_pct=str(batch.gst_rate_pct_override) if batch.gst_rate_pct_override is not None else None,
-                            hsn_code=batch.sku.hsn_code,
-                            product_name=batch.ewaybill_product_name or batch.sku.title,
+                            hsn_code=product.hsn_code,
+                            product_name=batch.ewaybill_product_name or product.title,
                             quantity_removed=allocation.quantity,
                             fc_code=row.fc_code,
                         )
                     )
-        return export_rows
+        return exported
+
+    def check_plan(self, rows: list[FBAPlanRow]) -> list[dict]:
+        """Every problem :meth:`import_plan` would hit, found without taking row locks.
+
+        Replays the FIFO allocation over ``(batch_id, current_qty, compliance)``
+        tuples from one query, in the same order. Rows are numbered as in the
+        plan file, with the header as row 1.
+        """
+        skus = {row.sku for row in rows}
+        known = set(product_cache.get_many(skus))
+        stock: dict[str, list] = {sku: [] for sku in skus}
+        batches = (
+            Batch.objects.filter(sku_id__in=known, warehouse_id=self.warehouse_id, current_qty__gt=0)
+            .order_by("sku_id", "received_date", "batch_id")
+            .values_list("sku_id", "batch_id", "current_qty", "compliance_status")
+        )
+        for sku, batch_id, qty, compliance in batches:
+            stock[sku].append([batch_id, qty, compliance])
+        errors = []
+        for number, row in sorted(enumerate(rows, start=2), key=lambda item: item[1].fc_code):
+            if row.sku not in known:
+                errors.append({"row": number, "error": f"Unknown SKU {row.sku}"})
+                continue
+            remaining = row.quantity
+            for batch in stock[row.sku]:
+                if remaining <= 0:
+                    break
+                take = min(batch[1], remaining)
+                if take <= 0:
+                    continue
+                if batch[2] != Batch.COMPLIANCE_COMPLETE:
+                    errors.append({"row": number, "error": f"Batch {batch[0]} is pending compliance"})
+                    break
+                batch[1] -= take
+                remaining -= take
+            else:
+                if remaining > 0:
+                    errors.append({"row": number, "error": f"Not enough stock for {row.sku}"})
+        return sorted(errors, key=lambda error: error["row"])
+
+
+def export_csv(rows: Iterable[FBAExportRow]) -> Iterator[str]:
+    """The export file as CSV lines, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(astuple(row))
+        yield buffer.getvalue()
+
+
+def export_xlsx(rows: Iterable[FBAExportRow], target: BinaryIO) -> None:
+    """Write the export as a workbook with one sheet per FC.
+
+    The workbook is write-only, so openpyxl spools each sheet to disk as rows
+    arrive instead of keeping them in memory.
+    """
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ValueError("xlsx exports need the openpyxl package")
+    workbook = Workbook(write_only=True)
+    for fc_code, fc_rows in groupby(rows, key=lambda row: row.fc_code):
+        sheet = workbook.create_sheet(title=fc_code[:31] or "FC")
+        sheet.append(EXPORT_COLUMNS)
+        for row in fc_rows:
+            sheet.append(list(astuple(row)))
+    if not workbook.worksheets:
+        workbook.create_sheet(title="FC").append(EXPORT_COLUMNS)
+    workbook.save(target)
@@ -0,0 +1,222 @@
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.metrics import percentile
+from core.seeding import delete_seeded_stock
+from inventory.fba import FBAAllocationService, FBAPlanRow
+from inventory.models import (
+    Batch,
+    Movement,
+    MovementLine,
+    MovementService,
+    Product,
+    Warehouse,
+)
+from inventory.receipts import ReceiptLine, ReceiptService
+
+SUITES = ("fifo_allocate", "import_plan", "commit")
+# Queries per allocated or committed line the serial runs may issue in --check-budget
+# mode. Fixed per-call queries are spread over --lines, so these assume the default 10.
+QUERY_BUDGETS = {"fifo_allocate": 0.2, "import_plan": 1.2, "commit": 3.0}
+BATCH_QTY = 1000
+TRANSACTION_STATEMENTS = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark fifo_allocate, FBAAllocationService.import_plan and MovementService.commit, "
+        "serially and from concurrent workers. Seeds its own data and deletes it afterwards; "
+        "run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skus", type=int, default=20)
+        parser.add_argument("--batches-per-sku", type=int, default=20)
+        parser.add_argument("--warehouses", type=int, default=2)
+        parser.add_argument("--calls", type=int, default=40, help="Calls per suite and variant.")
+        parser.add_argument("--lines", type=int, default=10, help="Lines per allocation, plan or movement.")
+        parser.add_argument("--workers", type=int, default=4, help="Threads for the concurrent variant (0 to skip it).")
+        parser.add_argument("--suite", action="append", choices=SUITES, help="Suites to run (default all).")
+        parser.add_argument("--output", help="Write the results as JSON to this path.")
+        parser.add_argument("--check-budget", action="store_true", help="Fail when queries per line exceed the budget.")
+        parser.add_argument(
+            "--budget", action="append", default=[], metavar="SUITE=QUERIES", help="Override a suite's query budget per line."
+        )
+        parser.add_argument("--keep", action="store_true", help="Leave the seeded data in place.")
+
+    def handle(self, *args, **options):
+        if options["lines"] > options["batches_per_sku"]:
+            raise CommandError("--lines cannot exceed --batches-per-sku")
+        if options["workers"] and options["skus"] < options["workers"]:
+            raise CommandError("--skus must be at least --workers so workers touch disjoint SKUs")
+        budgets = self._budgets(options["budget"])
+        suites = [suite for suite in SUITES if suite in (options["suite"] or SUITES)]
+        self.prefix = f"BENCH-MV-{uuid.uuid4().hex[:8]}"
+        self.user, _ = get_user_model().objects.get_or_create(username="bench-movements")
+        self._seed(options["skus"], options["batches_per_sku"], options["warehouses"])
+        variants = [("serial", 1)] + ([("concurrent", options["workers"])] if options["workers"] else [])
+        results = []
+        try:
+            for suite in suites:
+                for variant, workers in variants:
+                    calls = self._calls(suite, options["calls"], options["lines"], workers)
+                    results.append({"suite": suite, "variant": variant, "workers": workers, **self._run(calls, workers)})
+        finally:
+            if not options["keep"]:
+                self._cleanup()
+
+        for result in results:
+            queries = f"{result['queries_per_line']:.2f} q/line" if result["queries_per_line"] is not None else ""
+            self.stdout.write(
+                f"{result['suite']:>13} {result['variant']:>10}: {result['lines_per_sec']:10,.0f} lines/sec  "
+                f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  {queries}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump({"prefix": self.prefix, "options": self._recorded(options), "results": results}, handle, indent=2)
+        if options["check_budget"]:
+            over = [
+                f"{result['suite']}: {result['queries_per_line']:.2f} queries/line > {budgets[result['suite']]}"
+                for result in results
+                if result["queries_per_line"] is not None and result["queries_per_line"] > budgets[result["suite"]]
+            ]
+            if over:
+                raise CommandError("Query budget exceeded: " + "; ".join(over))
+            self.stdout.write("query budgets met")
+
+    @staticmethod
+    def _budgets(overrides: list[str]) -> dict[str, float]:
+        budgets = dict(QUERY_BUDGETS)
+        for override in overrides:
+            suite, _, value = override.partition("=")
+            if suite not in budgets:
+                raise CommandError(f"Unknown suite in --budget: {suite}")
+            try:
+                budgets[suite] = float(value)
+            except ValueError:
+                raise CommandError(f"--budget {override} needs a number")
+        return budgets
+
+    @staticmethod
+    def _recorded(options) -> dict:
+        keys = ("skus", "batches_per_sku", "warehouses", "calls", "lines", "workers")
+        return {key: options[key] for key in keys}
+
+    def _seed(self, skus: int, batches_per_sku: int, warehouses: int):
+        self.warehouses = Warehouse.objects.bulk_create(
+            [Warehouse(warehouse_id=f"{self.prefix}-W{index}", name="Bench") for index in range(warehouses)]
+        )
+        self.products = Product.objects.bulk_create([Product(sku=f"{self.prefix}-{index}", title="Bench") for index in range(skus)])
+        lines = []
+        for index, product in enumerate(self.products):
+            warehouse = self.warehouses[index % warehouses]
+            for number in range(batches_per_sku):
+                batch = Batch(
+                    batch_id=f"{product.sku}-B{number}",
+                    sku=product,
+                    warehouse=warehouse,
+                    received_date=f"2024-01-{1 + number % 28:02d}",
+                    unit_cost=Decimal("1.25"),
+                    starting_qty=BATCH_QTY,
+                    compliance_status=Batch.COMPLIANCE_COMPLETE,
+                )
+                lines.append(ReceiptLine(batch=batch))
+        ReceiptService(self.user, external_ref=self.prefix).receive(lines)
+        self.batches: dict[str, list[Batch]] = {}
+        for batch in Batch.objects.filter(sku__in=self.products).order_by("received_date", "batch_id"):
+            self.batches.setdefault(batch.sku_id, []).append(batch)
+
+    def _products_for(self, worker: int, workers: int) -> list[Product]:
+        """Each worker owns a disjoint slice of SKUs, so workers never wait on each other's row locks."""
+        return self.products[worker::workers]
+
+    def _calls(self, suite: str, calls: int, lines: int, workers: int) -> list[list]:
+        """``calls`` prepared callables, each returning the lines it handled, dealt out to ``workers`` queues."""
+        queues = [[] for _ in range(workers)]
+        for index in range(calls):
+            worker = index % workers
+            products = self._products_for(worker, workers)
+            product = products[(index // workers) % len(products)]
+            queues[worker].append(getattr(self, f"_{suite}_call")(product, products, lines))
+        return queues
+
+    def _fifo_allocate_call(self, product, products, lines):
+        warehouse = self.batches[product.sku][0].warehouse
+        quantity = BATCH_QTY * (lines - 1) + 1
+
+        def call():
+            with transaction.atomic():
+                return len(MovementService.fifo_allocate(product, warehouse, quantity))
+
+        return call
+
+    def _import_plan_call(self, product, products, lines):
+        warehouse_id = self.batches[product.sku][0].warehouse_id
+        stocked = [candidate for candidate in products if self.batches[candidate.sku][0].warehouse_id == warehouse_id]
+        plan = [FBAPlanRow(sku=stocked[row % len(stocked)].sku, quantity=1, fc_code=f"FC{row % 3}") for row in range(lines)]
+
+        def call():
+            return len(FBAAllocationService(warehouse_id).import_plan(plan))
+
+        return call
+
+    def _commit_call(self, product, products, lines):
+        batches = self.batches[product.sku][:lines]
+        movement = Movement.objects.create(
+            type=Movement.TYPE_FBA, created_by=self.user, from_warehouse=batches[0].warehouse, external_ref=self.prefix
+        )
+        MovementLine.objects.bulk_create(
+            [MovementLine(movement=movement, sku=product, batch=batch, quantity=1) for batch in batches]
+        )
+
+        def call():
+            MovementService.commit(movement)
+            return len(batches)
+
+        return call
+
+    def _run(self, queues: list[list], workers: int) -> dict:
+        def drain(queue):
+            timings = []
+            try:
+                for call in queue:
+                    started = time.perf_counter()
+                    lines = call()
+                    timings.append((time.perf_counter() - started, lines))
+            finally:
+                if workers > 1:
+                    connections.close_all()
+            return timings
+
+        queries = None
+        started = time.perf_counter()
+        if workers == 1:
+            with CaptureQueriesContext(connection) as captured:
+                timings = drain(queues[0])
+            queries = sum(1 for query in captured.captured_queries if not query["sql"].startswith(TRANSACTION_STATEMENTS))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                timings = [timing for result in pool.map(drain, queues) for timing in result]
+        elapsed = time.perf_counter() - started
+        latencies = sorted(seconds for seconds, _ in timings)
+        total_lines = sum(lines for _, lines in timings)
+        return {
+            "calls": len(timings),
+            "lines": total_lines,
+            "seconds": round(elapsed, 4),
+            "lines_per_sec": total_lines / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "queries_per_line": queries / total_lines if queries is not None and total_lines else None,
+        }
+
+    def _cleanup(self):
+        delete_seeded_stock(self.prefix, self.products, self.warehouses)
@@ -0,0 +1,78 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from inventory.models import Batch, Movement, MovementLine, Product, Warehouse
+from inventory.row_serializers import RowSerializer
+from inventory.serializers import MovementLineSerializer, MovementSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare ModelSerializer and RowSerializer rendering of a large movement (data is rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, lines, repeat, **options):
+        with transaction.atomic():
+            movement_id = self._seed(lines)
+            renderer = JSONRenderer()
+
+            def model_path():
+                movement = Movement.objects.prefetch_related(
+                    Prefetch("lines", queryset=MovementLine.objects.order_by("movement_line_id"))
+                ).get(pk=movement_id)
+                return renderer.render(MovementSerializer(movement).data)
+
+            row_serializer = RowSerializer(MovementSerializer)
+            line_serializer = RowSerializer(MovementLineSerializer)
+
+            def row_path():
+                row = Movement.objects.values(*row_serializer.sources()).get(pk=movement_id)
+                line_rows = (
+                    MovementLine.objects.filter(movement_id=movement_id)
+                    .order_by("movement_line_id")
+                    .values(*line_serializer.sources("movement_id"))
+                )
+                nested = {"lines": line_serializer.group_by(line_rows, "movement_id")}
+                return renderer.render(row_serializer.render([row], nested=nested, key="movement_id")[0])
+
+            if model_path() != row_path():
+                raise CommandError("RowSerializer output differs from MovementSerializer")
+            results = {name: self._time(path, repeat) for name, path in (("model_serializer", model_path), ("row_serializer", row_path))}
+            transaction.set_rollback(True)
+
+        for name, seconds in results.items():
+            self.stdout.write(f"{name:>17}: {lines / seconds:12,.0f} lines/sec ({seconds * 1000:.1f} ms per movement)")
+        self.stdout.write(f"speedup: {results['model_serializer'] / results['row_serializer']:.1f}x")
+
+    @staticmethod
+    def _time(path, repeat: int) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            path()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    @staticmethod
+    def _seed(lines: int) -> int:
+        user, _ = get_user_model().objects.get_or_create(username="bench-serializers")
+        warehouse, _ = Warehouse.objects.get_or_create(warehouse_id="bench", defaults={"name": "Bench"})
+        product, _ = Product.objects.get_or_create(sku="BENCH-SER", defaults={"title": "Bench"})
+        batches = Batch.objects.bulk_create(
+            [
+                Batch(batch_id=f"BENCH-SER-{index}", sku=product, warehouse=warehouse, starting_qty=1, current_qty=1, unit_cost="1.25")
+                for index in range(lines)
+            ]
+        )
+        movement = Movement.objects.create(type=Movement.TYPE_FBA, created_by=user, external_ref="bench")
+        MovementLine.objects.bulk_create(
+            [MovementLine(movement=movement, sku=product, batch=batch, quantity=1, note="bench") for batch in batches]
+        )
+        return movement.movement_id
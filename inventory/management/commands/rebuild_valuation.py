@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models import CostLayerService, SkuValuation
+
+
+class Command(BaseCommand):
+    help = "Rebuild FIFO cost layers and SKU valuation from batch balances and the stock ledger."
+
+    def handle(self, *args, **options):
+        CostLayerService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt valuation for {SkuValuation.objects.count()} SKU/warehouse pairs"))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.models import LedgerDailyRollup, LedgerRollupService
+
+
+class Command(BaseCommand):
+    help = "Fold new stock ledger rows into the daily rollup, or rebuild it from the whole ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Recompute the rollup from scratch.")
+        parser.add_argument('--batch-rows', type=int, default=50000, help="Ledger rows folded per transaction.")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            LedgerRollupService.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {LedgerDailyRollup.objects.count()} rollup rows"))
+            return
+        if settings.INVENTORY_ROLLUP_AT_COMMIT:
+            raise CommandError(
+                "INVENTORY_ROLLUP_AT_COMMIT is on, so ledger rows are already folded at commit; use --rebuild to recompute."
+            )
+        folded = LedgerRollupService.catch_up(batch_rows=options['batch_rows'])
+        self.stdout.write(self.style.SUCCESS(f"Folded {folded} ledger rows"))
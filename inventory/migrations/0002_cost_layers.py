@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchCostLayer',
+            fields=[
+                ('batch', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cost_layer', serialize=False, to='inventory.batch')),
+                ('unit_cost', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=10)),
+                ('remaining_qty', models.IntegerField(default=0)),
+                ('remaining_value', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('updated_ts', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SkuValuation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('on_hand_qty', models.IntegerField(default=0)),
+                ('on_hand_value', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('cogs_value', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('updated_ts', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='batchcostlayer',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.product'),
+        ),
+        migrations.AddField(
+            model_name='batchcostlayer',
+            name='warehouse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.warehouse'),
+        ),
+        migrations.AddField(
+            model_name='skuvaluation',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.product'),
+        ),
+        migrations.AddField(
+            model_name='skuvaluation',
+            name='warehouse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.warehouse'),
+        ),
+        migrations.AddIndex(
+            model_name='batchcostlayer',
+            index=models.Index(fields=['warehouse', 'sku'], name='inventory_b_warehou_a0b4e8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skuvaluation',
+            index=models.Index(fields=['warehouse', 'sku'], name='inventory_s_warehou_35a6f9_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='skuvaluation',
+            constraint=models.UniqueConstraint(fields=('sku', 'warehouse'), name='uniq_valuation_sku_warehouse'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_cost_layers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batch',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='batch',
+            index=models.Index(fields=['updated_at', 'batch_id'], name='inventory_b_updated_7894b8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['ts', 'movement_id'], name='inventory_m_ts_1e47b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at', 'sku'], name='inventory_p_updated_03b51f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skuvaluation',
+            index=models.Index(fields=['updated_ts', 'id'], name='inventory_s_updated_9733ca_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:12
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_sync_watermarks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('movement_type', models.CharField(max_length=16)),
+                ('qty_in', models.BigIntegerField(default=0)),
+                ('qty_out', models.BigIntegerField(default=0)),
+                ('value_in', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=16)),
+                ('value_out', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=16)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('ts', models.DateTimeField(blank=True, null=True)),
+                ('ledger_id', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ledgerdailyrollup',
+            name='sku',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.product'),
+        ),
+        migrations.AddField(
+            model_name='ledgerdailyrollup',
+            name='warehouse',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.warehouse'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerdailyrollup',
+            index=models.Index(fields=['sku', 'day'], name='inventory_l_sku_id_a54602_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerdailyrollup',
+            index=models.Index(fields=['warehouse', 'day'], name='inventory_l_warehou_4965da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerdailyrollup',
+            index=models.Index(fields=['movement_type', 'day'], name='inventory_l_movemen_2b6ab3_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ledgerdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'warehouse', 'sku', 'movement_type'), name='uniq_rollup_day_warehouse_sku_type'),
+        ),
+    ]
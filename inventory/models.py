@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import timedelta
 from decimal import Decimal
 from typing import Iterable, Optional
 
 from django.conf import settings
-from django.db import IntegrityError, models, transaction
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
 
+from core.db_routing import primary
+from core.transactions import oldest_open_transaction
+
 
 class Supplier(models.Model):
     supplier_id = models.CharField(primary_key=True, max_length=32)
@@ -58,9 +63,13 @@ class Product(models.Model):
     months_rule_override = models.PositiveIntegerField(null=True, blank=True)
     supplier = models.ForeignKey(Supplier, on_delete=models.PROTECT, null=True, blank=True)
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("sku",)
+        indexes = [
+            models.Index(fields=("updated_at", "sku")),
+        ]
 
     def __str__(self) -> str:
         return f"{self.sku} - {self.title}"
@@ -115,11 +124,13 @@ class Batch(models.Model):
     base_cost_rmb = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     base_cost_usd = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     compliance_status = models.CharField(max_length=16, choices=COMPLIANCE_CHOICES, default=COMPLIANCE_PENDING)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
             models.Index(fields=("warehouse", "sku")),
             models.Index(fields=("sku", "received_date")),
+            models.Index(fields=("updated_at", "batch_id")),
         ]
         ordering = ("sku", "-received_date")
 
@@ -185,6 +196,9 @@ class Movement(models.Model):
 
     class Meta:
         ordering = ("-ts",)
+        indexes = [
+            models.Index(fields=("ts", "movement_id")),
+        ]
 
     def __str__(self) -> str:
         return f"Movement<{self.movement_id}>"
@@ -230,6 +244,76 @@ class StockLedger(models.Model):
         db_table = "inventory_stockledger"
 
 
+class BatchCostLayer(models.Model):
+    """Remaining quantity and value of a single FIFO cost layer (one per batch)."""
+
+    batch = models.OneToOneField(Batch, on_delete=models.CASCADE, primary_key=True, related_name="cost_layer")
+    sku = models.ForeignKey(Product, on_delete=models.PROTECT)
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT)
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0"))
+    remaining_qty = models.IntegerField(default=0)
+    remaining_value = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+    updated_ts = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("warehouse", "sku")),
+        ]
+
+
+class SkuValuation(models.Model):
+    """Running on-hand value and cost of goods issued per SKU and warehouse."""
+
+    sku = models.ForeignKey(Product, on_delete=models.PROTECT)
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT)
+    on_hand_qty = models.IntegerField(default=0)
+    on_hand_value = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+    cogs_value = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0"))
+    updated_ts = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("sku", "warehouse"), name="uniq_valuation_sku_warehouse"),
+        ]
+        indexes = [
+            models.Index(fields=("warehouse", "sku")),
+            models.Index(fields=("updated_ts", "id")),
+        ]
+
+
+class LedgerDailyRollup(models.Model):
+    """Stock ledger totals per day, warehouse, SKU and movement type."""
+
+    day = models.DateField()
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT)
+    sku = models.ForeignKey(Product, on_delete=models.PROTECT)
+    movement_type = models.CharField(max_length=16)
+    qty_in = models.BigIntegerField(default=0)
+    qty_out = models.BigIntegerField(default=0)
+    value_in = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0"))
+    value_out = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal("0"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("day", "warehouse", "sku", "movement_type"), name="uniq_rollup_day_warehouse_sku_type"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=("sku", "day")),
+            models.Index(fields=("warehouse", "day")),
+            models.Index(fields=("movement_type", "day")),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """Last ``(ts, ledger_id)`` folded into a rollup by its catch-up command."""
+
+    name = models.CharField(primary_key=True, max_length=64)
+    ts = models.DateTimeField(null=True, blank=True)
+    ledger_id = models.BigIntegerField(default=0)
+
+
 class ChannelInventory(models.Model):
     sku = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True)
     channel = models.CharField(max_length=32, default="amazon_fba")
@@ -270,41 +354,251 @@ class NegativeStockError(AllocationError):
     pass
 
 
-class MovementService:
-    """Service layer for creating and committing movements."""
+_MAX_QUERY_PARAMS = 65535
+
+
+def _upsert_increment(model, key_fields: list[str], value_fields: list[str], rows: list[tuple], *, set_fields: tuple[str, ...] = ()):
+    """Insert rows or add their values onto existing rows in as few statements as Postgres allows.
+
+    ``rows`` holds ``key_fields + value_fields + set_fields`` column values in order.
+    Value columns are incremented on conflict; ``set_fields`` are overwritten.
+    """
+    if not rows:
+        return
+    opts = model._meta
+    table = connection.ops.quote_name(opts.db_table)
+    key_columns = [opts.get_field(name).column for name in key_fields]
+    value_columns = [opts.get_field(name).column for name in value_fields]
+    set_columns = [opts.get_field(name).column for name in set_fields]
+    columns = key_columns + value_columns + set_columns
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    assignments = [f"{col} = {table}.{col} + EXCLUDED.{col}" for col in value_columns]
+    assignments += [f"{col} = EXCLUDED.{col}" for col in set_columns]
+    # Postgres caps a statement at 65535 bind parameters.
+    per_statement = _MAX_QUERY_PARAMS // len(columns)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+            sql = (
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(chunk))} "
+                f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {', '.join(assignments)}"
+            )
+            cursor.execute(sql, [value for row in chunk for value in row])
+
+
+class CostLayerService:
+    """Keeps FIFO cost layers and per-SKU valuation in step with the stock ledger.
+
+    Every batch is its own cost layer, and ``fifo_allocate`` relieves batches
+    oldest-first, so applying ledger deltas at the batch's unit cost yields
+    FIFO valuation without rescanning history.
+    """
+
+    @staticmethod
+    def apply(entries: Iterable[StockLedger]):
+        now = timezone.now()
+        layers: dict[str, list] = {}
+        totals: dict[tuple[str, str], list] = {}
+        for entry in entries:
+            unit_cost = entry.unit_cost or Decimal("0")
+            qty = entry.qty_in - entry.qty_out
+            value = unit_cost * qty
+            layer = layers.setdefault(entry.batch_id, [entry.sku_id, entry.warehouse_id, unit_cost, 0, Decimal("0")])
+            layer[3] += qty
+            layer[4] += value
+            total = totals.setdefault((entry.sku_id, entry.warehouse_id), [0, Decimal("0"), Decimal("0")])
+            total[0] += qty
+            total[1] += value
+            total[2] += unit_cost * entry.qty_out
+        _upsert_increment(
+            BatchCostLayer,
+            ["batch"],
+            ["remaining_qty", "remaining_value"],
+            [(batch_id, qty, value, sku_id, warehouse_id, unit_cost, now) for batch_id, (sku_id, warehouse_id, unit_cost, qty, value) in layers.items()],
+            set_fields=("sku", "warehouse", "unit_cost", "updated_ts"),
+        )
+        _upsert_increment(
+            SkuValuation,
+            ["sku", "warehouse"],
+            ["on_hand_qty", "on_hand_value", "cogs_value"],
+            [(sku_id, warehouse_id, qty, value, cogs, now) for (sku_id, warehouse_id), (qty, value, cogs) in totals.items()],
+            set_fields=("updated_ts",),
+        )
 
     @staticmethod
-    def create_receipt(
-        *,
-        movement: Movement,
-        receipt_lines: Iterable[dict],
-    ) -> Movement:
-        for line in receipt_lines:
-            quantity = int(line["quantity"])
-            received_date = line.get("received_date", timezone.now().date())
-            if isinstance(received_date, str):
-                received_date = timezone.datetime.fromisoformat(received_date).date()
-            batch, created = Batch.objects.get_or_create(
-                batch_id=line["batch_id"],
-                defaults={
-                    "sku_id": line["sku_id"],
-                    "warehouse_id": line["warehouse_id"],
-                    "received_date": received_date,
-                    "starting_qty": quantity,
-                    "current_qty": quantity,
-                    "compliance_status": Batch.COMPLIANCE_PENDING,
-                },
+    @transaction.atomic
+    def rebuild():
+        """Recompute all layers from batch balances and COGS from the ledger."""
+        now = timezone.now()
+        BatchCostLayer.objects.all().delete()
+        SkuValuation.objects.all().delete()
+        layers = []
+        totals: dict[tuple[str, str], list] = {}
+        for batch_id, sku_id, warehouse_id, unit_cost, current_qty in Batch.objects.values_list(
+            "batch_id", "sku_id", "warehouse_id", "unit_cost", "current_qty"
+        ).iterator(chunk_size=5000):
+            unit_cost = unit_cost or Decimal("0")
+            value = unit_cost * current_qty
+            layers.append(
+                BatchCostLayer(
+                    batch_id=batch_id,
+                    sku_id=sku_id,
+                    warehouse_id=warehouse_id,
+                    unit_cost=unit_cost,
+                    remaining_qty=current_qty,
+                    remaining_value=value,
+                    updated_ts=now,
+                )
             )
-            if not created:
-                raise IntegrityError(f"Batch {batch.batch_id} already exists")
-            MovementLine.objects.create(
-                movement=movement,
-                sku_id=line["sku_id"],
-                batch=batch,
-                quantity=quantity,
-                note=line.get("note", ""),
+            total = totals.setdefault((sku_id, warehouse_id), [0, Decimal("0"), Decimal("0")])
+            total[0] += current_qty
+            total[1] += value
+        issued = (
+            StockLedger.objects.filter(qty_out__gt=0)
+            .values("sku_id", "warehouse_id")
+            .annotate(cogs=models.Sum(models.F("qty_out") * models.F("unit_cost")))
+        )
+        for row in issued:
+            total = totals.setdefault((row["sku_id"], row["warehouse_id"]), [0, Decimal("0"), Decimal("0")])
+            total[2] += row["cogs"] or Decimal("0")
+        BatchCostLayer.objects.bulk_create(layers, batch_size=5000)
+        SkuValuation.objects.bulk_create(
+            [
+                SkuValuation(
+                    sku_id=sku_id,
+                    warehouse_id=warehouse_id,
+                    on_hand_qty=qty,
+                    on_hand_value=value,
+                    cogs_value=cogs,
+                    updated_ts=now,
+                )
+                for (sku_id, warehouse_id), (qty, value, cogs) in totals.items()
+            ],
+            batch_size=5000,
+        )
+
+
+class LedgerRollupService:
+    """Maintains ``LedgerDailyRollup`` from the stock ledger.
+
+    With ``INVENTORY_ROLLUP_AT_COMMIT`` on, every ledger write folds its rows
+    in within the same transaction. Otherwise :meth:`catch_up` folds in rows
+    past a ``(ts, ledger_id)`` watermark. As in the sync feed, rows are held
+    back to the start of the oldest open transaction, which may still commit
+    rows stamped before it, less ``INVENTORY_ROLLUP_SETTLE_SECONDS``. Days
+    are local dates in ``TIME_ZONE``.
+    """
+
+    WATERMARK = "ledger_daily"
+    KEY_FIELDS = ["day", "warehouse", "sku", "movement_type"]
+    VALUE_FIELDS = ["qty_in", "qty_out", "value_in", "value_out"]
+
+    @staticmethod
+    def apply(entries: Iterable[StockLedger]):
+        totals: dict[tuple, list] = {}
+        for entry in entries:
+            unit_cost = entry.unit_cost or Decimal("0")
+            key = (timezone.localdate(entry.ts), entry.warehouse_id, entry.sku_id, entry.movement_type)
+            total = totals.setdefault(key, [0, 0, Decimal("0"), Decimal("0")])
+            total[0] += entry.qty_in
+            total[1] += entry.qty_out
+            total[2] += unit_cost * entry.qty_in
+            total[3] += unit_cost * entry.qty_out
+        _upsert_increment(
+            LedgerDailyRollup,
+            LedgerRollupService.KEY_FIELDS,
+            LedgerRollupService.VALUE_FIELDS,
+            [(*key, *values) for key, values in totals.items()],
+        )
+
+    @staticmethod
+    def _fold(ledger: models.QuerySet):
+        """Aggregate ``ledger`` by day in SQL and add the groups onto the rollup."""
+        groups = (
+            ledger.annotate(day=TruncDate("ts"))
+            .values("day", "warehouse_id", "sku_id", "movement_type")
+            .annotate(
+                total_in=models.Sum("qty_in"),
+                total_out=models.Sum("qty_out"),
+                total_value_in=Coalesce(models.Sum(models.F("qty_in") * models.F("unit_cost")), Decimal("0")),
+                total_value_out=Coalesce(models.Sum(models.F("qty_out") * models.F("unit_cost")), Decimal("0")),
             )
-        return movement
+            .order_by()
+        )
+        _upsert_increment(
+            LedgerDailyRollup,
+            LedgerRollupService.KEY_FIELDS,
+            LedgerRollupService.VALUE_FIELDS,
+            [
+                (
+                    row["day"], row["warehouse_id"], row["sku_id"], row["movement_type"],
+                    row["total_in"], row["total_out"], row["total_value_in"], row["total_value_out"],
+                )
+                for row in groups
+            ],
+        )
+
+    @staticmethod
+    def _horizon(now=None):
+        horizon = now or timezone.now()
+        oldest = oldest_open_transaction()
+        if oldest is not None:
+            horizon = min(horizon, oldest)
+        return horizon - timedelta(seconds=settings.INVENTORY_ROLLUP_SETTLE_SECONDS)
+
+    @staticmethod
+    def catch_up(*, batch_rows: int = 50000, now=None) -> int:
+        """Fold settled ledger rows past the watermark, ``batch_rows`` per transaction; returns rows folded."""
+        horizon = LedgerRollupService._horizon(now)
+        folded = 0
+        while True:
+            with primary(), transaction.atomic():
+                watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=LedgerRollupService.WATERMARK)
+                pending = StockLedger.objects.filter(ts__lte=horizon)
+                if watermark.ts is not None:
+                    pending = pending.filter(
+                        models.Q(ts__gt=watermark.ts) | models.Q(ts=watermark.ts, ledger_id__gt=watermark.ledger_id)
+                    )
+                keys = pending.order_by("ts", "ledger_id").values_list("ts", "ledger_id")
+                bound = keys[batch_rows - 1:batch_rows].first() or keys.last()
+                if bound is None:
+                    return folded
+                bound_ts, bound_id = bound
+                batch = pending.filter(models.Q(ts__lt=bound_ts) | models.Q(ts=bound_ts, ledger_id__lte=bound_id))
+                folded += batch.count()
+                LedgerRollupService._fold(batch)
+                watermark.ts, watermark.ledger_id = bound_ts, bound_id
+                watermark.save(update_fields=["ts", "ledger_id"])
+
+    @staticmethod
+    def rebuild(*, now=None):
+        """Recompute the rollup from the whole ledger and move the watermark to the end of it.
+
+        Commit-time maintenance folds rows as they are written, so in that
+        mode every ledger row is included; otherwise only settled rows are.
+        """
+        with primary(), transaction.atomic():
+            watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=LedgerRollupService.WATERMARK)
+            LedgerDailyRollup.objects.all().delete()
+            ledger = StockLedger.objects.all()
+            if not settings.INVENTORY_ROLLUP_AT_COMMIT:
+                ledger = ledger.filter(ts__lte=LedgerRollupService._horizon(now))
+            last = ledger.order_by("ts", "ledger_id").values_list("ts", "ledger_id").last()
+            LedgerRollupService._fold(ledger)
+            watermark.ts, watermark.ledger_id = last or (None, 0)
+            watermark.save(update_fields=["ts", "ledger_id"])
+
+
+def record_ledger(entries: list[StockLedger], *, batch_size: int | None = None):
+    """Insert ledger rows and update everything derived from them in the current transaction."""
+    StockLedger.objects.bulk_create(entries, batch_size=batch_size)
+    CostLayerService.apply(entries)
+    if settings.INVENTORY_ROLLUP_AT_COMMIT:
+        LedgerRollupService.apply(entries)
+
+
+class MovementService:
+    """Service layer for creating and committing movements."""
 
     @staticmethod
     def _validate_compliance(lines: Iterable[AllocationLine]):
@@ -313,7 +607,14 @@ class MovementService:
                 raise ComplianceError(f"Batch {line.batch.batch_id} is pending compliance")
 
     @staticmethod
-    def fifo_allocate(sku: Product, warehouse: Warehouse, quantity: int) -> list[AllocationLine]:
+    def fifo_allocate(
+        sku: Product, warehouse: Warehouse, quantity: int, held: dict[str, int] | None = None
+    ) -> list[AllocationLine]:
+        """Allocate ``quantity`` units from the oldest batches first.
+
+        ``held`` maps batch_id to units already promised elsewhere. Those units
+        are left out, and this allocation is added to ``held``.
+        """
         if quantity <= 0:
             return []
         batches = (
@@ -324,7 +625,8 @@ class MovementService:
         allocated: list[AllocationLine] = []
         remaining = quantity
         for batch in batches:
-            take = min(batch.current_qty, remaining)
+            available = batch.current_qty - (held.get(batch.batch_id, 0) if held else 0)
+            take = min(available, remaining)
             if take <= 0:
                 continue
             allocated.append(AllocationLine(batch=batch, quantity=take))
@@ -334,14 +636,16 @@ class MovementService:
         if remaining > 0:
             raise NegativeStockError("Not enough stock for allocation")
         MovementService._validate_compliance(allocated)
+        if held is not None:
+            for line in allocated:
+                held[line.batch.batch_id] = held.get(line.batch.batch_id, 0) + line.quantity
         return allocated
 
     @staticmethod
     def commit(movement: Movement):
         if movement.status != Movement.STATUS_DRAFT:
             raise AllocationError("Movement already processed")
-        with transaction.atomic():
-            now = timezone.now()
+        with primary(), transaction.atomic():
             ledger_entries = []
             for line in movement.lines.select_related("batch", "movement", "sku"):
                 batch = line.batch
@@ -351,7 +655,7 @@ class MovementService:
                     batch.current_qty = models.F("current_qty") + line.quantity
                 else:
                     batch.current_qty = models.F("current_qty") - line.quantity
-                batch.save(update_fields=["current_qty"])
+                batch.save(update_fields=["current_qty", "updated_at"])
                 batch.refresh_from_db(fields=["current_qty"])
                 if batch.current_qty < 0:
                     raise NegativeStockError(f"Negative stock for batch {batch.batch_id}")
@@ -359,20 +663,24 @@ class MovementService:
                 qty_out = line.quantity if movement.type != Movement.TYPE_RECEIPT else 0
                 ledger_entries.append(
                     StockLedger(
-                        ts=now,
                         movement_type=movement.type,
                         movement=movement,
-                        warehouse=batch.warehouse,
-                        sku=batch.sku,
+                        warehouse_id=batch.warehouse_id,
+                        sku_id=batch.sku_id,
                         batch=batch,
                         qty_in=qty_in,
                         qty_out=qty_out,
                         unit_cost=batch.unit_cost,
-                        user=movement.created_by,
+                        user_id=movement.created_by_id,
                         memo=line.note,
                     )
                 )
-            StockLedger.objects.bulk_create(ledger_entries)
+            # Stamp once every batch row lock is held, so the change feed and the
+            # rollup watermark see the ledger as soon after the stamp as possible.
+            now = timezone.now()
+            for entry in ledger_entries:
+                entry.ts = now
+            record_ledger(ledger_entries)
             movement.status = Movement.STATUS_COMMITTED
             movement.ts = now
             movement.save(update_fields=["status", "ts"])
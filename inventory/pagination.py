@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InventoryCursorPagination(CursorPagination):
+    """Keyset pagination over a unique, indexed column so deep pages stay cheap."""
+
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class ProductCursorPagination(InventoryCursorPagination):
+    ordering = 'sku'
+
+
+class BatchCursorPagination(InventoryCursorPagination):
+    ordering = 'batch_id'
+
+
+class MovementCursorPagination(InventoryCursorPagination):
+    ordering = '-movement_id'
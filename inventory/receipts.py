@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.db_routing import primary
+
+from .models import Batch, Movement, MovementLine, StockLedger, record_ledger
+
+
+@dataclass
+class ReceiptLine:
+    batch: Batch
+    note: str = ""
+
+
+class ReceiptService:
+    """Receives new batches in bulk as a single committed receipt movement.
+
+    Each call to :meth:`receive` bulk-inserts the batches, their movement lines
+    and their stock ledger rows, then updates the cost layers and rollups
+    derived from the ledger, all in one transaction. Repeated calls on the same
+    instance add to the same movement, so a chunked import leaves one receipt.
+    """
+
+    batch_size = 2000
+
+    def __init__(self, user, *, external_ref: str = "", skip_existing: bool = False):
+        self.user = user
+        self.external_ref = external_ref
+        self.skip_existing = skip_existing
+        self.movement: Movement | None = None
+
+    def receive(self, lines: Iterable[ReceiptLine]) -> int:
+        """Create the batches not seen before and return how many were created.
+
+        Batches that already exist, or repeat within ``lines``, are skipped when
+        ``skip_existing`` is set and raise ``IntegrityError`` otherwise.
+        """
+        lines = list(lines)
+        with primary(), transaction.atomic():
+            existing = set(
+                Batch.objects.filter(batch_id__in={line.batch.batch_id for line in lines}).values_list("batch_id", flat=True)
+            )
+            new_lines = []
+            for line in lines:
+                if line.batch.batch_id in existing:
+                    if self.skip_existing:
+                        continue
+                    raise IntegrityError(f"Batch {line.batch.batch_id} already exists")
+                existing.add(line.batch.batch_id)
+                line.batch.current_qty = line.batch.starting_qty
+                new_lines.append(line)
+            if not new_lines:
+                return 0
+            now = timezone.now()
+            movement = self._movement(new_lines, now)
+            Batch.objects.bulk_create([line.batch for line in new_lines], batch_size=self.batch_size)
+            MovementLine.objects.bulk_create(
+                [
+                    MovementLine(
+                        movement=movement,
+                        sku_id=line.batch.sku_id,
+                        batch=line.batch,
+                        quantity=line.batch.starting_qty,
+                        note=line.note,
+                    )
+                    for line in new_lines
+                ],
+                batch_size=self.batch_size,
+            )
+            ledger_entries = [
+                StockLedger(
+                    ts=now,
+                    movement_type=Movement.TYPE_RECEIPT,
+                    movement=movement,
+                    warehouse_id=line.batch.warehouse_id,
+                    sku_id=line.batch.sku_id,
+                    batch=line.batch,
+                    qty_in=line.batch.starting_qty,
+                    unit_cost=line.batch.unit_cost,
+                    user=self.user,
+                    memo=line.note,
+                )
+                for line in new_lines
+            ]
+            record_ledger(ledger_entries, batch_size=self.batch_size)
+        return len(new_lines)
+
+    def _movement(self, lines: list[ReceiptLine], now) -> Movement:
+        warehouses = {line.batch.warehouse_id for line in lines}
+        if self.movement is None:
+            self.movement = Movement.objects.create(
+                type=Movement.TYPE_RECEIPT,
+                status=Movement.STATUS_COMMITTED,
+                ts=now,
+                to_warehouse_id=warehouses.pop() if len(warehouses) == 1 else None,
+                external_ref=self.external_ref,
+                created_by=self.user,
+            )
+        elif self.movement.to_warehouse_id is not None and warehouses != {self.movement.to_warehouse_id}:
+            self.movement.to_warehouse = None
+            self.movement.save(update_fields=["to_warehouse"])
+        return self.movement
@@ -1,15 +1,48 @@
 from rest_framework import serializers
 
+from .catalog import product_cache, warehouse_cache
 from .models import Batch, Movement, MovementLine, Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+def requested_fields(request) -> list[str] | None:
+    """Field names from a ``?fields=a,b`` query parameter, or ``None`` when absent."""
+    if request is None:
+        return None
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    return [name.strip() for name in raw.split(',') if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """Drops serializer fields not listed in ``?fields=`` on read requests."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        wanted = requested_fields(request)
+        if wanted is None:
+            return
+        for name in set(self.fields) - set(wanted):
+            self.fields.pop(name)
+
+
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
 
 
-class BatchSerializer(serializers.ModelSerializer):
+class ProductUpsertSerializer(ProductSerializer):
+    """Validates bulk upsert items without per-row uniqueness or supplier lookups."""
+
+    sku = serializers.CharField(max_length=64)
+    supplier = serializers.CharField(max_length=32, source='supplier_id', allow_null=True, required=False)
+
+
+class BatchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Batch
         fields = '__all__'
@@ -22,7 +55,7 @@ class MovementLineSerializer(serializers.ModelSerializer):
         fields = ('movement_line_id', 'sku', 'batch', 'quantity', 'note')
 
 
-class MovementSerializer(serializers.ModelSerializer):
+class MovementSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     lines = MovementLineSerializer(many=True)
 
     class Meta:
@@ -51,3 +84,35 @@ class MovementSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         raise serializers.ValidationError('Updates not supported; create new movement instead.')
+
+
+class ReceiptLineSerializer(serializers.Serializer):
+    batch_id = serializers.CharField(max_length=64)
+    sku = serializers.CharField(max_length=64)
+    warehouse = serializers.CharField(max_length=32)
+    quantity = serializers.IntegerField(min_value=1)
+    received_date = serializers.DateField(required=False)
+    unit_cost = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    expiry_date = serializers.DateField(required=False, allow_null=True)
+    note = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class ReceiptSerializer(serializers.Serializer):
+    """Validates a bulk receipt, resolving SKUs and warehouses through the catalog cache."""
+
+    external_ref = serializers.CharField(max_length=128, required=False, allow_blank=True, default='')
+    lines = ReceiptLineSerializer(many=True, allow_empty=False)
+
+    def validate_lines(self, lines):
+        skus = {line['sku'] for line in lines}
+        warehouses = {line['warehouse'] for line in lines}
+        unknown_skus = skus - set(product_cache.get_many(skus))
+        unknown_warehouses = warehouses - set(warehouse_cache.get_many(warehouses))
+        errors = []
+        if unknown_skus:
+            errors.append(f"Unknown SKUs: {', '.join(sorted(unknown_skus))}")
+        if unknown_warehouses:
+            errors.append(f"Unknown warehouses: {', '.join(sorted(unknown_warehouses))}")
+        if errors:
+            raise serializers.ValidationError(errors)
+        return lines
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import CATALOG_CACHES
+from .models import Product, Warehouse
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Warehouse)
+def invalidate_catalog(sender, **kwargs):
+    CATALOG_CACHES[sender].invalidate()
@@ -0,0 +1,70 @@
+import csv
+import io
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.aging import AgingReport
+from inventory.models import Batch, Product, Warehouse
+
+
+@pytest.fixture
+def batches():
+    today = timezone.localdate()
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    Warehouse.objects.create(warehouse_id='del', name='Delhi')
+    Product.objects.create(sku='AGE', title='Aged')
+    Product.objects.create(sku='NEW', title='Fresh')
+    for batch_id, sku, warehouse, age, expiry, qty in [
+        ('A1', 'AGE', 'blr', 200, -5, 4),
+        ('A2', 'AGE', 'del', 45, 20, 6),
+        ('A3', 'AGE', 'blr', 10, None, 10),
+        ('N1', 'NEW', 'blr', 0, 400, 3),
+        ('N2', 'NEW', 'blr', 5, 60, 0),
+    ]:
+        Batch.objects.create(
+            batch_id=batch_id, sku_id=sku, warehouse_id=warehouse, received_date=today - timedelta(days=age),
+            expiry_date=today + timedelta(days=expiry) if expiry is not None else None,
+            unit_cost=Decimal('2.50'), starting_qty=max(qty, 1), current_qty=qty,
+        )
+    return today
+
+
+@pytest.mark.django_db
+def test_aging_buckets_per_sku_in_one_query(batches, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        rows = AgingReport(today=batches).payload()
+
+    age = {row['sku']: {label: bucket['qty'] for label, bucket in row['age'].items()} for row in rows}
+    assert age == {
+        'AGE': {'0-30': 10, '30-60': 6, '60-90': 0, '90-180': 0, '180+': 4},
+        'NEW': {'0-30': 3, '30-60': 0, '60-90': 0, '90-180': 0, '180+': 0},
+    }
+    aged = rows[0]
+    assert (aged['on_hand_qty'], Decimal(aged['on_hand_value'])) == (20, Decimal('50'))
+    assert {label: bucket['qty'] for label, bucket in aged['expiry'].items()} == {
+        'expired': 4, '0-30': 6, '30-90': 0, '90-180': 0, '180+': 0, 'none': 10,
+    }
+    assert Decimal(aged['expiry']['expired']['value']) == Decimal('10')
+
+
+@pytest.mark.django_db
+def test_aging_view_groups_by_warehouse_and_streams_csv(batches):
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='ops', password='pass'))
+
+    rows = client.get('/api/inventory/reports/aging/', {'group_by': 'warehouse', 'age_buckets': '30'}).json()
+    assert [(row['warehouse'], row['on_hand_qty'], list(row['age'])) for row in rows] == [
+        ('blr', 17, ['0-30', '30+']), ('del', 6, ['0-30', '30+']),
+    ]
+
+    stream = client.get('/api/inventory/reports/aging/', {'output': 'csv', 'sku': 'NEW'})
+    assert stream['Content-Type'] == 'text/csv'
+    table = list(csv.reader(io.StringIO(b''.join(stream.streaming_content).decode())))
+    assert table[0][:4] == ['sku', 'on_hand_qty', 'on_hand_value', 'age_0_30_qty']
+    assert table[1][:4] == ['NEW', '3', '7.50', '3']
+    assert client.get('/api/inventory/reports/aging/', {'age_buckets': '60,30'}).status_code == 400
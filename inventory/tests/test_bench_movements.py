@@ -0,0 +1,30 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from inventory.models import Batch, Movement, Product
+
+SCALE = {'skus': 4, 'batches_per_sku': 10, 'lines': 10, 'calls': 6, 'workers': 2}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_reports_every_suite_and_cleans_up(tmp_path):
+    output = tmp_path / 'bench.json'
+
+    call_command('bench_movements', output=str(output), check_budget=True, **SCALE)
+
+    results = json.loads(output.read_text())['results']
+    assert [(row['suite'], row['variant']) for row in results] == [
+        (suite, variant) for suite in ('fifo_allocate', 'import_plan', 'commit') for variant in ('serial', 'concurrent')
+    ]
+    assert all(row['lines'] == 6 * 10 and row['p99_ms'] >= row['p50_ms'] > 0 for row in results)
+    assert results[0]['queries_per_line'] is not None and results[1]['queries_per_line'] is None
+    assert not Product.objects.exists() and not Batch.objects.exists() and not Movement.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_fails_when_query_budget_is_exceeded():
+    with pytest.raises(CommandError, match='commit'):
+        call_command('bench_movements', suite=['commit'], check_budget=True, budget=['commit=1'], **SCALE)
@@ -0,0 +1,39 @@
+import pytest
+
+from inventory.catalog import CatalogCache, ProductUpsertService, product_cache, warehouse_cache
+from inventory.models import Product, Warehouse
+
+
+@pytest.mark.django_db
+def test_get_many_fetches_misses_in_one_query_and_stays_bounded(django_assert_num_queries):
+    for index in range(3):
+        Product.objects.create(sku=f'CC{index}', title='Cached')
+    cache = CatalogCache(Product, max_entries=2, ttl=60)
+
+    with django_assert_num_queries(1):
+        assert set(cache.get_many(['CC0', 'CC1', 'GONE'])) == {'CC0', 'CC1'}
+    with django_assert_num_queries(0):
+        assert cache.get('CC1').title == 'Cached'
+    with django_assert_num_queries(1):
+        cache.get('CC2')  # evicts the least recently used entry, CC0
+    with django_assert_num_queries(1):
+        cache.get('CC0')
+
+
+@pytest.mark.django_db
+def test_product_and_warehouse_writes_invalidate_the_cache(django_assert_num_queries):
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    product = Product.objects.create(sku='CCX', title='Before')
+    assert product_cache.get('CCX').title == 'Before'
+    assert warehouse_cache.get('blr').name == 'Bangalore'
+
+    product.title = 'Saved'
+    product.save()
+    assert product_cache.get('CCX').title == 'Saved'
+
+    ProductUpsertService().upsert([{'sku': 'CCX', 'title': 'Bulk'}])
+    assert product_cache.get('CCX').title == 'Bulk'
+
+    Warehouse.objects.get(warehouse_id='blr').delete()
+    with django_assert_num_queries(1):
+        assert warehouse_cache.get('blr') is None
@@ -0,0 +1,64 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import Batch, Product, Warehouse
+
+
+@pytest.fixture
+def api_client():
+    user = get_user_model().objects.create_user(username='api-user', password='pass')
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def batches():
+    product = Product.objects.create(sku='SKU-API', title='Listed')
+    other = Product.objects.create(sku='SKU-OTHER', title='Other')
+    warehouse = Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    created = []
+    for index in range(5):
+        created.append(
+            Batch.objects.create(
+                batch_id=f'API{index}',
+                sku=product if index < 4 else other,
+                warehouse=warehouse,
+                received_date=timezone.now().date(),
+                starting_qty=10,
+                current_qty=index,
+                compliance_status=Batch.COMPLIANCE_COMPLETE if index % 2 else Batch.COMPLIANCE_PENDING,
+            )
+        )
+    return created
+
+
+@pytest.mark.django_db
+def test_batch_list_is_cursor_paginated(api_client, batches):
+    first = api_client.get('/api/inventory/batches/', {'page_size': 2}).json()
+    assert [row['batch_id'] for row in first['results']] == ['API0', 'API1']
+    second = api_client.get(first['next']).json()
+    assert [row['batch_id'] for row in second['results']] == ['API2', 'API3']
+
+
+@pytest.mark.django_db
+def test_batch_filters(api_client, batches):
+    payload = api_client.get(
+        '/api/inventory/batches/',
+        {'sku': 'SKU-API', 'current_qty__gt': 0, 'compliance_status': Batch.COMPLIANCE_COMPLETE},
+    ).json()
+    assert [row['batch_id'] for row in payload['results']] == ['API1', 'API3']
+    assert api_client.get('/api/inventory/batches/', {'current_qty__gt': 'x'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_narrows_payload_and_select(api_client, batches):
+    with CaptureQueriesContext(connection) as ctx:
+        payload = api_client.get('/api/inventory/batches/', {'fields': 'batch_id,current_qty'}).json()
+    assert payload['results'][0] == {'batch_id': 'API0', 'current_qty': 0}
+    select = next(query['sql'] for query in ctx.captured_queries if 'FROM "inventory_batch"' in query['sql'])
+    assert '"inventory_batch"."expiry_date"' not in select
@@ -0,0 +1,122 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import (
+    Batch,
+    LedgerDailyRollup,
+    LedgerRollupService,
+    Movement,
+    MovementLine,
+    MovementService,
+    Product,
+    StockLedger,
+    Warehouse,
+)
+
+
+@pytest.fixture
+def stock():
+    product = Product.objects.create(sku='ROLL', title='Rolled', brand='Acme')
+    warehouse = Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    user = get_user_model().objects.create_user(username='roller', password='pass')
+    batch = Batch.objects.create(
+        batch_id='RL1', sku=product, warehouse=warehouse, unit_cost=Decimal('2.50'),
+        starting_qty=100, current_qty=100, compliance_status=Batch.COMPLIANCE_COMPLETE,
+    )
+    return user, batch
+
+
+def _ship(user, batch, quantity, movement_type=Movement.TYPE_FBA):
+    movement = Movement.objects.create(type=movement_type, created_by=user)
+    MovementLine.objects.create(movement=movement, sku=batch.sku, batch=batch, quantity=quantity)
+    MovementService.commit(movement)
+
+
+@pytest.mark.django_db
+def test_commit_folds_ledger_into_daily_rollup(stock):
+    user, batch = stock
+    _ship(user, batch, 4)
+    _ship(user, batch, 6)
+    _ship(user, batch, 1, Movement.TYPE_SCRAP)
+
+    fba = LedgerDailyRollup.objects.get(sku=batch.sku, movement_type=Movement.TYPE_FBA)
+    assert (fba.day, fba.qty_out, fba.value_out) == (timezone.localdate(), 10, Decimal('25.00'))
+    assert LedgerDailyRollup.objects.count() == 2
+
+    LedgerRollupService.rebuild()
+    rebuilt = LedgerDailyRollup.objects.get(sku=batch.sku, movement_type=Movement.TYPE_FBA)
+    assert (rebuilt.qty_out, rebuilt.value_out) == (10, Decimal('25.00'))
+
+
+@pytest.mark.django_db
+def test_catch_up_folds_settled_rows_once(stock, settings):
+    settings.INVENTORY_ROLLUP_AT_COMMIT = False
+    user, batch = stock
+    for quantity in (1, 2, 3):
+        _ship(user, batch, quantity)
+    assert not LedgerDailyRollup.objects.exists()
+    later = timezone.now() + timedelta(hours=1)
+
+    assert LedgerRollupService.catch_up(batch_rows=2, now=later) == 3
+    assert LedgerRollupService.catch_up(now=later) == 0
+    _ship(user, batch, 5)
+    assert LedgerRollupService.catch_up(now=timezone.now()) == 0  # not settled yet
+    assert LedgerRollupService.catch_up(now=later) == 1
+    assert LedgerDailyRollup.objects.get().qty_out == 11
+
+
+@pytest.mark.django_db
+def test_catch_up_waits_for_transactions_that_may_still_commit_older_rows(stock, settings):
+    settings.INVENTORY_ROLLUP_AT_COMMIT = False
+    user, batch = stock
+    opened, release = threading.Event(), threading.Event()
+
+    def backfill():
+        try:
+            with transaction.atomic():
+                Warehouse.objects.count()
+                opened.set()
+                release.wait(10)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=backfill)
+    thread.start()
+    try:
+        assert opened.wait(10)
+        _ship(user, batch, 2)
+        assert LedgerRollupService.catch_up(now=timezone.now() + timedelta(hours=1)) == 0
+    finally:
+        release.set()
+        thread.join()
+
+    assert LedgerRollupService.catch_up(now=timezone.now() + timedelta(hours=1)) == 1
+
+
+@pytest.mark.django_db
+def test_flow_report_groups_by_period_and_key(stock):
+    user, batch = stock
+    _ship(user, batch, 4)
+    old_day = timezone.localdate() - timedelta(days=40)
+    LedgerDailyRollup.objects.create(
+        day=old_day, warehouse_id='blr', sku_id='ROLL', movement_type='fba', qty_out=7, value_out=Decimal('17.50')
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+
+    monthly = client.get('/api/inventory/reports/flows/', {'period': 'month', 'group_by': 'brand,movement_type'}).json()
+    recent = client.get('/api/inventory/reports/flows/', {'from': str(timezone.localdate()), 'movement_type': 'fba'}).json()
+
+    assert sum(row['qty_out'] for row in monthly) == 11 and {row['brand'] for row in monthly} == {'Acme'}
+    assert recent == [
+        {'period': str(timezone.localdate()), 'sku': 'ROLL', 'qty_in': 0, 'qty_out': 4, 'value_in': '0.00', 'value_out': '10.00'}
+    ]
+    assert client.get('/api/inventory/reports/flows/', {'period': 'hour'}).status_code == 400
+    assert StockLedger.objects.count() == 1
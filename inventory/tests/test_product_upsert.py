@@ -0,0 +1,42 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from inventory.models import Product, Supplier
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_writes_only_changed_rows():
+    Supplier.objects.create(supplier_id='sup1', name='Supplier')
+    Product.objects.create(sku='UP1', title='Same', moq=10)
+    Product.objects.create(sku='UP2', title='Old title')
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='sync', password='pass'))
+    items = [
+        {'sku': 'UP1', 'title': 'Same', 'moq': 10},
+        {'sku': 'UP2', 'title': 'New title', 'supplier': 'sup1'},
+        {'sku': 'UP3', 'title': 'Created', 'gst_rate_pct': '18.00'},
+    ]
+
+    payload = client.post('/api/inventory/products/bulk-upsert/', items, format='json').json()
+
+    assert payload == {'created': 1, 'updated': 1, 'unchanged': 1}
+    updated = Product.objects.get(sku='UP2')
+    assert (updated.title, updated.supplier_id) == ('New title', 'sup1')
+    assert Product.objects.get(sku='UP3').title == 'Created'
+
+    with CaptureQueriesContext(connection) as ctx:
+        again = client.post('/api/inventory/products/bulk-upsert/', items, format='json').json()
+    assert again == {'created': 0, 'updated': 0, 'unchanged': 3}
+    assert not [q for q in ctx.captured_queries if q['sql'].startswith(('INSERT', 'UPDATE'))]
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_rejects_unknown_supplier():
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='sync2', password='pass'))
+    response = client.post('/api/inventory/products/bulk-upsert/', [{'sku': 'UPX', 'title': 'X', 'supplier': 'nope'}], format='json')
+    assert response.status_code == 400
+    assert not Product.objects.filter(sku='UPX').exists()
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from inventory.models import Batch, Movement, Product, SkuValuation, StockLedger, Warehouse
+
+
+@pytest.fixture
+def api_client():
+    Product.objects.create(sku='REC', title='Receipt')
+    Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='receipts', password='pass'))
+    return client
+
+
+@pytest.mark.django_db
+def test_receive_endpoint_writes_committed_receipt_with_ledger(api_client, django_assert_max_num_queries):
+    lines = [
+        {'batch_id': f'RC{index}', 'sku': 'REC', 'warehouse': 'blr', 'quantity': 5, 'unit_cost': '2.00'}
+        for index in range(50)
+    ]
+
+    with django_assert_max_num_queries(20):
+        response = api_client.post('/api/inventory/movements/receive/', {'external_ref': 'GRN-1', 'lines': lines}, format='json')
+
+    assert response.status_code == 201
+    body = response.json()
+    assert (body['type'], body['status'], body['external_ref'], len(body['lines'])) == ('receipt', 'committed', 'GRN-1', 50)
+    assert Batch.objects.get(batch_id='RC7').current_qty == 5
+    assert StockLedger.objects.filter(movement_id=body['movement_id'], qty_in=5).count() == 50
+    valuation = SkuValuation.objects.get(sku_id='REC', warehouse_id='blr')
+    assert (valuation.on_hand_qty, valuation.on_hand_value) == (250, Decimal('500.00'))
+
+
+@pytest.mark.django_db
+def test_receive_rejects_existing_batches_and_unknown_skus(api_client):
+    Batch.objects.create(batch_id='RCX', sku_id='REC', warehouse_id='blr', starting_qty=1, current_qty=1)
+
+    duplicate = api_client.post(
+        '/api/inventory/movements/receive/',
+        {'lines': [{'batch_id': 'RCX', 'sku': 'REC', 'warehouse': 'blr', 'quantity': 1}]},
+        format='json',
+    )
+    unknown = api_client.post(
+        '/api/inventory/movements/receive/',
+        {'lines': [{'batch_id': 'RCY', 'sku': 'NOPE', 'warehouse': 'blr', 'quantity': 1}]},
+        format='json',
+    )
+
+    assert (duplicate.status_code, unknown.status_code) == (400, 400)
+    assert not Movement.objects.exists()
+
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from inventory.models import Batch, Movement, MovementLine, Product, Warehouse
+from inventory.serializers import BatchSerializer, MovementSerializer
+
+
+@pytest.fixture
+def movement():
+    product = Product.objects.create(sku='SKU-ROW', title='Rows')
+    warehouse = Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    user = get_user_model().objects.create_user(username='row-user', password='pass')
+    movement = Movement.objects.create(type=Movement.TYPE_FBA, created_by=user, to_warehouse=warehouse, channel='amazon')
+    for index in range(3):
+        batch = Batch.objects.create(
+            batch_id=f'ROW{index}',
+            sku=product,
+            warehouse=warehouse,
+            received_date=timezone.now().date(),
+            unit_cost=Decimal('1.5') if index else None,
+            starting_qty=5,
+            current_qty=5,
+            expiry_date=timezone.now().date() if index == 2 else None,
+            amazon_stn_price=Decimal('12.30'),
+        )
+        MovementLine.objects.create(movement=movement, sku=product, batch=batch, quantity=index + 1, note=f'line {index}')
+    return movement
+
+
+@pytest.mark.django_db
+def test_row_path_matches_model_serializer_bytes(movement):
+    client = APIClient()
+    client.force_authenticate(movement.created_by)
+    renderer = JSONRenderer()
+
+    batches = Batch.objects.order_by('batch_id')
+    expected_batches = renderer.render(BatchSerializer(batches, many=True).data)
+    assert renderer.render(client.get('/api/inventory/batches/').data['results']) == expected_batches
+
+    instance = Movement.objects.prefetch_related(
+        Prefetch('lines', queryset=MovementLine.objects.order_by('movement_line_id'))
+    ).get(pk=movement.pk)
+    expected_movement = renderer.render(MovementSerializer(instance).data)
+    assert renderer.render(client.get(f'/api/inventory/movements/{movement.pk}/').data) == expected_movement
+    assert renderer.render(client.get('/api/inventory/movements/').data['results']) == b'[' + expected_movement + b']'
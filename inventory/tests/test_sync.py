@@ -0,0 +1,70 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import Batch, Product, Warehouse
+from inventory.sync import ChangeFeedService
+
+
+@pytest.mark.django_db
+def test_change_feed_pages_and_resumes_from_cursor():
+    warehouse = Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    products = [Product.objects.create(sku=f'SYNC{index}', title='Synced') for index in range(3)]
+    Batch.objects.create(batch_id='SB1', sku=products[0], warehouse=warehouse, starting_qty=4, current_qty=4)
+    later = timezone.now() + timedelta(seconds=10)
+
+    first = ChangeFeedService(limit=2, now=later).changes(None)
+    assert [row[0] for row in first['products']['rows']] == ['SYNC0', 'SYNC1']
+    assert first['products']['columns'][0] == 'sku'
+    assert first['batches']['rows'][0][:4] == ['SB1', 'SYNC0', 'blr', 4]
+    assert first['has_more'] is True
+
+    second = ChangeFeedService(limit=2, now=later).changes(first['cursor'])
+    assert [row[0] for row in second['products']['rows']] == ['SYNC2']
+    assert second['batches']['rows'] == []
+    assert second['has_more'] is False
+
+    Batch.objects.filter(batch_id='SB1').update(current_qty=1, updated_at=later)
+    third = ChangeFeedService(limit=2, now=later + timedelta(seconds=10)).changes(second['cursor'])
+    assert third['products']['rows'] == []
+    assert [row[3] for row in third['batches']['rows']] == [1]
+
+
+@pytest.mark.django_db
+def test_sync_endpoint_rejects_bad_cursor():
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='scanner', password='pass'))
+    assert client.get('/api/inventory/sync/').status_code == 200
+    assert client.get('/api/inventory/sync/', {'cursor': 'not-a-cursor'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_horizon_waits_for_transactions_still_open_elsewhere():
+    opened, release = threading.Event(), threading.Event()
+
+    def writer():
+        try:
+            with transaction.atomic():
+                Product.objects.create(sku='SYNC-OPEN', title='Uncommitted')
+                opened.set()
+                release.wait(10)
+                transaction.set_rollback(True)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        assert opened.wait(10)
+        held = ChangeFeedService(now=timezone.now() + timedelta(minutes=5)).horizon
+    finally:
+        release.set()
+        thread.join()
+
+    assert held < timezone.now()
+    assert ChangeFeedService(now=timezone.now() + timedelta(minutes=5)).horizon > timezone.now()
@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import (
+    Batch,
+    BatchCostLayer,
+    CostLayerService,
+    Movement,
+    MovementLine,
+    MovementService,
+    Product,
+    SkuValuation,
+    Warehouse,
+)
+
+
+def _receive(user, batch, quantity):
+    movement = Movement.objects.create(type=Movement.TYPE_RECEIPT, created_by=user)
+    MovementLine.objects.create(movement=movement, sku=batch.sku, batch=batch, quantity=quantity)
+    MovementService.commit(movement)
+
+
+@pytest.mark.django_db
+def test_commit_maintains_cost_layers_and_valuation():
+    product = Product.objects.create(sku='SKU-VAL', title='Valued', brand='Acme')
+    warehouse = Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    user = get_user_model().objects.create_user(username='valuer', password='pass')
+    old = Batch.objects.create(
+        batch_id='V1', sku=product, warehouse=warehouse, received_date=timezone.now().date(),
+        unit_cost=Decimal('2.00'), starting_qty=10, current_qty=0, compliance_status=Batch.COMPLIANCE_COMPLETE,
+    )
+    new = Batch.objects.create(
+        batch_id='V2', sku=product, warehouse=warehouse, received_date=timezone.now().date(),
+        unit_cost=Decimal('3.50'), starting_qty=10, current_qty=0, compliance_status=Batch.COMPLIANCE_COMPLETE,
+    )
+    _receive(user, old, 10)
+    _receive(user, new, 10)
+
+    outbound = Movement.objects.create(type=Movement.TYPE_FBA, created_by=user)
+    for allocation in MovementService.fifo_allocate(product, warehouse, 12):
+        MovementLine.objects.create(movement=outbound, sku=product, batch=allocation.batch, quantity=allocation.quantity)
+    MovementService.commit(outbound)
+
+    assert BatchCostLayer.objects.get(batch=old).remaining_qty == 0
+    layer = BatchCostLayer.objects.get(batch=new)
+    assert layer.remaining_qty == 8
+    assert layer.remaining_value == Decimal('28.00')
+    valuation = SkuValuation.objects.get(sku=product, warehouse=warehouse)
+    assert valuation.on_hand_qty == 8
+    assert valuation.on_hand_value == Decimal('28.00')
+    assert valuation.cogs_value == Decimal('27.00')
+
+    CostLayerService.rebuild()
+    rebuilt = SkuValuation.objects.get(sku=product, warehouse=warehouse)
+    assert (rebuilt.on_hand_qty, rebuilt.on_hand_value, rebuilt.cogs_value) == (8, Decimal('28.00'), Decimal('27.00'))
+
+    client = APIClient()
+    client.force_authenticate(user)
+    payload = client.get('/api/inventory/valuation/', {'group_by': 'brand'}).json()
+    assert payload == [{'brand': 'Acme', 'on_hand_qty': 8, 'on_hand_value': '28.00', 'cogs_value': '27.00'}]
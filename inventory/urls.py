@@ -1,7 +1,15 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import BatchViewSet, MovementViewSet, ProductViewSet
+from .views import (
+    AgingReportView,
+    BatchViewSet,
+    LedgerFlowReportView,
+    MovementViewSet,
+    ProductViewSet,
+    SyncView,
+    ValuationView,
+)
 
 app_name = 'inventory'
 
@@ -11,5 +19,9 @@ router.register('batches', BatchViewSet)
 router.register('movements', MovementViewSet)
 
 urlpatterns = [
+    path('valuation/', ValuationView.as_view(), name='valuation'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('reports/aging/', AgingReportView.as_view(), name='report-aging'),
+    path('reports/flows/', LedgerFlowReportView.as_view(), name='report-flows'),
     path('', include(router.urls)),
 ]
@@ -1,26 +1,206 @@
-from rest_framework import permissions, response, status, viewsets
+import csv
+from datetime import timedelta
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError
+from django.db.models import Prefetch, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import exceptions, permissions, response, status, views, viewsets
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+
+from core.db_routing import reporting
+
+from .aging import DEFAULT_AGE_EDGES, DEFAULT_EXPIRY_EDGES, AgingReport, parse_edges
+from .catalog import ProductUpsertService
+from .models import Batch, LedgerDailyRollup, Movement, MovementLine, MovementService, Product, SkuValuation
+from .pagination import BatchCursorPagination, MovementCursorPagination, ProductCursorPagination
+from .receipts import ReceiptLine, ReceiptService
+from .row_serializers import RowSerializer
+from .serializers import (
+    BatchSerializer,
+    MovementSerializer,
+    ProductSerializer,
+    ProductUpsertSerializer,
+    ReceiptSerializer,
+    requested_fields,
+)
+from .sync import ChangeFeedService
+
+
+class FilteredListMixin:
+    """Server-side filtering and ``?fields=`` column narrowing for list endpoints.
+
+    ``filter_params`` maps a query parameter to an ORM lookup and a parser used
+    to validate its value.
+    """
+
+    filter_params: dict = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        filters = {}
+        for param, (lookup, parse) in self.filter_params.items():
+            raw = params.get(param)
+            if raw in (None, ''):
+                continue
+            try:
+                filters[lookup] = parse(raw)
+            except (TypeError, ValueError):
+                raise exceptions.ValidationError({param: f'Invalid value {raw!r}'})
+        if filters:
+            queryset = queryset.filter(**filters)
+        if self.request.method == 'GET':
+            columns = self._selected_columns(queryset.model)
+            if columns:
+                queryset = queryset.only(*columns)
+        return queryset
+
+    def _selected_columns(self, model) -> list[str]:
+        wanted = requested_fields(self.request)
+        if not wanted:
+            return []
+        columns = []
+        for name in wanted:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                columns.append(name)
+        return columns
+
+
+class RowReadMixin:
+    """Serves ``list`` and ``retrieve`` from ``.values()`` rows instead of model instances.
+
+    Output is identical to the viewset's serializer; writes still go through it.
+    """
+
+    def get_row_serializer(self) -> RowSerializer:
+        return RowSerializer(self.get_serializer_class(), context=self.get_serializer_context())
+
+    def render_rows(self, row_serializer: RowSerializer, rows: list[dict]) -> list[dict]:
+        return row_serializer.render(rows)
 
-from .models import Batch, Movement, MovementService, Product
-from .serializers import BatchSerializer, MovementSerializer, ProductSerializer
+    def _row_queryset(self, row_serializer: RowSerializer):
+        pk_name = self.get_queryset().model._meta.pk.name
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        return queryset.values(*row_serializer.sources(pk_name))
 
+    def list(self, request, *args, **kwargs):
+        row_serializer = self.get_row_serializer()
+        queryset = self._row_queryset(row_serializer)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.render_rows(row_serializer, page))
+        return response.Response(self.render_rows(row_serializer, list(queryset)))
 
-class ProductViewSet(viewsets.ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        row_serializer = self.get_row_serializer()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(self._row_queryset(row_serializer), **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return response.Response(self.render_rows(row_serializer, [row])[0])
+
+
+class ProductViewSet(FilteredListMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ProductCursorPagination
+    filter_params = {
+        'brand': ('brand', str),
+        'status': ('status', str),
+        'supplier': ('supplier_id', str),
+    }
 
+    @action(detail=False, methods=['post'], url_path='bulk-upsert')
+    def bulk_upsert(self, request):
+        serializer = ProductUpsertSerializer(data=request.data, many=True, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = ProductUpsertService().upsert(serializer.validated_data)
+        except ValueError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(
+            {'created': result.created, 'updated': result.updated, 'unchanged': result.unchanged},
+            status=status.HTTP_200_OK,
+        )
 
-class BatchViewSet(viewsets.ModelViewSet):
-    queryset = Batch.objects.select_related('sku', 'warehouse')
+
+class BatchViewSet(RowReadMixin, FilteredListMixin, viewsets.ModelViewSet):
+    queryset = Batch.objects.all()
     serializer_class = BatchSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BatchCursorPagination
+    filter_params = {
+        'sku': ('sku_id', str),
+        'warehouse': ('warehouse_id', str),
+        'current_qty__gt': ('current_qty__gt', int),
+        'compliance_status': ('compliance_status', str),
+    }
 
 
-class MovementViewSet(viewsets.ModelViewSet):
-    queryset = Movement.objects.prefetch_related('lines')
+class MovementViewSet(RowReadMixin, FilteredListMixin, viewsets.ModelViewSet):
+    queryset = Movement.objects.prefetch_related(
+        Prefetch('lines', queryset=MovementLine.objects.order_by('movement_line_id'))
+    )
     serializer_class = MovementSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MovementCursorPagination
+    filter_params = {
+        'type': ('type', str),
+        'status': ('status', str),
+        'from_warehouse': ('from_warehouse_id', str),
+        'to_warehouse': ('to_warehouse_id', str),
+    }
+
+    def render_rows(self, row_serializer, rows):
+        lines_serializer = row_serializer.children.get('lines')
+        if lines_serializer is None or not rows:
+            return row_serializer.render(rows)
+        lines = (
+            MovementLine.objects.filter(movement_id__in=[row['movement_id'] for row in rows])
+            .order_by('movement_line_id')
+            .values(*lines_serializer.sources('movement_id'))
+        )
+        return row_serializer.render(
+            rows,
+            nested={'lines': lines_serializer.group_by(lines, 'movement_id')},
+            key='movement_id',
+        )
+
+    @action(detail=False, methods=['post'])
+    def receive(self, request):
+        """Receive new batches as one committed receipt movement."""
+        serializer = ReceiptSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        service = ReceiptService(request.user, external_ref=serializer.validated_data['external_ref'])
+        lines = [
+            ReceiptLine(
+                batch=Batch(
+                    batch_id=line['batch_id'],
+                    sku_id=line['sku'],
+                    warehouse_id=line['warehouse'],
+                    received_date=line.get('received_date') or timezone.now().date(),
+                    unit_cost=line.get('unit_cost'),
+                    expiry_date=line.get('expiry_date'),
+                    starting_qty=line['quantity'],
+                ),
+                note=line['note'],
+            )
+            for line in serializer.validated_data['lines']
+        ]
+        try:
+            service.receive(lines)
+        except IntegrityError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        movement = self.get_queryset().get(pk=service.movement.pk)
+        return response.Response(self.get_serializer(movement).data, status=status.HTTP_201_CREATED)
 
     @action(detail=True, methods=['post'])
     def commit(self, request, pk=None):
@@ -31,3 +211,174 @@ class MovementViewSet(viewsets.ModelViewSet):
             return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         serializer = self.get_serializer(movement)
         return response.Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ValuationView(views.APIView):
+    """Inventory value and COGS read from the maintained ``SkuValuation`` aggregates."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    GROUP_FIELDS = {
+        'warehouse': 'warehouse_id',
+        'brand': 'sku__brand',
+        'supplier': 'sku__supplier_id',
+        'sku': 'sku_id',
+    }
+
+    def get(self, request):
+        group_by = request.query_params.get('group_by', 'warehouse')
+        group_field = self.GROUP_FIELDS.get(group_by)
+        if group_field is None:
+            return response.Response(
+                {'detail': f"group_by must be one of {', '.join(self.GROUP_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = SkuValuation.objects.all()
+        warehouse = request.query_params.get('warehouse')
+        if warehouse:
+            queryset = queryset.filter(warehouse_id=warehouse)
+        rows = (
+            queryset.values(group_field)
+            .annotate(
+                on_hand_qty=Sum('on_hand_qty'),
+                on_hand_value=Sum('on_hand_value'),
+                cogs_value=Sum('cogs_value'),
+            )
+            .order_by(group_field)
+        )
+        with reporting():
+            rows = list(rows)
+        payload = [
+            {
+                group_by: row[group_field],
+                'on_hand_qty': row['on_hand_qty'],
+                'on_hand_value': str(row['on_hand_value']),
+                'cogs_value': str(row['cogs_value']),
+            }
+            for row in rows
+        ]
+        return response.Response(payload, status=status.HTTP_200_OK)
+
+
+class LedgerFlowReportView(views.APIView):
+    """Units and value moved per period, read from the daily ledger rollup.
+
+    ``period`` is day, week or month; ``group_by`` is a comma list of sku,
+    warehouse, movement_type and brand. ``from``/``to`` bound the days
+    (inclusive, default the last 90), and sku, warehouse and movement_type filter.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    PERIODS = {'day': None, 'week': TruncWeek, 'month': TruncMonth}
+    GROUP_FIELDS = {
+        'sku': 'sku_id',
+        'warehouse': 'warehouse_id',
+        'movement_type': 'movement_type',
+        'brand': 'sku__brand',
+    }
+    FILTERS = {'sku': 'sku_id', 'warehouse': 'warehouse_id', 'movement_type': 'movement_type'}
+    default_days = 90
+
+    def get(self, request):
+        params = request.query_params
+        period = params.get('period', 'day')
+        group_by = [name.strip() for name in params.get('group_by', 'sku').split(',') if name.strip()]
+        errors = {}
+        if period not in self.PERIODS:
+            errors['period'] = f"period must be one of {', '.join(self.PERIODS)}"
+        unknown = [name for name in group_by if name not in self.GROUP_FIELDS]
+        if unknown:
+            errors['group_by'] = f"group_by must be drawn from {', '.join(self.GROUP_FIELDS)}"
+        try:
+            day_to = parse_date(params['to']) if params.get('to') else timezone.localdate()
+            day_from = parse_date(params['from']) if params.get('from') else day_to - timedelta(days=self.default_days)
+        except (TypeError, ValueError):
+            day_from = day_to = None
+        if day_from is None or day_to is None:
+            errors['from'] = 'from and to must be YYYY-MM-DD dates'
+        if errors:
+            return response.Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = LedgerDailyRollup.objects.filter(day__gte=day_from, day__lte=day_to)
+        for param, lookup in self.FILTERS.items():
+            if params.get(param):
+                queryset = queryset.filter(**{lookup: params[param]})
+        trunc = self.PERIODS[period]
+        if trunc is not None:
+            queryset = queryset.annotate(period=trunc('day'))
+        period_field = 'day' if trunc is None else 'period'
+        fields = [period_field, *(self.GROUP_FIELDS[name] for name in group_by)]
+        rows = (
+            queryset.values(*fields)
+            .annotate(qty_in=Sum('qty_in'), qty_out=Sum('qty_out'), value_in=Sum('value_in'), value_out=Sum('value_out'))
+            .order_by(*fields)
+        )
+        with reporting():
+            rows = list(rows)
+        payload = [
+            {
+                'period': row[period_field],
+                **{name: row[self.GROUP_FIELDS[name]] for name in group_by},
+                'qty_in': row['qty_in'],
+                'qty_out': row['qty_out'],
+                'value_in': str(row['value_in']),
+                'value_out': str(row['value_out']),
+            }
+            for row in rows
+        ]
+        return response.Response(payload, status=status.HTTP_200_OK)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+class AgingReportView(views.APIView):
+    """On-hand units and value bucketed by age and days to expiry.
+
+    ``group_by`` is sku or warehouse; ``age_buckets`` and ``expiry_buckets``
+    are comma lists of bucket edges in days; sku and warehouse filter.
+    ``?output=csv`` streams the report as flat CSV.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            report = AgingReport(
+                params.get('group_by', 'sku'),
+                age_edges=parse_edges(params.get('age_buckets'), DEFAULT_AGE_EDGES),
+                expiry_edges=parse_edges(params.get('expiry_buckets'), DEFAULT_EXPIRY_EDGES),
+                sku=params.get('sku'),
+                warehouse=params.get('warehouse'),
+            )
+        except ValueError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('output') == 'csv':
+            stream = StreamingHttpResponse(self._csv(report), content_type='text/csv')
+            stream['Content-Disposition'] = f'attachment; filename="aging-{report.today.isoformat()}.csv"'
+            return stream
+        with reporting():
+            payload = report.payload()
+        return response.Response(payload, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _csv(report):
+        writer = csv.writer(_Echo())
+        with reporting():
+            for row in report.csv_rows():
+                yield writer.writerow(row)
+
+
+class SyncView(views.APIView):
+    """Change feed for offline clients: rows changed since ``?cursor=``."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit') or 0) or None
+            payload = ChangeFeedService(limit=limit).changes(request.query_params.get('cursor'))
+        except ValueError as exc:
+            return response.Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(payload, status=status.HTTP_200_OK)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import ValidationError
+
+from authz.authentication import aauthenticate
+from core.db_routing import reporting
+
+from .services import aload_planner_inputs, build_planner_outputs
+from .velocity import AduChoice
+from .views import ExcessView, FBAView, FlagsView, PlannerBaseView, ReorderView
+
+
+class AsyncPlannerView(View):
+    """Async twin of a planner ``APIView`` for ASGI deployments.
+
+    Accepts ``Authorization: Token <key>`` only. ``?concurrent=1`` (or
+    ``PLANNER_ASYNC_CONCURRENT_INPUTS``) runs the bulk input queries in parallel.
+    """
+
+    planner_view: type[PlannerBaseView]
+
+    async def get(self, request):
+        user = await aauthenticate(request)
+        if user is None:
+            return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+        concurrent = request.GET.get("concurrent", "1" if settings.PLANNER_ASYNC_CONCURRENT_INPUTS else "0") == "1"
+        try:
+            adu = AduChoice.from_params(request.GET)
+        except ValidationError as exc:
+            return JsonResponse(exc.detail, status=400)
+        with reporting():
+            inputs = await aload_planner_inputs(concurrent=concurrent, adu=adu)
+        payload = [self.planner_view.row(item, build_planner_outputs(item)) for item in inputs]
+        return JsonResponse(payload, safe=False)
+
+
+class AsyncReorderView(AsyncPlannerView):
+    planner_view = ReorderView
+
+
+class AsyncFBAView(AsyncPlannerView):
+    planner_view = FBAView
+
+
+class AsyncExcessView(AsyncPlannerView):
+    planner_view = ExcessView
+
+
+class AsyncFlagsView(AsyncPlannerView):
+    planner_view = FlagsView
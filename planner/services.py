@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from decimal import Decimal
+from typing import Callable
 
-from django.db.models import Avg
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Avg, Sum
 
 from inventory.models import Batch, ManualOrders, Product
 
+from .velocity import AduChoice, internal_adu, internal_adu_query
+
+BLR_WAREHOUSE_ID = "blr"
+
 
 @dataclass
 class PlannerInputs:
@@ -16,6 +24,7 @@ class PlannerInputs:
     fba_stock: int
     manual_orders: ManualOrders | None
     sellerboard_recommended: int
+    avg_unit_cost: Decimal | None = None
 
 
 @dataclass
@@ -83,13 +92,21 @@ def compute_less_than_sellerboard(inputs: PlannerInputs) -> bool:
     return diff > 0
 
 
-def compute_excess(product: Product, adu: float, blr_on_hand: int, fba_stock: int) -> tuple[int, Decimal]:
+def compute_excess(
+    product: Product,
+    adu: float,
+    blr_on_hand: int,
+    fba_stock: int,
+    avg_unit_cost: Decimal | None = None,
+) -> tuple[int, Decimal]:
     threshold = int(adu * 120)
     combined = blr_on_hand + fba_stock
     if combined <= threshold:
         return 0, Decimal("0")
     excess_units = combined - threshold
-    avg_cost = Batch.objects.filter(sku=product).aggregate(avg=Avg("unit_cost")).get("avg")
+    avg_cost = avg_unit_cost
+    if avg_cost is None:
+        avg_cost = Batch.objects.filter(sku=product).aggregate(avg=Avg("unit_cost")).get("avg")
     avg_cost_decimal = Decimal(avg_cost or 0)
     return excess_units, avg_cost_decimal * excess_units
 
@@ -99,7 +116,9 @@ def build_planner_outputs(inputs: PlannerInputs) -> PlannerOutputs:
     send_to_fba = compute_send_to_fba(inputs.product, inputs.adu, inputs.fba_stock, inputs.blr_on_hand)
     low_fba_flag = compute_low_fba_flag(inputs.fba_stock, inputs.blr_on_hand)
     less_than_sellerboard_flag = compute_less_than_sellerboard(inputs)
-    excess_units, excess_value = compute_excess(inputs.product, inputs.adu, inputs.blr_on_hand, inputs.fba_stock)
+    excess_units, excess_value = compute_excess(
+        inputs.product, inputs.adu, inputs.blr_on_hand, inputs.fba_stock, inputs.avg_unit_cost
+    )
     return PlannerOutputs(
         reorder_qty=reorder_qty,
         send_to_fba=send_to_fba,
@@ -108,3 +127,92 @@ def build_planner_outputs(inputs: PlannerInputs) -> PlannerOutputs:
         excess_units=excess_units,
         excess_value=excess_value,
     )
+
+
+def _products_query():
+    return Product.objects.select_related("sellerboardmetrics", "manualorders")
+
+
+def _blr_on_hand_query():
+    return (
+        Batch.objects.filter(warehouse_id=BLR_WAREHOUSE_ID)
+        .values("sku_id")
+        .annotate(total=Sum("current_qty"))
+        .values_list("sku_id", "total")
+    )
+
+
+def _avg_cost_query():
+    return Batch.objects.values("sku_id").annotate(avg=Avg("unit_cost")).values_list("sku_id", "avg")
+
+
+def _assemble_inputs(
+    products, blr_on_hand: dict, avg_costs: dict, adu: AduChoice, internal: dict[str, float]
+) -> list[PlannerInputs]:
+    inputs = []
+    for product in products:
+        metrics = getattr(product, "sellerboardmetrics", None)
+        inputs.append(
+            PlannerInputs(
+                product=product,
+                adu=adu.resolve(metrics.adu if metrics else 0, internal.get(product.sku, 0)),
+                blr_on_hand=blr_on_hand.get(product.sku) or 0,
+                fba_stock=(metrics.fba_available + metrics.fba_reserved) if metrics else 0,
+                manual_orders=getattr(product, "manualorders", None),
+                sellerboard_recommended=metrics.recommended_quantity if metrics else 0,
+                avg_unit_cost=avg_costs.get(product.sku) or Decimal("0"),
+            )
+        )
+    return inputs
+
+
+def load_planner_inputs(adu: AduChoice | None = None) -> list[PlannerInputs]:
+    """Planner inputs for every product from three set-based queries.
+
+    ``adu`` picks Sellerboard, internal or blended ADU (default from settings);
+    internal ADU costs one more query against the daily ledger rollup.
+    """
+    adu = adu or AduChoice.default()
+    internal = internal_adu(internal_adu_query(adu.window), adu.window) if adu.needs_internal else {}
+    return _assemble_inputs(
+        list(_products_query()), dict(_blr_on_hand_query()), dict(_avg_cost_query()), adu, internal
+    )
+
+
+def _isolated(fetch: Callable[[], list]):
+    """Run ``fetch`` on a worker thread with its own DB connection, closed afterwards."""
+
+    def run():
+        try:
+            return fetch()
+        finally:
+            connections.close_all()
+
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+async def aload_planner_inputs(*, concurrent: bool = False, adu: AduChoice | None = None) -> list[PlannerInputs]:
+    """Async counterpart of :func:`load_planner_inputs`.
+
+    With ``concurrent`` the three input queries run in parallel, each on a
+    short-lived connection of its own; otherwise they run one after another
+    through the async ORM on the request's connection.
+    """
+    adu = adu or AduChoice.default()
+
+    async def no_rows():
+        return []
+
+    if concurrent:
+        products, blr_rows, cost_rows, adu_rows = await asyncio.gather(
+            _isolated(lambda: list(_products_query())),
+            _isolated(lambda: list(_blr_on_hand_query())),
+            _isolated(lambda: list(_avg_cost_query())),
+            _isolated(lambda: list(internal_adu_query(adu.window))) if adu.needs_internal else no_rows(),
+        )
+    else:
+        products = [product async for product in _products_query()]
+        blr_rows = [row async for row in _blr_on_hand_query()]
+        cost_rows = [row async for row in _avg_cost_query()]
+        adu_rows = [row async for row in internal_adu_query(adu.window)] if adu.needs_internal else []
+    return _assemble_inputs(products, dict(blr_rows), dict(cost_rows), adu, internal_adu(adu_rows, adu.window))
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+import asyncio
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import AsyncClient
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from inventory.models import Batch, Product, SellerboardMetrics, Warehouse
+
+
+def _seed(count):
+    warehouse = Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    for index in range(count):
+        product = Product.objects.create(sku=f'PV{index}', title='Planned')
+        SellerboardMetrics.objects.create(sku=product, adu=0.1, fba_available=20, recommended_quantity=50)
+        Batch.objects.create(
+            batch_id=f'PVB{index}', sku=product, warehouse=warehouse,
+            unit_cost=Decimal('4.00'), starting_qty=30, current_qty=30,
+        )
+    user = get_user_model().objects.create_user(username='planner', password='pass')
+    return user, Token.objects.create(user=user)
+
+
+@pytest.mark.django_db
+def test_planner_views_use_constant_queries(django_assert_max_num_queries):
+    user, _ = _seed(5)
+    client = APIClient()
+    client.force_authenticate(user)
+    with django_assert_max_num_queries(3):
+        payload = client.get('/api/planner/excess/').json()
+    assert (payload[0]['sku'], payload[0]['excess_units']) == ('PV0', 38)
+    assert Decimal(payload[0]['excess_value']) == Decimal('152')
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('concurrent', ['0', '1'])
+def test_async_planner_matches_sync_view(concurrent):
+    user, token = _seed(3)
+    client = APIClient()
+    client.force_authenticate(user)
+    expected = client.get('/api/planner/reorder/').json()
+
+    async_client = AsyncClient()
+
+    async def fetch():
+        return await async_client.get(
+            '/api/planner/async/reorder/', {'concurrent': concurrent}, headers={'Authorization': f'Token {token.key}'}
+        )
+
+    response = asyncio.run(fetch())
+    assert response.status_code == 200
+    assert response.json() == expected
+    assert asyncio.run(async_client.get('/api/planner/async/reorder/')).status_code == 401
+    asyncio.run(sync_to_async(connections.close_all)())
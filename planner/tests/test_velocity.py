@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import LedgerDailyRollup, Movement, Product, SellerboardMetrics, Warehouse
+from planner.services import load_planner_inputs
+from planner.velocity import AduChoice, internal_adu, internal_adu_query, velocity_windows
+
+
+@pytest.fixture
+def flows():
+    warehouse = Warehouse.objects.create(warehouse_id='blr', name='Bangalore')
+    product = Product.objects.create(sku='VEL', title='Velocity')
+    SellerboardMetrics.objects.create(sku=product, adu=2.0)
+    today = timezone.localdate()
+    for days_ago, qty in [(0, 500), (1, 70), (10, 230), (60, 600)]:
+        LedgerDailyRollup.objects.create(
+            day=today - timedelta(days=days_ago), warehouse=warehouse, sku=product,
+            movement_type=Movement.TYPE_FBA, qty_out=qty,
+        )
+    LedgerDailyRollup.objects.create(
+        day=today - timedelta(days=1), warehouse=warehouse, sku=product, movement_type=Movement.TYPE_SCRAP, qty_out=99,
+    )
+    return product
+
+
+@pytest.mark.django_db
+def test_windows_count_complete_days_of_fba_outbound(flows):
+    assert velocity_windows() == {'VEL': {7: 10.0, 30: 10.0, 90: 10.0}}
+    assert internal_adu(internal_adu_query(7), 7) == {'VEL': 10.0}
+
+
+@pytest.mark.django_db
+def test_planner_resolves_sellerboard_internal_or_blend(flows):
+    sources = {
+        choice: load_planner_inputs(AduChoice(*choice))[0].adu
+        for choice in [('sellerboard', 30), ('internal', 7), ('blend', 30, 0.25)]
+    }
+    assert sources == {('sellerboard', 30): 2.0, ('internal', 7): 10.0, ('blend', 30, 0.25): 4.0}
+
+
+@pytest.mark.django_db
+def test_planner_views_validate_adu_params(flows):
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.create_user(username='vel', password='pass'))
+
+    assert client.get('/api/planner/fba/', {'adu_source': 'internal', 'adu_window': 7}).status_code == 200
+    bad = client.get('/api/planner/fba/', {'adu_source': 'guess', 'adu_window': 14, 'blend_weight': 2})
+    assert bad.status_code == 400
+    assert set(bad.json()) == {'adu_source', 'adu_window', 'blend_weight'}
+    velocity = client.get('/api/planner/velocity/', {'sku': 'VEL'}).json()
+    assert velocity == [{'sku': 'VEL', 'sellerboard_adu': 2.0, 'internal_adu': {'7': 10.0, '30': 10.0, '90': 10.0}}]
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'planner'
 
@@ -9,4 +9,9 @@ urlpatterns = [
     path('fba/', views.FBAView.as_view(), name='fba'),
     path('excess/', views.ExcessView.as_view(), name='excess'),
     path('flags/', views.FlagsView.as_view(), name='flags'),
+    path('velocity/', views.VelocityView.as_view(), name='velocity'),
+    path('async/reorder/', async_views.AsyncReorderView.as_view(), name='async-reorder'),
+    path('async/fba/', async_views.AsyncFBAView.as_view(), name='async-fba'),
+    path('async/excess/', async_views.AsyncExcessView.as_view(), name='async-excess'),
+    path('async/flags/', async_views.AsyncFlagsView.as_view(), name='async-flags'),
 ]
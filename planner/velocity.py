@@ -0,0 +1,108 @@
+"""Internal sales velocity (ADU) from FBA outbound ledger flows.
+
+Units sent to FBA are read from ``LedgerDailyRollup``, which is kept up to
+date from new ledger rows at commit (or by ``rollup_ledger``), so a rolling
+window costs one grouped read of at most ``window`` rows per SKU instead of a
+ledger rescan. Windows cover the last N complete days, ending yesterday.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from inventory.models import LedgerDailyRollup, Movement
+
+SOURCE_SELLERBOARD = "sellerboard"
+SOURCE_INTERNAL = "internal"
+SOURCE_BLEND = "blend"
+SOURCES = (SOURCE_SELLERBOARD, SOURCE_INTERNAL, SOURCE_BLEND)
+
+
+@dataclass(frozen=True)
+class AduChoice:
+    """Which ADU the planner uses: ``source``, internal ``window`` and blend ``weight``.
+
+    ``weight`` is the internal share of a blend; Sellerboard gets the rest.
+    """
+
+    source: str = SOURCE_SELLERBOARD
+    window: int = 30
+    weight: float = 0.5
+
+    @classmethod
+    def default(cls) -> "AduChoice":
+        return cls(settings.PLANNER_ADU_SOURCE, settings.PLANNER_ADU_WINDOW_DAYS, settings.PLANNER_ADU_BLEND_WEIGHT)
+
+    @classmethod
+    def from_params(cls, params) -> "AduChoice":
+        """Read ``adu_source``, ``adu_window`` and ``blend_weight`` over the configured defaults."""
+        default = cls.default()
+        errors = {}
+        source = params.get("adu_source") or default.source
+        if source not in SOURCES:
+            errors["adu_source"] = f"adu_source must be one of {', '.join(SOURCES)}"
+        try:
+            window = int(params.get("adu_window") or default.window)
+        except ValueError:
+            window = None
+        if window not in settings.PLANNER_ADU_WINDOWS:
+            errors["adu_window"] = f"adu_window must be one of {', '.join(map(str, settings.PLANNER_ADU_WINDOWS))}"
+        try:
+            weight = float(params.get("blend_weight") or default.weight)
+        except ValueError:
+            weight = None
+        if weight is None or not 0 <= weight <= 1:
+            errors["blend_weight"] = "blend_weight must be between 0 and 1"
+        if errors:
+            raise ValidationError(errors)
+        return cls(source, window, weight)
+
+    @property
+    def needs_internal(self) -> bool:
+        return self.source != SOURCE_SELLERBOARD
+
+    def resolve(self, sellerboard: float, internal: float) -> float:
+        if self.source == SOURCE_INTERNAL:
+            return internal
+        if self.source == SOURCE_BLEND:
+            return self.weight * internal + (1 - self.weight) * sellerboard
+        return sellerboard
+
+
+def _fba_outbound(today: date | None = None):
+    today = today or timezone.localdate()
+    return LedgerDailyRollup.objects.filter(movement_type=Movement.TYPE_FBA, day__lt=today), today
+
+
+def internal_adu_query(window: int, today: date | None = None):
+    """``(sku_id, units)`` sent to FBA over the ``window`` complete days before ``today``."""
+    queryset, today = _fba_outbound(today)
+    return (
+        queryset.filter(day__gte=today - timedelta(days=window))
+        .values("sku_id")
+        .annotate(units=Sum("qty_out"))
+        .values_list("sku_id", "units")
+    )
+
+
+def internal_adu(rows, window: int) -> dict[str, float]:
+    return {sku: (units or 0) / window for sku, units in rows}
+
+
+def velocity_windows(skus=None, today: date | None = None) -> dict[str, dict[int, float]]:
+    """ADU per configured window for each SKU with FBA flows, from one grouped query."""
+    windows = sorted(settings.PLANNER_ADU_WINDOWS)
+    queryset, today = _fba_outbound(today)
+    queryset = queryset.filter(day__gte=today - timedelta(days=windows[-1]))
+    if skus:
+        queryset = queryset.filter(sku_id__in=skus)
+    sums = {f"units_{window}": Sum("qty_out", filter=Q(day__gte=today - timedelta(days=window))) for window in windows}
+    result = {}
+    for row in queryset.values("sku_id").annotate(**sums).order_by("sku_id"):
+        result[row["sku_id"]] = {window: (row[f"units_{window}"] or 0) / window for window in windows}
+    return result
@@ -1,107 +1,100 @@
 from __future__ import annotations
 
-from django.db.models import Sum
+from typing import Callable
+
+from django.conf import settings
 from rest_framework import permissions, response, status, views
 
-from inventory.models import Batch, Product, SellerboardMetrics
-
-from .services import PlannerInputs, build_planner_outputs, compute_low_fba_flag
-
-
-def _planner_inputs(product: Product) -> PlannerInputs:
-    metrics: SellerboardMetrics | None = getattr(product, "sellerboardmetrics", None)
-    adu = metrics.adu if metrics else 0
-    fba_available = metrics.fba_available if metrics else 0
-    fba_reserved = metrics.fba_reserved if metrics else 0
-    fba_stock = fba_available + fba_reserved
-    manual_orders = getattr(product, "manualorders", None)
-    blr_on_hand = (
-        Batch.objects.filter(sku=product, warehouse__warehouse_id="blr")
-        .aggregate(total=Sum("current_qty"))
-        .get("total")
-        or 0
-    )
-    recommended = metrics.recommended_quantity if metrics else 0
-    return PlannerInputs(
-        product=product,
-        adu=adu,
-        blr_on_hand=blr_on_hand,
-        fba_stock=fba_stock,
-        manual_orders=manual_orders,
-        sellerboard_recommended=recommended,
-    )
+from core.db_routing import reporting
+from inventory.models import Product
+
+from .services import PlannerInputs, PlannerOutputs, build_planner_outputs, load_planner_inputs
+from .velocity import AduChoice, velocity_windows
 
 
 class PlannerBaseView(views.APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    """Planner rows for every product, shaped by the subclass's static ``row``.
 
+    ``adu_source`` (sellerboard, internal or blend), ``adu_window`` and
+    ``blend_weight`` choose the ADU the planner runs on.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    row: Callable[[PlannerInputs, PlannerOutputs], dict]
 
-class ReorderView(PlannerBaseView):
     def get(self, request):
-        payload = []
-        products = Product.objects.all().select_related("sellerboardmetrics", "manualorders")
-        for product in products:
-            inputs = _planner_inputs(product)
-            outputs = build_planner_outputs(inputs)
-            payload.append(
-                {
-                    "sku": product.sku,
-                    "reorder_qty": outputs.reorder_qty,
-                    "total_stock": inputs.blr_on_hand + inputs.fba_stock + (inputs.manual_orders.total() if inputs.manual_orders else 0),
-                    "less_than_sellerboard": outputs.less_than_sellerboard_flag,
-                }
-            )
+        adu = AduChoice.from_params(request.query_params)
+        with reporting():
+            planner_inputs = load_planner_inputs(adu)
+        payload = [self.row(inputs, build_planner_outputs(inputs)) for inputs in planner_inputs]
         return response.Response(payload, status=status.HTTP_200_OK)
 
 
+class ReorderView(PlannerBaseView):
+    @staticmethod
+    def row(inputs, outputs):
+        return {
+            "sku": inputs.product.sku,
+            "reorder_qty": outputs.reorder_qty,
+            "total_stock": inputs.blr_on_hand + inputs.fba_stock + (inputs.manual_orders.total() if inputs.manual_orders else 0),
+            "less_than_sellerboard": outputs.less_than_sellerboard_flag,
+        }
+
+
 class FBAView(PlannerBaseView):
-    def get(self, request):
-        payload = []
-        products = Product.objects.all().select_related("sellerboardmetrics", "manualorders")
-        for product in products:
-            inputs = _planner_inputs(product)
-            outputs = build_planner_outputs(inputs)
-            payload.append(
-                {
-                    "sku": product.sku,
-                    "send_to_fba": outputs.send_to_fba,
-                    "low_fba_flag": outputs.low_fba_flag,
-                    "blr_on_hand": inputs.blr_on_hand,
-                    "fba_stock": inputs.fba_stock,
-                }
-            )
-        return response.Response(payload, status=status.HTTP_200_OK)
+    @staticmethod
+    def row(inputs, outputs):
+        return {
+            "sku": inputs.product.sku,
+            "send_to_fba": outputs.send_to_fba,
+            "low_fba_flag": outputs.low_fba_flag,
+            "blr_on_hand": inputs.blr_on_hand,
+            "fba_stock": inputs.fba_stock,
+        }
 
 
 class ExcessView(PlannerBaseView):
-    def get(self, request):
-        payload = []
-        products = Product.objects.all().select_related("sellerboardmetrics", "manualorders")
-        for product in products:
-            inputs = _planner_inputs(product)
-            outputs = build_planner_outputs(inputs)
-            payload.append(
-                {
-                    "sku": product.sku,
-                    "excess_units": outputs.excess_units,
-                    "excess_value": str(outputs.excess_value),
-                }
-            )
-        return response.Response(payload, status=status.HTTP_200_OK)
+    @staticmethod
+    def row(inputs, outputs):
+        return {
+            "sku": inputs.product.sku,
+            "excess_units": outputs.excess_units,
+            "excess_value": str(outputs.excess_value),
+        }
 
 
 class FlagsView(PlannerBaseView):
+    @staticmethod
+    def row(inputs, outputs):
+        return {
+            "sku": inputs.product.sku,
+            "less_than_sellerboard": outputs.less_than_sellerboard_flag,
+            "low_fba": outputs.low_fba_flag,
+        }
+
+
+class VelocityView(views.APIView):
+    """Sellerboard ADU next to internal ADU for each configured window; ``sku`` filters."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
     def get(self, request):
+        skus = [sku for sku in request.query_params.getlist('sku') if sku]
+        products = Product.objects.select_related('sellerboardmetrics').order_by('sku')
+        if skus:
+            products = products.filter(sku__in=skus)
+        with reporting():
+            products = list(products)
+            internal = velocity_windows(skus)
         payload = []
-        products = Product.objects.all().select_related("sellerboardmetrics", "manualorders")
         for product in products:
-            inputs = _planner_inputs(product)
-            outputs = build_planner_outputs(inputs)
+            metrics = getattr(product, 'sellerboardmetrics', None)
+            windows = internal.get(product.sku, {})
             payload.append(
                 {
-                    "sku": product.sku,
-                    "less_than_sellerboard": outputs.less_than_sellerboard_flag,
-                    "low_fba": outputs.low_fba_flag,
+                    'sku': product.sku,
+                    'sellerboard_adu': metrics.adu if metrics else None,
+                    'internal_adu': {str(window): windows.get(window, 0) for window in sorted(settings.PLANNER_ADU_WINDOWS)},
                 }
             )
         return response.Response(payload, status=status.HTTP_200_OK)
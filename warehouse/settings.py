@@ -23,7 +23,10 @@ INSTALLED_APPS = [
     'authz',
 ]
 
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+
 MIDDLEWARE = [
+    *(['core.middleware.MetricsMiddleware'] if METRICS_ENABLED else []),
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,6 +34,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.PrimaryStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'warehouse.urls'
@@ -64,6 +68,20 @@ DATABASES = {
     }
 }
 
+# Optional read replica for planner, report and export queries (see core.db_routing).
+# Point POSTGRES_REPLICA_HOST at the primary to exercise routing locally.
+REPLICA_DATABASE_ALIAS = None
+if os.getenv('POSTGRES_REPLICA_HOST'):
+    REPLICA_DATABASE_ALIAS = 'replica'
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('POSTGRES_REPLICA_HOST'),
+        'PORT': os.getenv('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.db_routing.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -77,14 +95,56 @@ USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = 'static/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', str(BASE_DIR / 'media'))
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'authz.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
+
+AUTHZ_TOKEN_CACHE_TTL = int(os.getenv('AUTHZ_TOKEN_CACHE_TTL', '300'))
+AUTHZ_TOKEN_CACHE_SIZE = int(os.getenv('AUTHZ_TOKEN_CACHE_SIZE', '10000'))
+
+# Per-process caches of products, warehouses and product flags used to resolve
+# references in imports and allocation. Writes in a process invalidate its own
+# cache; other processes pick the change up within the TTL.
+INVENTORY_CATALOG_CACHE_SIZE = int(os.getenv('INVENTORY_CATALOG_CACHE_SIZE', '50000'))
+INVENTORY_CATALOG_CACHE_TTL = int(os.getenv('INVENTORY_CATALOG_CACHE_TTL', '300'))
+
+# Run the async planner endpoints' bulk input queries concurrently, each on
+# its own short-lived connection (override per request with ?concurrent=0/1).
+PLANNER_ASYNC_CONCURRENT_INPUTS = os.getenv('PLANNER_ASYNC_CONCURRENT_INPUTS', '0') == '1'
+
+# ADU the planner runs on: sellerboard, internal (FBA outbound flows from the
+# daily ledger rollup over one of PLANNER_ADU_WINDOWS days) or a blend whose
+# internal share is PLANNER_ADU_BLEND_WEIGHT. Overridable per request.
+PLANNER_ADU_SOURCE = os.getenv('PLANNER_ADU_SOURCE', 'sellerboard')
+PLANNER_ADU_WINDOWS = tuple(int(days) for days in os.getenv('PLANNER_ADU_WINDOWS', '7,30,90').split(','))
+PLANNER_ADU_WINDOW_DAYS = int(os.getenv('PLANNER_ADU_WINDOW_DAYS', '30'))
+PLANNER_ADU_BLEND_WEIGHT = float(os.getenv('PLANNER_ADU_BLEND_WEIGHT', '0.5'))
+
+# The sync feed holds rows back to the oldest open transaction, less this many
+# seconds of allowance for clock skew between the app servers and Postgres.
+INVENTORY_SYNC_SETTLE_SECONDS = int(os.getenv('INVENTORY_SYNC_SETTLE_SECONDS', '2'))
+
+# An import run still marked running after this long is assumed to have
+# crashed; a re-upload of the same file may then take it over.
+IMPORT_RUN_TIMEOUT_SECONDS = int(os.getenv('IMPORT_RUN_TIMEOUT_SECONDS', '3600'))
+
+# Background import jobs whose worker has not checkpointed or heartbeated
+# (every third of this) for this long are picked up again by another
+# `run_import_worker` and resumed from the last chunk; the old attempt stops.
+IMPORT_JOB_STALE_SECONDS = int(os.getenv('IMPORT_JOB_STALE_SECONDS', '300'))
+
+# Fold stock ledger rows into the daily rollup as they are committed. When off,
+# run `python manage.py rollup_ledger` periodically; it catches up from a
+# watermark, skipping rows newer than the oldest open transaction less
+# INVENTORY_ROLLUP_SETTLE_SECONDS.
+INVENTORY_ROLLUP_AT_COMMIT = os.getenv('INVENTORY_ROLLUP_AT_COMMIT', '1') == '1'
+INVENTORY_ROLLUP_SETTLE_SECONDS = int(os.getenv('INVENTORY_ROLLUP_SETTLE_SECONDS', '60'))